@@ -1,74 +1,74 @@
 
-from fastapi import APIRouter, HTTPException
-from app.utils.db import supabase
-import yfinance as yf
-import time
-from app.data.fetch_financials import save_company_and_financials
-from app.ml.scoring import score_company, log_score
-from app.ml.explainability import explain_score
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+from app.utils.db import get_async_supabase
+from app.config import BULK_CONCURRENCY
+from app.data.ingest import ingest_company
+from app.data.bulk_onboard import onboard_job
+from app.data.repository import aget_company_id, remember_company
+from app.utils.jobs import get_job_queue, QueueFull
+from app.utils.cache import invalidate_ticker
+from app.ml.leaderboard import get_leaderboard
+from app.ml.peers import get_peers
 
 router = APIRouter()
 
 
-@router.post("/add_company/{ticker}")
-def add_company_by_ticker(ticker: str):
+@router.post("/add_company/{ticker}", status_code=202)
+async def add_company_by_ticker(ticker: str):
 	ticker = ticker.upper()
 	# Check if company already exists
-	existing = supabase.table("companies").select("id").eq("ticker", ticker).execute().data
-	if existing:
-		return {"message": "Company already exists", "id": existing[0]["id"]}
-	# Fetch and store company, financials, news
-	save_company_and_financials(ticker)
-
-	# Retry logic for eventual consistency
-	def retry_fetch(fetch_fn, max_retries=5, base_delay=0.3):
-		delay = base_delay
-		for attempt in range(max_retries):
-			result = fetch_fn()
-			if result:
-				return result
-			time.sleep(delay)
-			delay *= 2
-		return None
+	existing_id = await aget_company_id(ticker)
+	if existing_id is not None:
+		return JSONResponse({"message": "Company already exists", "id": existing_id})
+	# Fetch, store, score and log in the background; concurrent requests share one job
+	try:
+		job = get_job_queue().submit("add_company", ingest_company, ticker, key=f"add_company:{ticker}")
+	except QueueFull as e:
+		raise HTTPException(status_code=503, detail=f"Ingestion queue is full: {e}")
+	return {
+		"message": "Company ingestion queued",
+		"job_id": job.id,
+		"status": job.status,
+		"status_url": f"/jobs/{job.id}",
+	}
 
-	# Get company id with retry
-	company = retry_fetch(lambda: supabase.table("companies").select("id").eq("ticker", ticker).execute().data)
-	if not company:
-		raise HTTPException(status_code=500, detail="Company insert failed (timing issue)")
-	company_id = company[0]["id"]
-	# Get latest financials with retry
-	financials = retry_fetch(lambda: supabase.table("financials").select("*").eq("company_id", company_id).order("date", desc=True).limit(1).execute().data)
-	financials = financials[0] if financials else {}
-	# Get recent news with retry
-	news_items = retry_fetch(lambda: supabase.table("news").select("*").eq("company_id", company_id).order("date", desc=True).limit(5).execute().data)
-	news_items = news_items if news_items else []
-	# Compute score
-	score = score_company(ticker)
-	# Explain score
-	explanation = explain_score(financials, news_items, score)
-	# Log score
-	log_score(company_id, score, explanation)
+@router.post("/companies/bulk", status_code=202)
+async def bulk_onboard_companies(tickers: list[str], concurrency: int = Query(BULK_CONCURRENCY, ge=1, le=64)):
+	tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+	if not tickers:
+		raise HTTPException(status_code=400, detail="At least one ticker is required")
+	try:
+		job = get_job_queue().submit("bulk_onboard", onboard_job, tickers, concurrency)
+	except QueueFull as e:
+		raise HTTPException(status_code=503, detail=f"Ingestion queue is full: {e}")
 	return {
-		"message": "Company created and scored",
-		"id": company_id,
-		"score": score,
-		"explanation": explanation["plain_summary"],
-		"feature_contributions": explanation["feature_contributions"]
+		"message": f"Onboarding of {len(tickers)} tickers queued",
+		"job_id": job.id,
+		"status": job.status,
+		"status_url": f"/jobs/{job.id}",
 	}
 
 @router.post("/company")
-def upsert_company(company: dict):
+async def upsert_company(company: dict):
 	ticker = company.get("ticker")
 	if not ticker:
 		raise HTTPException(status_code=400, detail="Ticker is required")
 	# Check if company exists
-	existing = supabase.table("companies").select("id").eq("ticker", ticker).execute().data
-	if existing:
+	company_id = await aget_company_id(ticker)
+	client = await get_async_supabase()
+	if company_id is not None:
 		# Update existing
-		company_id = existing[0]["id"]
-		supabase.table("companies").update(company).eq("id", company_id).execute()
+		await client.table("companies").update(company).eq("id", company_id).execute()
+		if company.get("sector"):
+			# Ranked lists and percentiles are per sector
+			get_leaderboard().record_company(company_id, ticker, company["sector"])
+			get_peers().record_sector(company_id, company["sector"])
+		invalidate_ticker(ticker, ("company",))
 		return {"message": "Company updated", "id": company_id}
 	else:
 		# Insert new
-		res = supabase.table("companies").insert(company).execute()
+		res = await client.table("companies").insert(company).execute()
+		remember_company(ticker, res.data[0]["id"])
+		invalidate_ticker(ticker, ("company",))
 		return {"message": "Company created", "id": res.data[0]["id"]}
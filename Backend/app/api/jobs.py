@@ -0,0 +1,13 @@
+# FastAPI routes for background jobs
+from fastapi import APIRouter, HTTPException
+from app.utils.jobs import get_job_queue
+
+router = APIRouter()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
@@ -1 +1,128 @@
 # FastAPI routes for scores
+import asyncio
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Query
+from app.data.repository import aget_company_id, aload_company_bundles
+from app.ml.history import aggregate_score_history
+from app.ml import rescore
+from app.ml.leaderboard import get_leaderboard
+from app.utils.db import get_async_supabase
+from app.utils.metrics import compute_seconds, timed
+from app.utils.pagination import MAX_PAGE_SIZE, keyset_pages
+from app.ml.scoring import compute_credit_scores_batch, scoring_columns
+
+router = APIRouter()
+
+Bucket = Literal["day", "week", "month"]
+
+# Keep PostgREST `in.(...)` filters well under URL length limits
+BATCH_CHUNK_SIZE = 200
+
+
+async def load_scoring_inputs(tickers):
+    """Fetch company bundles for many tickers, one embedded-select round trip per chunk, chunks in parallel."""
+    chunks = await asyncio.gather(*(
+        aload_company_bundles(tickers[i:i + BATCH_CHUNK_SIZE])
+        for i in range(0, len(tickers), BATCH_CHUNK_SIZE)
+    ))
+    return [bundle for chunk in chunks for bundle in chunk]
+
+
+@router.post("/scores/batch")
+async def score_batch(tickers: list[str]):
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    if not tickers:
+        raise HTTPException(status_code=400, detail="At least one ticker is required")
+
+    bundles = await load_scoring_inputs(tickers)
+    # Same 404 semantics as /score/{ticker}: no financials means no score
+    scorable = [b for b in bundles if b["financials"]]
+    with timed(compute_seconds, "score_batch", timing="score"):
+        columns = scoring_columns(
+            [b["financials"] for b in scorable],
+            [b["news"] for b in scorable],
+        )
+        scores = compute_credit_scores_batch(**columns)
+
+    scored = {b["company"]["ticker"]: int(s) for b, s in zip(scorable, scores)}
+    found = {b["company"]["ticker"] for b in bundles}
+    return {
+        "scores": [{"ticker": t, "score": scored[t]} for t in tickers if t in scored],
+        "not_found": [t for t in tickers if t not in found],
+        "missing_financials": [t for t in tickers if t in found and t not in scored],
+    }
+
+
+def date_filters(from_=None, to=None):
+    """Keyset-page filters for an inclusive datetime range; either end may be open."""
+    filters = []
+    if from_ is not None:
+        filters.append(("gte", "date", from_.isoformat()))
+    if to is not None:
+        filters.append(("lte", "date", to.isoformat()))
+    return filters
+
+
+async def load_score_rows(client, company_ids, from_=None, to=None, include_explanation=False):
+    """
+    Raw score rows for one or more companies within [from_, to], oldest first.
+    Read in keyset pages so long histories are not cut off at the server's max-rows.
+    """
+    columns = ["company_id", "date", "score"] + (["explanation"] if include_explanation else [])
+    filters = [("in_", "company_id", list(company_ids))] + date_filters(from_, to)
+    rows = []
+    async for page in keyset_pages(client, "scores", columns, ("date", "id"), filters=filters, page_size=MAX_PAGE_SIZE):
+        rows.extend({c: row.get(c) for c in columns} for row in page)
+    return rows
+
+
+@router.get("/score_history")
+async def get_score_history_multi(
+    tickers: str,
+    bucket: Bucket = "day",
+    from_: datetime | None = Query(None, alias="from"),
+    to: datetime | None = None,
+    include_explanation: bool = False,
+):
+    """Bucketed score history for several tickers at once, for comparison charts."""
+    tickers = list(dict.fromkeys(t.strip() for t in tickers.split(",") if t.strip()))
+    if not tickers:
+        raise HTTPException(status_code=400, detail="At least one ticker is required")
+    ids = await asyncio.gather(*(aget_company_id(t) for t in tickers))
+    found = {company_id: t for t, company_id in zip(tickers, ids) if company_id is not None}
+    if not found:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    client = await get_async_supabase()
+    rows = await load_score_rows(client, list(found), from_, to, include_explanation)
+    # One groupby over every company rather than one per ticker
+    history = aggregate_score_history(rows, bucket, include_explanation, by="company_id")
+    return {ticker: history.get(company_id, []) for company_id, ticker in found.items()}
+
+
+LEADERBOARD_MAX_LIMIT = 500
+
+
+@router.get("/scores/top")
+async def get_top_scores(sector: str | None = None, limit: int = Query(10, ge=1, le=LEADERBOARD_MAX_LIMIT)):
+    """Companies with the highest latest score, overall or within `sector`."""
+    return get_leaderboard().ensure_built().top(limit, sector)
+
+
+@router.get("/scores/bottom")
+async def get_bottom_scores(sector: str | None = None, limit: int = Query(10, ge=1, le=LEADERBOARD_MAX_LIMIT)):
+    """Companies with the lowest (riskiest) latest score, overall or within `sector`."""
+    return get_leaderboard().ensure_built().bottom(limit, sector)
+
+
+@router.get("/scores/sectors")
+async def get_score_sectors():
+    """Sectors in the leaderboard index with their company counts."""
+    return get_leaderboard().ensure_built().sectors()
+
+
+@router.get("/rescore/stats")
+async def get_rescore_stats():
+    """Checked/skipped/rescored counts of the latest incremental rescoring run."""
+    return rescore.last_run_stats or {}
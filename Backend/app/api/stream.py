@@ -0,0 +1,48 @@
+# FastAPI routes for live updates
+import json
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from app.config import STREAM_HEARTBEAT_SECONDS
+from app.utils.pubsub import score_updates
+
+router = APIRouter()
+
+MAX_STREAM_TICKERS = 200
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@router.get("/stream/scores")
+async def stream_scores(request: Request, tickers: str | None = None):
+    """
+    Server-Sent Events: one `score` event (same fields as /score/{ticker}
+    plus date) whenever a score is logged for one of `tickers` (comma
+    separated; all tickers when omitted), and a heartbeat comment while idle.
+    """
+    topics = list(dict.fromkeys(t.strip().upper() for t in (tickers or "").split(",") if t.strip()))
+    if len(topics) > MAX_STREAM_TICKERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STREAM_TICKERS} tickers per stream")
+    return StreamingResponse(
+        sse_events(score_updates, topics or None, "score", request.is_disconnected),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+async def sse_events(broker, topics, event_name, is_disconnected, heartbeat=None):
+    """
+    Subscribe to `topics` and encode their events as SSE frames, with a
+    heartbeat comment after `heartbeat` idle seconds. The subscription only
+    exists while the response is being sent, so a client that goes away
+    before the first frame leaves nothing behind.
+    """
+    heartbeat = heartbeat or STREAM_HEARTBEAT_SECONDS
+    with broker.subscribe(topics) as subscription:
+        yield f"retry: {int(heartbeat * 1000)}\n\n"
+        while True:
+            event = await subscription.get(timeout=heartbeat)
+            if event is None:
+                if await is_disconnected():
+                    return
+                yield ": heartbeat\n\n"
+                continue
+            yield f"event: {event_name}\ndata: {json.dumps(event, default=str)}\n\n"
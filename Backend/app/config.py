@@ -6,3 +6,61 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)),
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")
+
+# Read-endpoint response cache (seconds / max entries)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+
+# Responses at least this large are gzip/brotli compressed when the client accepts it
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1000"))
+
+# PostgREST's max-rows setting (1000 on Supabase): a select never returns more,
+# so page and chunk sizes are clamped to it to tell a full page from the last one
+DB_MAX_ROWS = int(os.getenv("DB_MAX_ROWS", "1000"))
+
+# Shared async HTTP connection pool
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+
+# Memoized sentiment predictions (entries)
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", "50000"))
+
+# Background ingestion workers (POST /add_company, bulk onboarding)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+INGEST_MAX_PENDING = int(os.getenv("INGEST_MAX_PENDING", "100"))
+
+# Bulk onboarding: parallel yfinance/NewsAPI fetches and rows per bulk write
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", "8"))
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "200"))
+
+# Load the sentiment model during startup instead of on first use
+WARM_MODELS = os.getenv("WARM_MODELS", "").lower() in ("1", "true", "yes")
+
+# Storage backend: "supabase" (default) or "memory" (in-process stand-in for tests/benchmarks)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+# External data: "live" (yfinance + NewsAPI) or "fake" (deterministic offline providers)
+DATA_PROVIDER = os.getenv("DATA_PROVIDER", "live").lower()
+# Simulated network latency of the fake providers (milliseconds per call)
+FAKE_PROVIDER_LATENCY_MS = float(os.getenv("FAKE_PROVIDER_LATENCY_MS", "0"))
+
+# Incremental rescoring: seconds between runs (0 disables the in-app scheduler) and companies per batch
+RESCORE_INTERVAL = float(os.getenv("RESCORE_INTERVAL", "0"))
+RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "200"))
+
+# Return per-request Server-Timing headers (db, providers, sentiment, scoring spans)
+SERVER_TIMING = os.getenv("SERVER_TIMING", "").lower() in ("1", "true", "yes")
+
+# External data provider layer: on-disk cache of raw yfinance/NewsAPI responses
+# (seconds; 0 disables), rate limits (calls/second) and the NewsAPI circuit breaker
+PROVIDER_CACHE_DIR = os.getenv("PROVIDER_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "providers"))
+YFINANCE_CACHE_TTL = float(os.getenv("YFINANCE_CACHE_TTL", "21600"))
+NEWSAPI_CACHE_TTL = float(os.getenv("NEWSAPI_CACHE_TTL", "900"))
+YFINANCE_RATE_LIMIT = float(os.getenv("YFINANCE_RATE_LIMIT", "5"))
+NEWSAPI_RATE_LIMIT = float(os.getenv("NEWSAPI_RATE_LIMIT", "2"))
+NEWSAPI_BREAKER_FAILURES = int(os.getenv("NEWSAPI_BREAKER_FAILURES", "5"))
+NEWSAPI_BREAKER_RESET = float(os.getenv("NEWSAPI_BREAKER_RESET", "300"))
+
+# GET /stream/scores: seconds between heartbeat comments, events buffered per client
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "100"))
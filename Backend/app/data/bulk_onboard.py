@@ -0,0 +1,153 @@
+"""
+Concurrent onboarding of many tickers, built from the pieces of
+save_company_and_financials.
+
+    python -m app.data.bulk_onboard AAPL MSFT GOOG
+    python -m app.data.bulk_onboard --file tickers.txt --concurrency 16
+"""
+import argparse
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from app.config import BULK_CONCURRENCY, BULK_CHUNK_SIZE
+from app.utils.db import supabase
+from app.utils.cache import invalidate_ticker
+from .fetch_financials import _company_row, _financials_rows, upsert_financials
+from .fetch_news import fetch_and_store_news
+from .news_writer import NewsBatchWriter
+from .providers import fetch_statements, get_tickers
+from .repository import remember_company
+
+
+def _stage(job, name):
+    return job.stage(name) if job is not None else nullcontext()
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def onboard_tickers(tickers, concurrency=BULK_CONCURRENCY, chunk_size=BULK_CHUNK_SIZE, job=None):
+    """
+    Fetch yfinance data for `tickers` with at most `concurrency` requests in
+    flight, write companies and financials in chunked bulk upserts, then
+    fetch news through one cross-company NewsBatchWriter.
+    Returns a per-ticker report; one ticker failing does not stop the rest.
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    results = {t: {"status": "pending"} for t in tickers}
+    if not tickers:
+        return _report(results)
+
+    with _stage(job, "fetch"):
+        fetched = {}
+        # Tickers share one session; .info and .financials have no
+        # multi-symbol endpoint, so they run in parallel.
+        stocks = get_tickers(tickers)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = {t: pool.submit(fetch_statements, t, stocks[t]) for t in tickers}
+            for ticker, future in futures.items():
+                try:
+                    fetched[ticker] = future.result()
+                except Exception as e:
+                    logging.warning(f"Failed to fetch {ticker}: {e}")
+                    results[ticker] = {"status": "failed", "stage": "fetch", "error": str(e)}
+
+    company_ids = {}
+    with _stage(job, "write_companies"):
+        rows = [_company_row(t, fetched[t][0]) for t in fetched]
+        for chunk in _chunks(rows, chunk_size):
+            try:
+                written = supabase.table("companies").upsert(chunk, on_conflict="ticker").execute().data
+                for company in written:
+                    company_ids[company["ticker"]] = company["id"]
+                    remember_company(company["ticker"], company["id"])
+            except Exception as e:
+                logging.error(f"Company bulk upsert of {len(chunk)} rows failed: {e}")
+                for row in chunk:
+                    results[row["ticker"]] = {"status": "failed", "stage": "write_companies", "error": str(e)}
+
+    with _stage(job, "write_financials"):
+        rows = {}
+        for ticker, company_id in company_ids.items():
+            try:
+                info, financials, balance_sheet = fetched[ticker]
+                rows[ticker] = _financials_rows(ticker, company_id, financials, balance_sheet)
+            except Exception as e:
+                results[ticker] = {"status": "failed", "stage": "write_financials", "error": str(e)}
+        # Chunks hold whole tickers, so each ticker's periods land in one upsert
+        for chunk in _chunks(list(rows), chunk_size):
+            try:
+                upsert_financials([row for ticker in chunk for row in rows[ticker]])
+                for ticker in chunk:
+                    results[ticker] = {"status": "succeeded", "id": company_ids[ticker]}
+                    invalidate_ticker(ticker, ("company", "score"))
+            except Exception as e:
+                logging.error(f"Financials bulk upsert for {len(chunk)} tickers failed: {e}")
+                for ticker in chunk:
+                    results[ticker] = {"status": "failed", "stage": "write_financials", "error": str(e)}
+
+    with _stage(job, "news"):
+        onboarded = [t for t in tickers if results[t]["status"] == "succeeded"]
+        with NewsBatchWriter(flush_rows=chunk_size) as writer:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                futures = {
+                    t: pool.submit(fetch_and_store_news, fetched[t][0].get("shortName", ""), company_ids[t], writer)
+                    for t in onboarded
+                }
+                for ticker, future in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        # Company and financials are stored; only the headlines are missing
+                        logging.warning(f"News ingestion failed for {ticker}: {e}")
+                        results[ticker]["news_error"] = str(e)
+        # Flushes still running when the futures finished are done once the writer is closed
+        for ticker in onboarded:
+            if company_ids[ticker] in writer.failed:
+                results[ticker].setdefault("news_error", writer.failed[company_ids[ticker]])
+
+    return _report(results)
+
+
+def _report(results):
+    return {
+        "total": len(results),
+        "succeeded": sum(1 for r in results.values() if r["status"] == "succeeded"),
+        "failed": sum(1 for r in results.values() if r["status"] == "failed"),
+        "news_failed": sum(1 for r in results.values() if "news_error" in r),
+        "results": results,
+    }
+
+
+def onboard_job(job, tickers, concurrency=BULK_CONCURRENCY):
+    """JobQueue entry point for POST /companies/bulk."""
+    return onboard_tickers(tickers, concurrency=concurrency, job=job)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Onboard many tickers concurrently.")
+    parser.add_argument("tickers", nargs="*", help="Ticker symbols")
+    parser.add_argument("--file", help="File with one ticker per line")
+    parser.add_argument("--concurrency", type=int, default=BULK_CONCURRENCY)
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file) as f:
+            tickers.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    if not tickers:
+        parser.error("no tickers given")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    report = onboard_tickers(tickers, concurrency=args.concurrency, chunk_size=args.chunk_size)
+    print(json.dumps(report, indent=2))
+    return 0 if report["failed"] == 0 and report["news_failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Deterministic offline stand-ins for yfinance and NewsAPI, used with
+DATA_PROVIDER=fake by tests and benchmarks. Data is derived from a hash of the
+ticker or query, so repeated runs see the same companies and headlines.
+Symbols containing "FAIL" raise, to exercise error paths.
+"""
+import hashlib
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from app.config import FAKE_PROVIDER_LATENCY_MS
+
+SECTORS = ["Technology", "Healthcare", "Financial Services", "Energy", "Industrials", "Consumer Cyclical"]
+
+HEADLINES = [
+    "{name} posts record quarterly profit",
+    "{name} raises full-year guidance on strong growth",
+    "{name} shares fall after earnings miss",
+    "{name} faces lawsuit over accounting practices",
+    "{name} announces new product line",
+    "{name} CEO resigns amid investigation",
+    "{name} expands into new markets",
+    "Analysts upgrade {name} on improving margins",
+]
+
+
+def _rng(key):
+    return random.Random(int(hashlib.sha256(key.encode("utf-8")).hexdigest()[:16], 16))
+
+
+def _simulate_latency():
+    if FAKE_PROVIDER_LATENCY_MS > 0:
+        time.sleep(FAKE_PROVIDER_LATENCY_MS / 1000)
+
+
+class FakeTicker:
+    def __init__(self, symbol):
+        self.ticker = symbol.upper()
+
+    def _check(self):
+        _simulate_latency()
+        if "FAIL" in self.ticker:
+            raise RuntimeError(f"No data found for symbol {self.ticker}")
+
+    @property
+    def info(self):
+        self._check()
+        rng = _rng(self.ticker)
+        return {"shortName": f"{self.ticker} Corp", "sector": rng.choice(SECTORS)}
+
+    def _statement(self, rows):
+        import pandas as pd
+        self._check()
+        rng = _rng(self.ticker + ":statements")
+        columns = pd.to_datetime([f"{2024 - i}-12-31" for i in range(4)])
+        data = {name: [lo + (hi - lo) * rng.random() for _ in columns] for name, (lo, hi) in rows.items()}
+        return pd.DataFrame(data, index=columns).T
+
+    @property
+    def financials(self):
+        return self._statement({
+            "Total Revenue": (5e7, 5e10),
+            "Net Income": (-2e9, 8e9),
+        })
+
+    @property
+    def balance_sheet(self):
+        return self._statement({
+            "Total Assets": (1e9, 3e11),
+            "Total Debt": (0, 1.5e11),
+        })
+
+
+def fake_news_articles(query, page_size=5):
+    _simulate_latency()
+    rng = _rng("news:" + query)
+    now = datetime.now(timezone.utc)
+    articles = []
+    for i in range(page_size):
+        template = rng.choice(HEADLINES)
+        published = now - timedelta(hours=rng.randint(1, 24 * 30))
+        articles.append({
+            "title": template.format(name=query),
+            "url": f"https://news.example.com/{hashlib.md5(query.encode()).hexdigest()[:8]}/{i}",
+            "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        })
+    return articles
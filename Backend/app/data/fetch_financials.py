@@ -1,60 +1,91 @@
-import yfinance as yf
 import logging
-import pandas as pd
-from supabase import create_client, Client
-import os
 from .fetch_news import fetch_and_store_news
-from app.config import SUPABASE_URL, SUPABASE_KEY, NEWS_API_KEY
+from .repository import remember_company
+from .providers import fetch_statements
+from app.ml.data_versions import get_data_versions
+from app.ml.peers import get_peers
+from app.utils.cache import invalidate_ticker
+from app.utils.db import supabase
 
-SUPABASE_URL = os.getenv("SUPABASE_URL", "")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
+def _company_row(ticker, info):
+    return {
+        "ticker": ticker,
+        "name": info.get("shortName", ""),
+        "sector": info.get("sector", "")
+    }
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-def save_company_and_financials(ticker):
-    logging.info(f"Fetching financial data for {ticker}")
-    stock = yf.Ticker(ticker)
-    info = stock.info
-    logging.info(f"Fetched info for {ticker}")
-    financials = stock.financials
-    logging.info(f"Fetched financials for {ticker}")
+# Statement line items read from yfinance, by output column
+INCOME_ITEMS = {"net_income": "Net Income", "revenue": "Total Revenue"}
+BALANCE_ITEMS = {"total_debt": "Total Debt", "total_assets": "Total Assets"}
+FINANCIALS_CONFLICT_KEY = "company_id,date"
+
+
+def _periods(statement, items):
+    """A yfinance statement (line items x period columns) as periods x `items` columns."""
+    import pandas as pd
+    if statement is None or getattr(statement, "empty", True):
+        return pd.DataFrame(columns=list(items))
+    frame = statement.reindex(list(items.values())).T
+    frame.columns = list(items)
+    frame.index = pd.to_datetime(frame.index, errors="coerce")
+    return frame[frame.index.notna()].apply(pd.to_numeric, errors="coerce")
+
+
+def _financials_rows(ticker, company_id, financials, balance_sheet=None):
+    """
+    One row per reported period from the income statement and balance sheet,
+    with debt_ratio = Total Debt / Total Assets. Periods are keyed by fiscal
+    year ("YYYY-01-01", as before), keeping the latest period of each year.
+    """
+    import numpy as np
+    frame = _periods(financials, INCOME_ITEMS).join(_periods(balance_sheet, BALANCE_ITEMS), how="outer")
+    if frame.empty:
+        logging.warning(f"No financial statements for {ticker}")
+        return []
+    assets = frame["total_assets"].where(frame["total_assets"] > 0)
+    frame["debt_ratio"] = frame["total_debt"] / assets
+    frame = frame.sort_index()
+    frame["date"] = frame.index.year.astype(str) + "-01-01"
+    frame = frame.drop_duplicates("date", keep="last")
+    frame = frame.dropna(how="all", subset=["net_income", "revenue", "debt_ratio"])
+
+    out = frame[["date", "net_income", "revenue", "debt_ratio"]].astype(object)
+    out = out.where(frame[["date", "net_income", "revenue", "debt_ratio"]].notna(), None)
+    out.insert(0, "company_id", company_id)
+    rows = out.to_dict(orient="records")
+    for row in rows:
+        for key in ("net_income", "revenue", "debt_ratio"):
+            if row[key] is not None and not np.isfinite(row[key]):
+                row[key] = None
+    logging.info(f"Extracted {len(rows)} financial periods for {ticker}: {[r['date'][:4] for r in rows]}")
+    return rows
 
-    name = info.get("shortName", "")
-    sector = info.get("sector", "")
+
+def upsert_financials(rows):
+    """All periods in one bulk upsert keyed on (company_id, date); re-ingestion overwrites instead of appending."""
+    if rows:
+        supabase.table("financials").upsert(rows, on_conflict=FINANCIALS_CONFLICT_KEY).execute()
+        get_peers().record_financials(rows)
+        get_data_versions().record("financials", rows)
+
+
+def save_company_and_financials(ticker, news_writer=None):
+    logging.info(f"Fetching financial data for {ticker}")
+    info, financials, balance_sheet = fetch_statements(ticker)
+    logging.info(f"Fetched info and statements for {ticker}")
 
     logging.info(f"Upserting company {ticker} into database")
-    company = supabase.table("companies").upsert({
-        "ticker": ticker,
-        "name": name,
-        "sector": sector
-    }).execute().data[0]
+    company_row = _company_row(ticker, info)
+    company = supabase.table("companies").upsert(company_row, on_conflict="ticker").execute().data[0]
     company_id = company["id"]
+    remember_company(ticker, company_id)
     logging.info(f"Company upserted with id {company_id}")
 
-    years = pd.to_datetime(financials.columns, errors='coerce').year
-    logging.info(f"Extracted years from financials columns: {years.tolist()}")
-    year = str(years[0]) if len(years) > 0 else "Unknown"
-    try:
-        net_income = float(financials.loc["Net Income"].iloc[0])
-        logging.info(f"Net income: {net_income}")
-    except Exception as e:
-        logging.warning(f"Failed to get net income: {e}")
-        net_income = None
-    try:
-        revenue = float(financials.loc["Total Revenue"].iloc[0])
-        logging.info(f"Revenue: {revenue}")
-    except Exception as e:
-        logging.warning(f"Failed to get revenue: {e}")
-        revenue = None
-    debt_ratio = None
-
-    logging.info(f"Inserting financials for {ticker} year {year}")
-    supabase.table("financials").insert({
-        "company_id": company_id,
-        "date": f"{year}-01-01" if year != "Unknown" else None,
-        "net_income": float(net_income) if net_income else None,
-        "revenue": float(revenue) if revenue else None,
-        "debt_ratio": float(debt_ratio) if debt_ratio else None,
-    }).execute()
-    logging.info(f"Inserted financials for {ticker} year {year}")
-    fetch_and_store_news(name, company_id)
+    rows = _financials_rows(ticker, company_id, financials, balance_sheet)
+    upsert_financials(rows)
+    logging.info(f"Upserted {len(rows)} financial periods for {ticker}")
+    invalidate_ticker(ticker, ("company", "score"))
+    fetch_and_store_news(company_row["name"], company_id, writer=news_writer)
+    return company_id
+
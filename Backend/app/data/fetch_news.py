@@ -1,64 +1,191 @@
-import requests
 import logging
-from supabase import create_client, Client
-from app.config import SUPABASE_URL, SUPABASE_KEY, NEWS_API_KEY
-import joblib
+import threading
+from app.config import SENTIMENT_CACHE_SIZE
 import os
-import sklearn
-
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
+import hashlib
+import numpy as np
+from app.data.news_writer import upsert_news
+from app.data.providers import fetch_news_articles
+from app.data.sentiment_arrays import load_array_model
+from app.utils.cache import TTLCache
+from app.utils.metrics import compute_seconds, timed
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # folder of fetch_news.py
 MODEL_PATH = os.path.join(BASE_DIR, "sentiment_classifier.joblib")
 VECTORIZER_PATH = os.path.join(BASE_DIR, "count_vectorizer.joblib")
 
-classifier = joblib.load(MODEL_PATH)
-cv = joblib.load(VECTORIZER_PATH)
+
+class SentimentModel:
+    """The fitted vectorizer and classifier, plus precomputed sparse GaussianNB terms."""
+
+    def __init__(self, cv, classifier):
+        from sklearn.naive_bayes import GaussianNB
+        self.cv = cv
+        self.classifier = classifier
+        self.nb_terms = _gaussian_nb_sparse_terms(classifier) if isinstance(classifier, GaussianNB) else None
+        self.lowercase = cv.lowercase
+
+    def predict_labels(self, titles):
+        return _predict_labels(self, self.cv.transform(titles))
+
+    def predict_one(self, text):
+        # Preprocess input same way as training
+        return self.classifier.predict(self.cv.transform([text]).toarray())[0]
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_sentiment_model():
+    """
+    Load the sentiment model on first use rather than at import, so workers
+    that only serve reads never import sklearn or hold the model in memory.
+    The memory-mapped array export is preferred when it matches the .joblib
+    files; it needs neither sklearn nor a private copy per worker.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load_array_model(model_version())
+                if _model is not None:
+                    logging.info("Loaded sentiment model (memory-mapped arrays)")
+                else:
+                    import joblib
+                    _model = SentimentModel(joblib.load(VECTORIZER_PATH), joblib.load(MODEL_PATH))
+                    logging.info("Loaded sentiment model")
+    return _model
+
+
+_model_version = None
+
+
+def model_version():
+    """
+    Short digest of the vectorizer and classifier files, stored with each
+    classified headline; it changes whenever either file is replaced.
+    """
+    global _model_version
+    if _model_version is None:
+        digest = hashlib.blake2b(digest_size=6)
+        for path in (VECTORIZER_PATH, MODEL_PATH):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        _model_version = digest.hexdigest()
+    return _model_version
+
+
+def warm_up():
+    """Load models ahead of the first request (called from the app lifespan when WARM_MODELS is set)."""
+    get_sentiment_model()
 
 
 def predict_sentiment(text: str) -> str:
     """Predict sentiment using trained model"""
-    # Preprocess input same way as training
-    text_vector = cv.transform([text]).toarray()
-    prediction = classifier.predict(text_vector)[0]
+    prediction = get_sentiment_model().predict_one(text)
     return "positive" if prediction == 1 else "negative"
 
-def fetch_and_store_news(company_name, company_id):
-    logging.info(f"Fetching news for {company_name} (company_id={company_id})")
-    url = "https://newsapi.org/v2/everything"
-    params = {
-        "q": company_name,
-        "sortBy": "publishedAt",
-        "pageSize": 5,  # Latest 5 headlines
-        "apiKey": NEWS_API_KEY
-    }
-    resp = requests.get(url, params=params)
-    if resp.status_code != 200:
-        logging.error(f"News API error {resp.status_code} for {company_name}")
-        return
 
-    news_items = resp.json().get("articles", [])
-    logging.info(f"Fetched {len(news_items)} news articles for {company_name}")
-    for article in news_items:
+# Syndicated headlines repeat across companies; memoize by normalized-title hash
+_sentiment_cache = TTLCache(maxsize=SENTIMENT_CACHE_SIZE, ttl=None)
+
+
+def _title_key(title, lowercase):
+    normalized = " ".join(title.split())
+    if lowercase:
+        normalized = normalized.lower()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+
+def _gaussian_nb_sparse_terms(model):
+    # GaussianNB only accepts dense input. Its joint log-likelihood
+    #   log P(c) - 0.5 * sum(log(2*pi*var)) - 0.5 * sum((x - theta)^2 / var)
+    # expands to a per-class constant plus two sparse dot products, so the
+    # count matrix never has to be densified.
+    inv_var = 1.0 / model.var_
+    const = (
+        np.log(model.class_prior_)
+        - 0.5 * np.sum(np.log(2.0 * np.pi * model.var_), axis=1)
+        - 0.5 * np.sum(model.theta_ ** 2 * inv_var, axis=1)
+    )
+    return const, inv_var.T, (model.theta_ * inv_var).T
+
+
+def _predict_labels(model, X):
+    """classifier.predict over a sparse count matrix."""
+    if model.nb_terms is None:
+        return model.classifier.predict(X)
+    const, inv_var_t, theta_inv_var_t = model.nb_terms
+    X = X.astype(np.float64)
+    jll = const - 0.5 * (X.multiply(X) @ inv_var_t) + X @ theta_inv_var_t
+    return model.classifier.classes_[np.argmax(jll, axis=1)]
+
+
+def predict_sentiment_batch(titles):
+    """
+    Predict sentiment for many titles with one vectorizer pass and one model call.
+    The count matrix stays sparse; results are memoized per normalized title.
+    """
+    model = get_sentiment_model()
+    keys = [_title_key(t, model.lowercase) for t in titles]
+    results = [_sentiment_cache.get(k, None) for k in keys]
+    pending = {}  # key -> title, deduplicated within the batch
+    for key, title, result in zip(keys, titles, results):
+        if result is None:
+            pending.setdefault(key, title)
+    if pending:
+        with timed(compute_seconds, "sentiment_inference", timing="sentiment"):
+            labels = model.predict_labels(list(pending.values()))
+        fresh = {}
+        for key, label in zip(pending, labels):
+            fresh[key] = "positive" if label == 1 else "negative"
+            _sentiment_cache.set(key, fresh[key])
+        results = [r if r is not None else fresh[k] for k, r in zip(keys, results)]
+    return results
+
+
+def _news_rows(news_items, company_id):
+    rows = []
+    sentiments = predict_sentiment_batch([article["title"] for article in news_items])
+    version = model_version()
+    for article, sentiment in zip(news_items, sentiments):
         title = article["title"]
         news_url = article["url"]
         published_at = article["publishedAt"]
 
-        sentiment = predict_sentiment(title)
-
         # sentiment = ("negative" if any(x in title.lower() for x in ["loss", "down", "lawsuit", "fraud", "resign"])
         #              else "positive" if any(x in title.lower() for x in ["profit", "up", "record", "raises", "growth"])
         #              else "neutral")
 
-        logging.info(f"Inserting news: '{title[:60]}...' for company_id={company_id} with sentiment={sentiment}")
-        supabase.table("news").insert({
+        logging.info(f"Storing news: '{title[:60]}...' for company_id={company_id} with sentiment={sentiment}")
+        rows.append({
             "company_id": company_id,
             "title": title,
             "url": news_url,
             "date": published_at,
             "sentiment": sentiment,
-        }).execute()
+            "model_version": version,
+        })
+    return rows
+
+
+def fetch_and_store_news(company_name, company_id, writer=None):
+    """
+    Fetch the latest headlines for a company and upsert them in one bulk write.
+    Pass a NewsBatchWriter as `writer` to batch the write with other companies.
+    """
+    logging.info(f"Fetching news for {company_name} (company_id={company_id})")
+    news_items = fetch_news_articles(company_name, page_size=5)  # Latest 5 headlines
+    if news_items is None:
+        return
+
+    logging.info(f"Fetched {len(news_items)} news articles for {company_name}")
+    rows = _news_rows(news_items, company_id)
+    if writer is not None:
+        writer.add(rows)
+    else:
+        upsert_news(rows)
     logging.info(f"Completed storing news for {company_name}")
+
@@ -0,0 +1,50 @@
+import time
+from app.data.fetch_financials import save_company_and_financials
+from app.data.repository import load_company_bundle
+from app.ml.scoring import input_fingerprint, log_score, score_with_explanation
+
+
+def _retry_fetch(fetch_fn, max_retries=5, base_delay=0.3):
+    # Retry logic for eventual consistency
+    delay = base_delay
+    for attempt in range(max_retries):
+        result = fetch_fn()
+        if result:
+            return result
+        time.sleep(delay)
+        delay *= 2
+    return None
+
+
+def ingest_company(job, ticker):
+    """
+    Background job body for POST /add_company: fetch and store company,
+    financials and news, then score and log. Runs on a JobQueue worker thread.
+    """
+    with job.stage("save_company_and_financials"):
+        save_company_and_financials(ticker)
+
+    with job.stage("load"):
+        # Company, latest financials and recent news in one round trip
+        bundle = _retry_fetch(lambda: load_company_bundle(ticker))
+        if not bundle:
+            raise RuntimeError("Company insert failed (timing issue)")
+    company_id = bundle["company"]["id"]
+    financials = bundle["financials"] or {}
+    news_items = bundle["news"]
+
+    with job.stage("score"):
+        result = score_with_explanation(financials, news_items)
+        score = result["score"]
+
+    with job.stage("log_score"):
+        log_score(company_id, score, result, input_fingerprint(bundle["financials"], news_items))
+
+    return {
+        "message": "Company created and scored",
+        "id": company_id,
+        "ticker": ticker,
+        "score": score,
+        "explanation": result["plain_summary"],
+        "feature_contributions": result["feature_contributions"]
+    }
@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+from app.utils.db import supabase
+from app.data.repository import get_ticker
+from app.utils.cache import invalidate_ticker, invalidate_namespaces
+from app.ml.data_versions import get_data_versions
+
+# Requires the unique index from migrations/001_news_company_url_unique.sql
+NEWS_CONFLICT_KEY = "company_id,url"
+
+
+def dedupe_news_rows(rows):
+    """
+    Drop repeated (company_id, url) pairs, keeping the last one. Postgres rejects
+    an upsert that touches the same conflict key twice in one statement.
+    """
+    unique = {}
+    for row in rows:
+        key = (row["company_id"], row["url"]) if row.get("url") else id(row)
+        unique[key] = row
+    return list(unique.values())
+
+
+def invalidate_news_cache(company_ids):
+    for company_id in set(company_ids):
+        ticker = get_ticker(company_id)
+        if ticker:
+            invalidate_ticker(ticker, ("news", "score"))
+        else:
+            invalidate_namespaces(("news", "score"))
+            return
+
+
+def upsert_news(rows):
+    """Write all rows in one bulk upsert keyed on (company_id, url)."""
+    rows = dedupe_news_rows(rows)
+    if not rows:
+        return
+    supabase.table("news").upsert(rows, on_conflict=NEWS_CONFLICT_KEY).execute()
+    get_data_versions().record("news", rows)
+    invalidate_news_cache(row["company_id"] for row in rows)
+
+
+class NewsBatchWriter:
+    """
+    Cross-company news writer: buffers rows and flushes them with upsert_news
+    every `flush_rows` rows or `flush_ms` milliseconds, whichever comes first.
+    add() never does I/O; flushing happens on a background thread. Rows of a
+    failed flush are not retried: their company ids are kept in `failed`
+    (company_id -> error) for the caller to report after close().
+    """
+
+    def __init__(self, flush_rows=500, flush_ms=1000):
+        self.flush_rows = flush_rows
+        self.flush_ms = flush_ms
+        self._rows = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self.flushes = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.failed = {}
+        self._thread = threading.Thread(target=self._run, name="news-batch-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, rows):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("NewsBatchWriter is closed")
+            self._rows.extend(rows)
+            if len(self._rows) >= self.flush_rows:
+                self._cond.notify()
+
+    def _take(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def _write(self, rows):
+        for i in range(0, len(rows), self.flush_rows):
+            chunk = rows[i:i + self.flush_rows]
+            try:
+                upsert_news(chunk)
+                self.flushes += 1
+                self.rows_written += len(chunk)
+            except Exception as e:
+                logging.error(f"News batch flush of {len(chunk)} rows failed: {e}")
+                self.rows_failed += len(chunk)
+                for row in chunk:
+                    self.failed[row["company_id"]] = str(e)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_ms / 1000
+                while not self._closed and len(self._rows) < self.flush_rows:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                rows = self._take()
+                closed = self._closed
+            if rows:
+                self._write(rows)
+            if closed:
+                return
+
+    def close(self):
+        """Flush whatever is buffered and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,200 @@
+"""
+External data sources: yfinance for company profiles and statements, NewsAPI
+for headlines. DATA_PROVIDER=fake swaps in the deterministic offline providers
+from app.data.fake_providers.
+
+Live calls go through one provider layer: raw responses are cached on disk,
+concurrent requests for the same ticker or query share one fetch, each
+service is rate limited with a token bucket, and NewsAPI sits behind a
+circuit breaker so quota exhaustion returns cached or no news quickly instead
+of tying up workers.
+"""
+import logging
+import os
+from app.config import (
+    BULK_CONCURRENCY, DATA_PROVIDER, NEWS_API_KEY, HTTP_TIMEOUT, PROVIDER_CACHE_DIR,
+    YFINANCE_CACHE_TTL, NEWSAPI_CACHE_TTL, YFINANCE_RATE_LIMIT, NEWSAPI_RATE_LIMIT,
+    NEWSAPI_BREAKER_FAILURES, NEWSAPI_BREAKER_RESET,
+)
+from app.utils.cache import MISSING, DiskTTLCache
+from app.utils.metrics import provider_call_seconds, provider_call_errors, timed
+from app.utils.resilience import CircuitBreaker, CircuitOpen, SingleFlight, TokenBucket
+
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+# NewsAPI answers 429 (rate limited) and 426 (plan limit) once the quota is used up
+NEWSAPI_QUOTA_STATUSES = (426, 429)
+
+_flight = SingleFlight()
+_yfinance_bucket = TokenBucket(YFINANCE_RATE_LIMIT)
+_newsapi_bucket = TokenBucket(NEWSAPI_RATE_LIMIT)
+newsapi_breaker = CircuitBreaker(NEWSAPI_BREAKER_FAILURES, NEWSAPI_BREAKER_RESET)
+statements_cache = DiskTTLCache(os.path.join(PROVIDER_CACHE_DIR, "yfinance"), YFINANCE_CACHE_TTL)
+news_cache = DiskTTLCache(os.path.join(PROVIDER_CACHE_DIR, "newsapi"), NEWSAPI_CACHE_TTL)
+_session = None
+
+
+def _cache_enabled(cache):
+    # The fake providers are already local and deterministic
+    return DATA_PROVIDER != "fake" and bool(PROVIDER_CACHE_DIR) and cache.ttl > 0
+
+
+def _cache_get(cache, key, allow_stale=False):
+    if not _cache_enabled(cache):
+        return MISSING
+    return cache.get(key, allow_stale=allow_stale)
+
+
+def _cache_set(cache, key, value):
+    if not _cache_enabled(cache):
+        return
+    try:
+        cache.set(key, value)
+    except OSError as e:
+        logging.warning(f"Provider cache write failed for {key}: {e}")
+
+
+def _news_session():
+    """One pooled keep-alive session for NewsAPI, created on first use."""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=BULK_CONCURRENCY))
+        _session = session
+    return _session
+
+
+def get_ticker(symbol):
+    """An object exposing yfinance's Ticker surface (.info, .financials, .balance_sheet)."""
+    if DATA_PROVIDER == "fake":
+        from app.data.fake_providers import FakeTicker
+        return FakeTicker(symbol)
+    import yfinance as yf
+    return yf.Ticker(symbol)
+
+
+def get_tickers(symbols):
+    """symbol -> Ticker for many symbols, built on one shared session."""
+    if DATA_PROVIDER == "fake":
+        from app.data.fake_providers import FakeTicker
+        return {s: FakeTicker(s) for s in symbols}
+    import yfinance as yf
+    return yf.Tickers(list(symbols)).tickers
+
+
+def _yfinance_get(ticker, attribute):
+    """One yfinance HTTP call (a Ticker attribute), charged to the rate limit and timed."""
+    if DATA_PROVIDER != "fake":
+        _yfinance_bucket.acquire()
+    with timed(provider_call_seconds, "yfinance", attribute, timing="yfinance", errors=provider_call_errors):
+        return getattr(ticker, attribute)
+
+
+def _frame_to_json(frame):
+    """A statement DataFrame as JSON-safe {"index", "columns", "data"} (NaN as None)."""
+    if frame is None:
+        return None
+    values = frame.astype(object).where(frame.notna(), None)
+    return {
+        "index": [str(i) for i in frame.index],
+        "columns": [c.isoformat() if hasattr(c, "isoformat") else str(c) for c in frame.columns],
+        "data": values.values.tolist(),
+    }
+
+
+def _frame_from_json(data):
+    if data is None:
+        return None
+    import pandas as pd
+    return pd.DataFrame(data["data"], index=data["index"], columns=pd.to_datetime(data["columns"], errors="coerce"))
+
+
+def fetch_statements(symbol, stock=None):
+    """
+    (info, financials, balance_sheet) for `symbol`, from the disk cache while fresh. `stock`
+    is an already built Ticker (e.g. from get_tickers); yfinance does its
+    network I/O lazily on these attributes, so this is where it is timed.
+    """
+    key = f"yfinance:statements:{symbol.upper()}"
+
+    def load():
+        cached = _cache_get(statements_cache, key)
+        if cached is not MISSING:
+            return cached["info"], _frame_from_json(cached["financials"]), _frame_from_json(cached["balance_sheet"])
+        ticker = stock if stock is not None else get_ticker(symbol)
+        info = _yfinance_get(ticker, "info")
+        financials = _yfinance_get(ticker, "financials")
+        balance_sheet = _yfinance_get(ticker, "balance_sheet")
+        if info:
+            _cache_set(statements_cache, key, {
+                "info": info,
+                "financials": _frame_to_json(financials),
+                "balance_sheet": _frame_to_json(balance_sheet),
+            })
+        return info, financials, balance_sheet
+
+    return _flight.do(key, load)
+
+
+def _request_news(query, page_size):
+    """One NewsAPI call: (articles or None, HTTP status)."""
+    if DATA_PROVIDER == "fake":
+        from app.data.fake_providers import fake_news_articles
+        return fake_news_articles(query, page_size), 200
+    _newsapi_bucket.acquire()
+    params = {
+        "q": query,
+        "sortBy": "publishedAt",
+        "pageSize": page_size,
+        "apiKey": NEWS_API_KEY
+    }
+    resp = _news_session().get(NEWS_API_URL, params=params, timeout=HTTP_TIMEOUT)
+    if resp.status_code != 200:
+        return None, resp.status_code
+    return resp.json().get("articles", []), 200
+
+
+def fetch_news_articles(query, page_size=5):
+    """
+    Latest articles for `query` as NewsAPI article dicts, or None when the API
+    call fails. While the circuit breaker is open, or when a call fails, the
+    last cached response is returned if there is one, however old.
+    """
+    key = f"newsapi:{page_size}:{query}"
+
+    def fallback():
+        stale = _cache_get(news_cache, key, allow_stale=True)
+        return None if stale is MISSING else stale
+
+    def load():
+        cached = _cache_get(news_cache, key)
+        if cached is not MISSING:
+            return cached
+        try:
+            newsapi_breaker.before_call()
+        except CircuitOpen:
+            provider_call_errors.inc("newsapi", "circuit_open")
+            return fallback()
+        try:
+            with timed(provider_call_seconds, "newsapi", "everything", timing="newsapi"):
+                articles, status = _request_news(query, page_size)
+        except Exception as e:
+            newsapi_breaker.record_failure()
+            provider_call_errors.inc("newsapi", "everything")
+            logging.error(f"News API request failed for {query}: {e}")
+            return fallback()
+        if articles is None:
+            provider_call_errors.inc("newsapi", "everything")
+            if status in NEWSAPI_QUOTA_STATUSES:
+                newsapi_breaker.trip()
+                logging.warning(f"News API quota exhausted ({status}); pausing calls for {NEWSAPI_BREAKER_RESET:g}s")
+            else:
+                newsapi_breaker.record_failure()
+                logging.error(f"News API error {status} for {query}")
+            return fallback()
+        newsapi_breaker.record_success()
+        _cache_set(news_cache, key, articles)
+        return articles
+
+    return _flight.do(key, load)
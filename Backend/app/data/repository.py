@@ -0,0 +1,147 @@
+import threading
+from app.utils.db import supabase, get_async_supabase
+
+# In-process ticker -> company_id map. Company ids never change once assigned,
+# so entries are only ever added; unknown tickers are not cached.
+_company_ids = {}
+_company_tickers = {}
+_company_ids_lock = threading.Lock()
+
+NEWS_LIMIT = 5
+
+
+def remember_company(ticker, company_id):
+    with _company_ids_lock:
+        _company_ids[ticker] = company_id
+        _company_tickers[company_id] = ticker
+
+
+def get_ticker(company_id):
+    """Reverse lookup from the in-process map; None if this process has not seen the company."""
+    return _company_tickers.get(company_id)
+
+
+def get_company_id(ticker):
+    """Return the company id for `ticker`, querying `companies` only on a map miss."""
+    company_id = _company_ids.get(ticker)
+    if company_id is not None:
+        return company_id
+    data = supabase.table("companies").select("id").eq("ticker", ticker).execute().data
+    if not data:
+        return None
+    remember_company(ticker, data[0]["id"])
+    return data[0]["id"]
+
+
+async def aget_company_id(ticker):
+    company_id = _company_ids.get(ticker)
+    if company_id is not None:
+        return company_id
+    client = await get_async_supabase()
+    data = (await client.table("companies").select("id").eq("ticker", ticker).execute()).data
+    if not data:
+        return None
+    remember_company(ticker, data[0]["id"])
+    return data[0]["id"]
+
+
+def _bundle_query(client, news_limit, score_columns=None):
+    # Embedded select: profile, latest financials row and latest news (and
+    # optionally the latest logged score) in one PostgREST request
+    query = (
+        client.table("companies")
+        .select(f"*, financials(*), news(*){f', scores({score_columns})' if score_columns else ''}")
+        .order("date", desc=True, foreign_table="financials")
+        .limit(1, foreign_table="financials")
+        .order("date", desc=True, foreign_table="news")
+        .order("id", desc=True, foreign_table="news")
+        .limit(news_limit, foreign_table="news")
+    )
+    if score_columns:
+        query = query.order("date", desc=True, foreign_table="scores").limit(1, foreign_table="scores")
+    return query
+
+
+def _split_bundle(row):
+    financials = row.pop("financials", None) or []
+    news = row.pop("news", None) or []
+    bundle = {"financials": financials[0] if financials else None, "news": news}
+    if "scores" in row:
+        scores = row.pop("scores") or []
+        bundle["score"] = scores[0] if scores else None
+    remember_company(row["ticker"], row["id"])
+    return {"company": row, **bundle}
+
+
+def load_company_bundle(ticker, news_limit=NEWS_LIMIT):
+    """
+    Load a company's profile, latest financials and recent news in one round trip.
+    Returns {"company", "financials", "news"} or None when the ticker is unknown.
+    """
+    data = _bundle_query(supabase, news_limit).eq("ticker", ticker).execute().data
+    if not data:
+        return None
+    return _split_bundle(data[0])
+
+
+async def aload_company_bundle(ticker, news_limit=NEWS_LIMIT, score_columns=None):
+    """With `score_columns`, the bundle also carries the latest logged score as "score"."""
+    client = await get_async_supabase()
+    data = (await _bundle_query(client, news_limit, score_columns).eq("ticker", ticker).execute()).data
+    if not data:
+        return None
+    return _split_bundle(data[0])
+
+
+def load_company_bundles(tickers, news_limit=NEWS_LIMIT):
+    """Same as load_company_bundle for many tickers: one round trip per `in` chunk."""
+    data = _bundle_query(supabase, news_limit).in_("ticker", tickers).execute().data or []
+    return [_split_bundle(row) for row in data]
+
+
+async def aload_company_bundles(tickers, news_limit=NEWS_LIMIT):
+    client = await get_async_supabase()
+    data = (await _bundle_query(client, news_limit).in_("ticker", tickers).execute()).data or []
+    return [_split_bundle(row) for row in data]
+
+
+def _snapshot_query(client):
+    """
+    Embedded select of just the columns that fingerprint a company's scoring
+    inputs (latest financials id/date, latest news ids/sentiments), plus its
+    latest logged score.
+    """
+    return (
+        client.table("companies")
+        .select("id,ticker,financials(id,date),news(id,sentiment),scores(input_fingerprint)")
+        .order("date", desc=True, foreign_table="financials")
+        .limit(1, foreign_table="financials")
+        .order("date", desc=True, foreign_table="news")
+        .order("id", desc=True, foreign_table="news")
+        .limit(NEWS_LIMIT, foreign_table="news")
+        .order("date", desc=True, foreign_table="scores")
+        .limit(1, foreign_table="scores")
+    )
+
+
+def _split_snapshot(row):
+    financials = row.get("financials") or []
+    scores = row.get("scores") or []
+    remember_company(row["ticker"], row["id"])
+    return {
+        "id": row["id"],
+        "ticker": row["ticker"],
+        "financials": financials[0] if financials else None,
+        "news": row.get("news") or [],
+        "score": scores[0] if scores else None,
+    }
+
+
+def load_score_snapshots(after=None, limit=200):
+    """One keyset page (by company id) of score snapshots; see _snapshot_query."""
+    query = _snapshot_query(supabase)
+    if after is not None:
+        query = query.gt("id", after)
+    data = query.order("id").limit(limit).execute().data or []
+    return [_split_snapshot(row) for row in data]
+
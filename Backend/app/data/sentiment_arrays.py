@@ -0,0 +1,128 @@
+"""
+The sentiment model exported as flat NumPy arrays. API workers memory-map one
+on-disk copy (the OS shares the pages between processes) instead of each
+unpickling the CountVectorizer's vocabulary dict and importing sklearn.
+Predictions match the joblib model.
+
+    python -m app.data.sentiment_arrays    # re-export after replacing the .joblib files
+"""
+import json
+import logging
+import os
+import re
+import numpy as np
+
+ARRAYS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sentiment_model")
+META_FILE = "meta.json"
+# vocabulary: sorted terms; term_index: feature column of each term;
+# const/inv_var/theta_inv_var: GaussianNB terms (see fetch_news._gaussian_nb_sparse_terms)
+ARRAY_NAMES = ("vocabulary", "term_index", "const", "inv_var", "theta_inv_var", "classes")
+
+
+def export_arrays(cv, classifier, source_version, directory=ARRAYS_DIR):
+    """Write the fitted CountVectorizer and GaussianNB as .npy files plus a small meta.json."""
+    from sklearn.naive_bayes import GaussianNB
+    from app.data.fetch_news import _gaussian_nb_sparse_terms
+
+    if not isinstance(classifier, GaussianNB):
+        raise ValueError(f"Only GaussianNB can be exported, got {type(classifier).__name__}")
+    if (cv.input, cv.analyzer, cv.ngram_range, cv.stop_words, cv.preprocessor, cv.tokenizer, cv.strip_accents) != (
+            "content", "word", (1, 1), None, None, None, None):
+        raise ValueError("Only single-word CountVectorizers with the default preprocessing can be exported")
+    # ArraySentimentModel uses raw int counts, as CountVectorizer(binary=False, dtype=np.int64) does
+    if cv.binary or np.dtype(cv.dtype) != np.dtype(np.int64):
+        raise ValueError(f"Only count features can be exported, got binary={cv.binary}, dtype={np.dtype(cv.dtype)}")
+
+    terms = sorted(cv.vocabulary_)
+    const, inv_var_t, theta_inv_var_t = _gaussian_nb_sparse_terms(classifier)
+    arrays = {
+        "vocabulary": np.array(terms, dtype=str),
+        "term_index": np.array([cv.vocabulary_[t] for t in terms], dtype=np.int32),
+        "const": const,
+        "inv_var": np.ascontiguousarray(inv_var_t),
+        "theta_inv_var": np.ascontiguousarray(theta_inv_var_t),
+        "classes": classifier.classes_,
+    }
+    os.makedirs(directory, exist_ok=True)
+    for name in ARRAY_NAMES:
+        np.save(os.path.join(directory, f"{name}.npy"), arrays[name])
+    meta = {"lowercase": cv.lowercase, "token_pattern": cv.token_pattern, "source_version": source_version}
+    with open(os.path.join(directory, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    logging.info(f"Exported sentiment model {source_version} ({len(terms)} terms) to {directory}")
+
+
+class ArraySentimentModel:
+    """CountVectorizer + GaussianNB prediction over (optionally memory-mapped) arrays."""
+
+    def __init__(self, arrays, lowercase, token_pattern):
+        self.vocabulary = arrays["vocabulary"]
+        self.term_index = arrays["term_index"]
+        self.const = arrays["const"]
+        self.inv_var = arrays["inv_var"]
+        self.theta_inv_var = arrays["theta_inv_var"]
+        self.classes = arrays["classes"]
+        self.lowercase = lowercase
+        self._token_re = re.compile(token_pattern)
+
+    @classmethod
+    def load(cls, directory=ARRAYS_DIR, mmap_mode="r"):
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        return cls(arrays, meta["lowercase"], meta["token_pattern"]), meta["source_version"]
+
+    def _counts(self, titles):
+        """Sparse document-term counts as (doc, column, count) arrays."""
+        docs, tokens = [], []
+        for i, title in enumerate(titles):
+            found = self._token_re.findall(title.lower() if self.lowercase else title)
+            docs.extend([i] * len(found))
+            tokens.extend(found)
+        if not tokens:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        tokens = np.array(tokens, dtype=str)
+        pos = np.minimum(np.searchsorted(self.vocabulary, tokens), len(self.vocabulary) - 1)
+        known = self.vocabulary[pos] == tokens
+        docs = np.array(docs, dtype=np.int64)[known]
+        cols = self.term_index[pos[known]].astype(np.int64)
+        pairs, counts = np.unique(docs * len(self.vocabulary) + cols, return_counts=True)
+        return pairs // len(self.vocabulary), pairs % len(self.vocabulary), counts
+
+    def predict_labels(self, titles):
+        """Class labels for a list of titles, one vectorized pass."""
+        docs, cols, counts = self._counts(titles)
+        jll = np.tile(self.const, (len(titles), 1))
+        counts = counts.astype(np.float64)[:, None]
+        np.add.at(jll, docs, counts * self.theta_inv_var[cols] - 0.5 * counts * counts * self.inv_var[cols])
+        return self.classes[np.argmax(jll, axis=1)]
+
+    def predict_one(self, text):
+        return self.predict_labels([text])[0]
+
+
+def load_array_model(source_version, directory=ARRAYS_DIR):
+    """The exported model, or None when it is missing or was exported from other .joblib files."""
+    try:
+        model, exported_from = ArraySentimentModel.load(directory)
+    except (OSError, ValueError, KeyError):
+        return None
+    if exported_from != source_version:
+        logging.warning(
+            f"Sentiment arrays in {directory} are from model {exported_from}, not {source_version}; "
+            "run `python -m app.data.sentiment_arrays` to re-export")
+        return None
+    return model
+
+
+def main():
+    import joblib
+    from app.data.fetch_news import MODEL_PATH, VECTORIZER_PATH, model_version
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    export_arrays(joblib.load(VECTORIZER_PATH), joblib.load(MODEL_PATH), model_version())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Reclassify stored headlines after the sentiment model files are replaced.
+
+Streams `news` in keyset-paginated chunks, classifies the titles on a process
+pool (the model is loaded once per worker), writes back the sentiments that
+changed, tags every classified row with the current model_version, and
+checkpoints after every chunk so an interrupted run resumes where it stopped. Companies with
+changed headlines are rescored at the end.
+
+    python -m app.data.sentiment_backfill                 # all cores
+    python -m app.data.sentiment_backfill --workers 4 --chunk-size 1000
+    python -m app.data.sentiment_backfill --reset         # ignore the checkpoint
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from app.config import DB_MAX_ROWS
+from app.utils.db import supabase
+from app.data.fetch_news import model_version, predict_sentiment_batch
+from app.data.news_writer import invalidate_news_cache
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CHECKPOINT = os.path.join(BACKEND_DIR, ".cache", "sentiment_backfill.json")
+NEWS_COLUMNS = "id,company_id,title,sentiment,model_version"
+
+
+def _init_worker():
+    # Load the model once per worker process, before the first chunk arrives
+    from app.data.fetch_news import get_sentiment_model
+    get_sentiment_model()
+
+
+def classify(titles):
+    """Worker entry point: sentiments for a list of titles."""
+    return predict_sentiment_batch(titles)
+
+
+def _read_chunk(after, limit):
+    query = supabase.table("news").select(NEWS_COLUMNS)
+    if after is not None:
+        query = query.gt("id", after)
+    return query.order("id").limit(limit).execute().data or []
+
+
+def _write_changes(changed, unchanged, version):
+    """
+    One bulk update per sentiment label, and one that only tags the rows whose
+    label stayed the same, so no classified row is read as stale again.
+    """
+    by_label = {}
+    for row, sentiment in changed:
+        by_label.setdefault(sentiment, []).append(row["id"])
+    for sentiment, ids in by_label.items():
+        supabase.table("news").update({"sentiment": sentiment, "model_version": version}).in_("id", ids).execute()
+    if unchanged:
+        supabase.table("news").update({"model_version": version}).in_("id", [row["id"] for row in unchanged]).execute()
+
+
+def _fresh_state(version):
+    return {"model_version": version, "last_id": None, "rows": 0, "changed": 0, "companies": []}
+
+
+def load_checkpoint(path, version):
+    """The saved progress for `version`, or a fresh state when there is none or it was for another model."""
+    try:
+        with open(path) as f:
+            state = json.load(f)
+        if state.get("model_version") == version:
+            return state
+    except (OSError, ValueError):
+        pass
+    return _fresh_state(version)
+
+
+def save_checkpoint(path, state):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def backfill(workers=None, chunk_size=500, checkpoint=DEFAULT_CHECKPOINT, reset=False, rescore=True):
+    """
+    Run (or resume) the backfill. Returns this run's stats: rows read, rows
+    classified, rows changed, companies rescored, elapsed seconds and rows per
+    second. Totals across resumed runs are kept in the checkpoint.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    if chunk_size > DB_MAX_ROWS:
+        # A larger chunk would come back capped and read as the last one
+        logging.warning(f"chunk_size {chunk_size} is above DB_MAX_ROWS, using {DB_MAX_ROWS}")
+        chunk_size = DB_MAX_ROWS
+    version = model_version()
+    state = _fresh_state(version) if reset else load_checkpoint(checkpoint, version)
+    companies = set(state["companies"])
+    started = time.perf_counter()
+    run = {"rows": 0, "classified": 0, "changed": 0}
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers > 1 else None
+    pending = deque()  # (rows, rows to classify, future) in read order
+    after = state["last_id"]
+    exhausted = False
+    try:
+        while pending or not exhausted:
+            # Keep every worker busy with up to two chunks each
+            while not exhausted and len(pending) < max(1, workers) * 2:
+                rows = _read_chunk(after, chunk_size)
+                if len(rows) < chunk_size:
+                    exhausted = True
+                if not rows:
+                    break
+                after = rows[-1]["id"]
+                todo = [r for r in rows if r.get("model_version") != version]
+                titles = [r.get("title") or "" for r in todo]
+                if pool is not None and titles:
+                    result = pool.submit(classify, titles)
+                else:
+                    result = Future()
+                    result.set_result(classify(titles))
+                pending.append((rows, todo, result))
+            if not pending:
+                break
+
+            # Results are applied in read order so the checkpoint never skips a chunk
+            rows, todo, result = pending.popleft()
+            sentiments = result.result()
+            changed = [(row, s) for row, s in zip(todo, sentiments) if row.get("sentiment") != s]
+            unchanged = [row for row, s in zip(todo, sentiments) if row.get("sentiment") == s]
+            _write_changes(changed, unchanged, version)
+            if changed:
+                changed_ids = {row["company_id"] for row, _ in changed}
+                invalidate_news_cache(changed_ids)
+                companies.update(changed_ids)
+            run["rows"] += len(rows)
+            run["classified"] += len(todo)
+            run["changed"] += len(changed)
+            state.update(
+                last_id=rows[-1]["id"],
+                rows=state["rows"] + len(rows),
+                changed=state["changed"] + len(changed),
+                companies=sorted(companies),
+            )
+            save_checkpoint(checkpoint, state)
+            elapsed = time.perf_counter() - started
+            logging.info(
+                f"Backfill at id {state['last_id']}: {state['rows']} rows, {state['changed']} changed, "
+                f"{run['classified'] / elapsed if elapsed else 0:.0f} rows/s"
+            )
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    rescored = 0
+    if rescore and companies:
+        from app.ml.rescore import rescore_companies
+        rescored = rescore_companies(sorted(companies))
+    elapsed = time.perf_counter() - started
+    # Finished: a later run with the same model only picks up rows added since
+    state["companies"] = []
+    save_checkpoint(checkpoint, state)
+    return {
+        "model_version": version,
+        **run,
+        "companies_rescored": rescored,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(run["classified"] / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="classifier processes (1 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=500, help=f"news rows per read and per worker task (at most DB_MAX_ROWS, {DB_MAX_ROWS})")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--reset", action="store_true", help="start from the first row")
+    parser.add_argument("--no-rescore", action="store_true", help="skip rescoring affected companies")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    stats = backfill(args.workers, args.chunk_size, args.checkpoint, args.reset, rescore=not args.no_rescore)
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,57 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.utils.db import supabase
+from fastapi.responses import PlainTextResponse
+from app.utils.db import get_async_supabase, reset_async_supabase
+from app.utils.http import close_http_client
+from app.config import WARM_MODELS, RESCORE_INTERVAL, SERVER_TIMING
+from app.data.fetch_news import warm_up
+from app.data.repository import aget_company_id, aload_company_bundle
+from app.utils.cache import response_cache
+from app.utils import metrics
+from app.utils.compression import CompressionMiddleware
+from app.utils.conditional import (
+    ConditionalGetMiddleware, NotModified, acheck_ticker_etag, body_version, check_etag, not_modified_handler,
+)
+from app.utils.pagination import MAX_PAGE_SIZE, ndjson_response, paginated_response, parse_fields, wants_ndjson
 
-from app.ml.explainability import explain_score
-from app.ml.scoring import score_company, compute_credit_score
+from app.ml.scoring import input_fingerprint, score_with_explanation
+from app.ml.history import aggregate_score_history
+from app.ml.rescore import RescoreScheduler
+from app.ml.data_versions import get_data_versions
+from app.ml.leaderboard import get_leaderboard
+from app.ml.peers import get_peers
 from app.api.companies import router as companies_router
+from app.api.scores import router as scores_router, Bucket, date_filters, load_score_rows
+from app.api.jobs import router as jobs_router
+from app.api.stream import router as stream_router
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared keep-alive pool and async Supabase client up front
+    await get_async_supabase()
+    if WARM_MODELS:
+        await asyncio.to_thread(warm_up)
+    # A failed build leaves the index unbuilt and the API up; reads retry it
+    await asyncio.to_thread(get_leaderboard().try_build)
+    await asyncio.to_thread(get_peers().try_build)
+    await asyncio.to_thread(get_data_versions().try_build)
+    scheduler = RescoreScheduler().start() if RESCORE_INTERVAL > 0 else None
+    yield
+    if scheduler is not None:
+        scheduler.stop()
+    reset_async_supabase()
+    await close_http_client()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(companies_router)
+app.include_router(scores_router)
+app.include_router(jobs_router)
+app.include_router(stream_router)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,74 +59,173 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag"],
 )
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(metrics.MetricsMiddleware, server_timing=SERVER_TIMING)
+app.add_exception_handler(NotModified, not_modified_handler)
 
 @app.get("/companies")
-def get_companies():
-    companies = supabase.table("companies").select("*").execute().data
-    return companies
+async def get_companies(
+    request: Request,
+    limit: int | None = Query(None, ge=1),
+    cursor: str | None = None,
+    fields: str | None = None,
+    format: str | None = None,
+):
+    async def load():
+        client = await get_async_supabase()
+        data = (await client.table("companies").select("*").execute()).data
+        return body_version(data), data
+    # Every page and projection is versioned by the cached full list
+    version, companies = await response_cache.aget_or_set(("companies",), load)
+    check_etag(request, "companies", version)
+    # No paging/projection/streaming requested: the full list
+    if limit is None and cursor is None and fields is None and not wants_ndjson(request, format):
+        return companies
+
+    columns = parse_fields(fields, default=["*"])
+    client = await get_async_supabase()
+    if wants_ndjson(request, format):
+        return ndjson_response(client, "companies", columns, "id", cursor)
+    return await paginated_response(client, "companies", columns, "id", cursor, limit or MAX_PAGE_SIZE)
 
 @app.get("/company/{ticker}")
-def get_company(ticker: str):
-    data = supabase.table("companies").select("*").eq("ticker", ticker).execute().data
-    if not data:
-        raise HTTPException(status_code=404, detail="Company not found")
-    return data[0]
+async def get_company(ticker: str, request: Request):
+    async def load():
+        client = await get_async_supabase()
+        data = (await client.table("companies").select("*").eq("ticker", ticker).execute()).data
+        if not data:
+            raise HTTPException(status_code=404, detail="Company not found")
+        return body_version(data[0]), data[0]
+    version, company = await response_cache.aget_or_set(("company", ticker), load)
+    check_etag(request, "company", version)
+    return company
 
 
 @app.get("/news/{ticker}")
-def get_news(ticker: str):
-    data = supabase.table("companies").select("*").eq("ticker", ticker).execute().data
-    if not data or len(data) == 0:
-        raise HTTPException(status_code=404, detail="Company not found")
-    company_id = data[0]["id"]
-    news = supabase.table("news").select("*").eq("company_id", company_id).order("date", desc=True).limit(5).execute().data
-    return news
-
+async def get_news(ticker: str, request: Request):
+    await acheck_ticker_etag(request, "news", ticker)
 
-@app.get("/score/{ticker}")
-def get_score(ticker: str):
-    try:
-        # --- Fetch company and data ---
-        company = supabase.table("companies").select("*").eq("ticker", ticker).execute().data
-        if not company:
+    async def load():
+        company_id = await aget_company_id(ticker)
+        if company_id is None:
             raise HTTPException(status_code=404, detail="Company not found")
-        company_id = company[0]["id"]
-        financials_list = supabase.table("financials").select("*").eq("company_id", company_id).order("date", desc=True).limit(1).execute().data
-        if not financials_list or not isinstance(financials_list, list) or len(financials_list) == 0:
-            raise HTTPException(status_code=404, detail="Financials not found for this company")
-        financials = financials_list[0]
-        news_items = supabase.table("news").select("*").eq("company_id", company_id).order("date", desc=True).limit(5).execute().data or []
+        client = await get_async_supabase()
+        return (await client.table("news").select("*").eq("company_id", company_id).order("date", desc=True).limit(5).execute()).data
+    return await response_cache.aget_or_set(("news", ticker), load)
+
 
-        # --- Compute score ---
-        score = compute_credit_score(financials, news_items)
+LATEST_SCORE_COLUMNS = "score,explanation,feature_contributions,input_fingerprint"
 
-        # --- Generate explainability breakdown ---
-        explanation = explain_score(financials, news_items, score)  # returns dict
 
+async def _compute_score(ticker):
+    # --- Fetch company, data and latest logged score (single round trip) ---
+    bundle = await aload_company_bundle(ticker, score_columns=LATEST_SCORE_COLUMNS)
+    if not bundle:
+        raise HTTPException(status_code=404, detail="Company not found")
+    if not bundle["financials"]:
+        raise HTTPException(status_code=404, detail="Financials not found for this company")
+
+    # Latest logged score, served as-is while the inputs it was computed from are unchanged
+    latest = bundle["score"]
+    if (
+        latest
+        and latest.get("feature_contributions") is not None
+        and latest.get("input_fingerprint") == input_fingerprint(bundle["financials"], bundle["news"])
+    ):
         return {
             "ticker": ticker,
-            "score": score,
-            "explanation": explanation["plain_summary"],
-            "feature_contributions": explanation["feature_contributions"]
+            "score": latest["score"],
+            "explanation": latest["explanation"],
+            "feature_contributions": latest["feature_contributions"],
         }
+
+    # --- Score and explainability breakdown in one pass ---
+    result = score_with_explanation(bundle["financials"], bundle["news"])
+
+    return {
+        "ticker": ticker,
+        "score": result["score"],
+        "explanation": result["plain_summary"],
+        "feature_contributions": result["feature_contributions"]
+    }
+
+
+@app.get("/score/{ticker}")
+async def get_score(ticker: str):
+    try:
+        result = await response_cache.aget_or_set(("score", ticker), lambda: _compute_score(ticker))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    # Ranked outside the cache: peers keep moving while this company's score is unchanged
+    company_id = await aget_company_id(ticker)
+    return {**result, "peers": get_peers().ensure_built().peer_ranks(company_id, result["score"])}
+
+SCORE_HISTORY_FIELDS = ("id", "date", "score", "explanation")
+# Scores can share a timestamp (bulk rescoring), so pages are keyed on (date, id)
+SCORE_HISTORY_KEY = ("date", "id")
+
 
 @app.get("/score_history/{ticker}")
-def get_score_history(ticker: str):
-    company = supabase.table("companies").select("*").eq("ticker", ticker).execute().data
-    if not company:
+async def get_score_history(
+    ticker: str,
+    request: Request,
+    limit: int | None = Query(None, ge=1),
+    cursor: str | None = None,
+    fields: str | None = None,
+    format: str | None = None,
+    bucket: Bucket | None = None,
+    from_: datetime | None = Query(None, alias="from"),
+    to: datetime | None = None,
+    include_explanation: bool = False,
+):
+    await acheck_ticker_etag(request, "history", ticker)
+    company_id = await aget_company_id(ticker)
+    if company_id is None:
         raise HTTPException(status_code=404, detail="Company not found")
-    company_id = company[0]["id"]
-    scores = (
-        supabase.table("scores")
+    client = await get_async_supabase()
+    if bucket is not None:
+        rows = await load_score_rows(client, [company_id], from_, to, include_explanation)
+        return aggregate_score_history(rows, bucket, include_explanation)
+    if limit is not None or cursor is not None or fields is not None or wants_ndjson(request, format):
+        columns = parse_fields(fields, default=["date", "score", "explanation"], allowed=SCORE_HISTORY_FIELDS)
+        eq = {"company_id": company_id}
+        filters = date_filters(from_, to)
+        if wants_ndjson(request, format):
+            return ndjson_response(client, "scores", columns, SCORE_HISTORY_KEY, cursor, eq=eq, filters=filters)
+        return await paginated_response(
+            client, "scores", columns, SCORE_HISTORY_KEY, cursor, limit or MAX_PAGE_SIZE, eq=eq, filters=filters)
+    query = (
+        client.table("scores")
         .select("date,score,explanation")
         .eq("company_id", company_id)
-        .order("date", desc=False)
-        .execute()
-        .data
     )
+    for op, column, value in date_filters(from_, to):
+        query = getattr(query, op)(column, value)
+    scores = (await query.order("date", desc=False).execute()).data
     return scores
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return response_cache.stats()
+
+
+def _cache_metric_lines():
+    stats = response_cache.stats()
+    lines = []
+    for key in ("hits", "misses", "evictions", "expirations", "invalidations"):
+        name = f"response_cache_{key}_total"
+        lines += [f"# TYPE {name} counter", f"{name} {stats[key]}"]
+    lines += ["# TYPE response_cache_entries gauge", f"response_cache_entries {stats['size']}"]
+    return lines
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of request, query, provider and compute timings."""
+    return PlainTextResponse(metrics.render(_cache_metric_lines()), media_type="text/plain; version=0.0.4")
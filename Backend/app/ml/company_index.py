@@ -0,0 +1,97 @@
+"""
+Base for the in-memory per-company indexes (leaderboard, peer distributions).
+Each is built from `companies` at startup and kept current as rows are
+written; every API process holds its own copy.
+"""
+import logging
+import threading
+import time
+from app.config import DB_MAX_ROWS
+from app.utils.db import supabase
+
+BUILD_PAGE_SIZE = min(1000, DB_MAX_ROWS)
+# An index whose build failed is rebuilt by its next read, at most this often
+REBUILD_RETRY_SECONDS = 30
+
+
+def company_pages(columns, latest=(), page_size=BUILD_PAGE_SIZE):
+    """Keyset pages (by id) of `companies`, embedding only the newest row by date of each table in `latest`."""
+    after = None
+    while True:
+        query = supabase.table("companies").select(columns)
+        for table in latest:
+            query = query.order("date", desc=True, foreign_table=table).limit(1, foreign_table=table)
+        if after is not None:
+            query = query.gt("id", after)
+        rows = query.order("id").limit(page_size).execute().data or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        after = rows[-1]["id"]
+
+
+class CompanyIndex:
+    """
+    Subclasses implement _apply(*update) and _load(page_size), which returns a
+    freshly loaded instance, and list in STATE the attributes build() swaps in.
+    """
+
+    STATE = ()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._building = False
+        self._pending = []
+        self._last_attempt = None
+        self.ready = False
+
+    def _write(self, updates):
+        """Apply `_apply` argument tuples, queueing them for replay while a build is reading."""
+        with self._lock:
+            for update in updates:
+                if self._building:
+                    self._pending.append(update)
+                self._apply(*update)
+
+    def build(self, page_size=BUILD_PAGE_SIZE):
+        """(Re)load from the database without losing writes made while it runs."""
+        with self._lock:
+            self._building = True
+            self._pending = []
+        try:
+            fresh = self._load(page_size)
+            with self._lock:
+                # Writes made while the build was reading are replayed on top
+                for update in self._pending:
+                    fresh._apply(*update)
+                for name in self.STATE:
+                    setattr(self, name, getattr(fresh, name))
+                self.ready = True
+        finally:
+            with self._lock:
+                self._building = False
+                self._pending = []
+        return self
+
+    def try_build(self, page_size=BUILD_PAGE_SIZE):
+        """build(), logging a failure instead of raising; the index is then left unbuilt."""
+        self._last_attempt = time.monotonic()
+        try:
+            self.build(page_size)
+        except Exception as e:
+            self.ready = False
+            logging.error(f"{type(self).__name__} build failed, will retry on a later read: {e}")
+        return self
+
+    def ensure_built(self):
+        """For readers: start a background build while the index is unbuilt (e.g. the startup build failed)."""
+        if self.ready:
+            return self
+        with self._lock:
+            recent = self._last_attempt is not None and time.monotonic() - self._last_attempt < REBUILD_RETRY_SECONDS
+            if self._building or recent:
+                return self
+            self._last_attempt = time.monotonic()
+        threading.Thread(target=self.try_build, name=f"{type(self).__name__}-build", daemon=True).start()
+        return self
@@ -0,0 +1,104 @@
+"""
+Per-company data timestamps: the date of the latest score, headline and
+financials period, and the sentiment model of that headline. ETags of the
+per-ticker read endpoints are derived from them (app.utils.conditional), so
+every process tags the same data with the same ETag.
+"""
+import logging
+from datetime import datetime, timezone
+from app.utils.db import get_async_supabase
+from app.ml.company_index import BUILD_PAGE_SIZE, CompanyIndex, company_pages
+
+VERSION_TABLES = ("scores", "news", "financials")
+VERSION_COLUMNS = "id,ticker,scores(date),news(date,model_version),financials(date)"
+
+
+def _stamp(value):
+    """A date as written or as read back, in one canonical form every process compares alike."""
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return str(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def _row_updates(row):
+    """_apply arguments for a `companies` row embedding the latest row of each VERSION_TABLES table."""
+    updates = [(row["id"], None, None, None, row["ticker"])]
+    for table in VERSION_TABLES:
+        if row.get(table):
+            latest = row[table][0]
+            updates.append((row["id"], table, latest.get("date"), latest.get("model_version")))
+    return updates
+
+
+class DataVersions(CompanyIndex):
+    STATE = ("_versions", "_ids")
+
+    def __init__(self):
+        super().__init__()
+        self._versions = {}  # company_id -> {table: latest date, "model_version": of the latest headline}
+        self._ids = {}       # ticker -> company_id
+
+    def __len__(self):
+        return len(self._ids)
+
+    # --- reads ---
+    def version(self, ticker):
+        """The ticker's data timestamps as a tuple, or None when this process has not seen the ticker."""
+        company_id = self._ids.get(ticker)
+        if company_id is None:
+            return None
+        versions = self._versions.get(company_id, {})
+        return tuple(versions.get(key) for key in (*VERSION_TABLES, "model_version"))
+
+    async def arefresh(self, ticker):
+        """Re-read one ticker's timestamps (another process may have written since); None for an unknown ticker."""
+        client = await get_async_supabase()
+        query = client.table("companies").select(VERSION_COLUMNS).eq("ticker", ticker)
+        for table in VERSION_TABLES:
+            query = query.order("date", desc=True, foreign_table=table).limit(1, foreign_table=table)
+        rows = (await query.execute()).data
+        if not rows:
+            return None
+        self._write(_row_updates(rows[0]))
+        return self.version(ticker)
+
+    # --- writes ---
+    def record(self, table, rows):
+        """Apply written `table` rows (scores, news or financials); dates older than the latest are ignored."""
+        self._write([(row["company_id"], table, row.get("date"), row.get("model_version")) for row in rows])
+
+    def _apply(self, company_id, table, date, model_version=None, ticker=None):
+        if ticker is not None:
+            self._ids[ticker] = company_id
+        date = _stamp(date)
+        if table is None or date is None:
+            return
+        versions = self._versions.setdefault(company_id, {})
+        current = versions.get(table)
+        if current is not None and date < current:
+            return
+        versions[table] = date
+        if table == "news":
+            versions["model_version"] = model_version
+
+    def _load(self, page_size=BUILD_PAGE_SIZE):
+        fresh = DataVersions()
+        for rows in company_pages(VERSION_COLUMNS, VERSION_TABLES, page_size):
+            for row in rows:
+                for update in _row_updates(row):
+                    fresh._apply(*update)
+        logging.info(f"Data versions built for {len(fresh._ids)} companies")
+        return fresh
+
+
+_data_versions = DataVersions()
+
+
+def get_data_versions():
+    return _data_versions
@@ -0,0 +1,36 @@
+BUCKET_PERIODS = {"day": "D", "week": "W", "month": "M"}
+
+
+def aggregate_score_history(rows, bucket, include_explanation=False, by=None):
+    """
+    Reduce raw score rows ({"date", "score", ["explanation"]}) to one entry per
+    day/week/month with min, max, mean, last score and row count, using a
+    single vectorized pandas groupby. Buckets are labelled by their start date.
+
+    With `by` (e.g. "company_id") the rows are grouped on that column as well
+    and a {value: [buckets]} dict is returned instead of a list.
+    """
+    import pandas as pd
+
+    if not rows:
+        return {} if by else []
+    df = pd.DataFrame(rows)
+    # Stored dates mix naive UTC and offset-aware ISO strings
+    dates = pd.to_datetime(df["date"], utc=True, format="ISO8601").dt.tz_convert(None)
+    df = df.assign(date=dates, score=pd.to_numeric(df["score"], errors="coerce")).sort_values("date", kind="stable")
+    df["bucket"] = df["date"].dt.to_period(BUCKET_PERIODS[bucket]).dt.start_time.dt.strftime("%Y-%m-%d")
+    keys = [by, "bucket"] if by else ["bucket"]
+
+    grouped = df.groupby(keys, sort=True)
+    stats = grouped["score"].agg(["min", "max", "mean", "last", "count"])
+    stats["mean"] = stats["mean"].round(2)
+    if include_explanation:
+        stats["explanation"] = grouped["explanation"].last()
+    stats = stats.reset_index()
+
+    if not by:
+        return stats.to_dict(orient="records")
+    return {
+        key: group.drop(columns=by).to_dict(orient="records")
+        for key, group in stats.groupby(by, sort=False)
+    }
@@ -0,0 +1,112 @@
+"""Latest score per company, sorted overall and per sector, so /scores/top and /scores/bottom are slices."""
+import bisect
+import logging
+from app.utils.db import supabase
+from app.ml.company_index import BUILD_PAGE_SIZE, CompanyIndex, company_pages
+
+
+class Leaderboard(CompanyIndex):
+    STATE = ("_latest", "_companies", "_ranked")
+
+    def __init__(self):
+        super().__init__()
+        self._latest = {}     # company_id -> (score, date)
+        self._companies = {}  # company_id -> (ticker, sector)
+        self._ranked = {None: []}  # sector (None = all) -> sorted [(score, company_id)]
+
+    def __len__(self):
+        return len(self._latest)
+
+    # --- reads ---
+    def top(self, limit, sector=None):
+        """Highest `limit` latest scores, best first."""
+        with self._lock:
+            ranked = self._ranked.get(sector, [])
+            return [self._entry(cid) for _, cid in reversed(ranked[-limit:])] if limit > 0 else []
+
+    def bottom(self, limit, sector=None):
+        """Lowest `limit` latest scores, riskiest first."""
+        with self._lock:
+            ranked = self._ranked.get(sector, [])
+            return [self._entry(cid) for _, cid in ranked[:limit]]
+
+    def ticker(self, company_id):
+        meta = self._companies.get(company_id)
+        return meta[0] if meta else None
+
+    def sectors(self):
+        with self._lock:
+            return {sector: len(ranked) for sector, ranked in self._ranked.items() if sector is not None}
+
+    def _entry(self, company_id):
+        score, date = self._latest[company_id]
+        ticker, sector = self._companies[company_id]
+        return {"ticker": ticker, "sector": sector, "score": score, "date": date}
+
+    # --- writes ---
+    def record(self, company_id, score, date, ticker=None, sector=None):
+        """
+        Apply a newly logged score. Older-than-latest scores are ignored.
+        `ticker`/`sector` are looked up from `companies` when not given and
+        the company is not indexed yet.
+        """
+        if ticker is None and company_id not in self._companies:
+            row = supabase.table("companies").select("ticker,sector").eq("id", company_id).execute().data
+            if not row:
+                return
+            ticker, sector = row[0]["ticker"], row[0].get("sector")
+        self._write([(company_id, score, date, ticker, sector)])
+
+    def record_company(self, company_id, ticker=None, sector=None):
+        """Re-file a scored company under a changed ticker or sector (e.g. after POST /company)."""
+        self._write([(company_id, None, None, ticker, sector)])
+
+    def _apply(self, company_id, score, date, ticker=None, sector=None):
+        current = self._latest.get(company_id)
+        if score is None:
+            # record_company: keep the latest score, change only ticker/sector
+            if current is None:
+                return
+            score, date = current
+            old_ticker, old_sector = self._companies[company_id]
+            ticker, sector = ticker or old_ticker, sector or old_sector
+        if current is not None and date is not None and current[1] is not None and str(date) < str(current[1]):
+            return
+        old_meta = self._companies.get(company_id)
+        new_meta = (ticker, sector or None) if ticker is not None else old_meta
+        if current is not None:
+            self._remove((current[0], company_id), old_meta[1])
+        self._latest[company_id] = (score, date)
+        self._companies[company_id] = new_meta
+        self._insert((score, company_id), new_meta[1])
+
+    def _insert(self, key, sector):
+        bisect.insort(self._ranked[None], key)
+        if sector:
+            bisect.insort(self._ranked.setdefault(sector, []), key)
+
+    def _remove(self, key, sector):
+        for name in (None, sector) if sector else (None,):
+            ranked = self._ranked.get(name)
+            i = bisect.bisect_left(ranked, key)
+            if i < len(ranked) and ranked[i] == key:
+                del ranked[i]
+            if name is not None and not ranked:
+                del self._ranked[name]
+
+    def _load(self, page_size=BUILD_PAGE_SIZE):
+        fresh = Leaderboard()
+        for rows in company_pages("id,ticker,sector,scores(score,date)", ("scores",), page_size):
+            for row in rows:
+                if row.get("scores"):
+                    latest = row["scores"][0]
+                    fresh._apply(row["id"], latest["score"], latest["date"], row["ticker"], row.get("sector"))
+        logging.info(f"Leaderboard built with {len(fresh._latest)} companies")
+        return fresh
+
+
+_leaderboard = Leaderboard()
+
+
+def get_leaderboard():
+    return _leaderboard
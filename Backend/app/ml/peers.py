@@ -0,0 +1,148 @@
+"""Per-sector sorted arrays of latest scores and inputs; a percentile rank is two binary searches."""
+import logging
+import numpy as np
+from app.utils.db import supabase
+from app.ml.company_index import BUILD_PAGE_SIZE, CompanyIndex, company_pages
+
+# Metrics ranked within each sector. Percentiles are of the raw value, so a
+# high debt_ratio percentile means more leveraged than most peers.
+PEER_METRICS = ("score", "net_income", "revenue", "debt_ratio")
+FINANCIAL_METRICS = ("net_income", "revenue", "debt_ratio")
+_EMPTY = np.empty(0)
+
+
+def percentile_rank(sorted_values, value):
+    """Percent of `sorted_values` below `value`, counting ties as half (0-100)."""
+    n = len(sorted_values)
+    if not n or value is None:
+        return None
+    below = np.searchsorted(sorted_values, value, side="left")
+    not_above = np.searchsorted(sorted_values, value, side="right")
+    return round(100.0 * float(below + not_above) / (2 * n), 1)
+
+
+def _number(value):
+    if value is None:
+        return None
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+class PeerDistributions(CompanyIndex):
+    STATE = ("_sectors", "_values", "_sorted")
+
+    def __init__(self):
+        super().__init__()
+        self._sectors = {}  # company_id -> sector
+        self._values = {}   # company_id -> {metric: value}
+        # (sector, metric) -> sorted float array. Arrays are replaced, never
+        # mutated, so readers take a reference without locking.
+        self._sorted = {}
+
+    # --- reads ---
+    def peer_ranks(self, company_id, score=None):
+        """
+        {"sector", "peers", "percentiles": {metric: 0-100 or None}} for a
+        company, or None when its sector is unknown. `score` overrides the
+        stored latest score (e.g. one computed for this request).
+        """
+        sector = self._sectors.get(company_id)
+        if not sector:
+            return None
+        values = dict(self._values.get(company_id, {}))
+        if score is not None:
+            values["score"] = _number(score)
+        return {
+            "sector": sector,
+            "peers": len(self._sorted.get((sector, "score"), _EMPTY)),
+            "percentiles": {
+                metric: percentile_rank(self._sorted.get((sector, metric), _EMPTY), values.get(metric))
+                for metric in PEER_METRICS
+            },
+        }
+
+    def distribution(self, sector, metric):
+        """The sorted values of `metric` across `sector`."""
+        return self._sorted.get((sector, metric), _EMPTY)
+
+    # --- writes ---
+    def record_score(self, company_id, score, sector=None):
+        self._record({company_id: {"score": _number(score)}}, {company_id: sector} if sector else {})
+
+    def record_sector(self, company_id, sector):
+        """Move a company's values to a changed sector (e.g. after POST /company)."""
+        if sector:
+            self._write([(company_id, {}, sector)])
+
+    def record_financials(self, rows):
+        """Apply upserted financials rows; the latest period of each company is the one scored."""
+        latest = {}
+        for row in rows:
+            current = latest.get(row["company_id"])
+            if current is None or str(row["date"]) >= str(current["date"]):
+                latest[row["company_id"]] = row
+        self._record({cid: {m: _number(row.get(m)) for m in FINANCIAL_METRICS} for cid, row in latest.items()})
+
+    def _record(self, updates, sectors=None):
+        sectors = dict(sectors or {})
+        missing = [cid for cid in updates if cid not in sectors and cid not in self._sectors]
+        if missing:
+            rows = supabase.table("companies").select("id,sector").in_("id", missing).execute().data or []
+            sectors.update({row["id"]: row.get("sector") for row in rows})
+        self._write([(cid, values, sectors.get(cid, self._sectors.get(cid))) for cid, values in updates.items()])
+
+    def _apply(self, company_id, values, sector):
+        old_sector = self._sectors.get(company_id)
+        sector = sector or old_sector or None
+        old_values = self._values.setdefault(company_id, {})
+        if sector != old_sector:
+            # Moved sector: take every stored value out of the old one
+            for metric, value in old_values.items():
+                self._move(old_sector, metric, value, None)
+                self._move(sector, metric, None, value)
+        self._sectors[company_id] = sector
+        for metric, value in values.items():
+            self._move(sector, metric, old_values.get(metric), value)
+            old_values[metric] = value
+
+    def _move(self, sector, metric, old, new):
+        if not sector or old == new:
+            return
+        key = (sector, metric)
+        values = self._sorted.get(key, _EMPTY)
+        if old is not None:
+            values = np.delete(values, np.searchsorted(values, old))
+        if new is not None:
+            values = np.insert(values, np.searchsorted(values, new), new)
+        self._sorted[key] = values
+
+    def _load(self, page_size=BUILD_PAGE_SIZE):
+        """Every company's latest financials and score, each sector's columns sorted at once."""
+        fresh = PeerDistributions()
+        columns = {}  # (sector, metric) -> list of values
+        pages = company_pages(
+            f"id,sector,financials({','.join(FINANCIAL_METRICS)},date),scores(score,date)",
+            ("financials", "scores"), page_size)
+        for rows in pages:
+            for row in rows:
+                sector = row.get("sector") or None
+                financials = (row.get("financials") or [{}])[0]
+                scores = (row.get("scores") or [{}])[0]
+                company = {m: _number(financials.get(m)) for m in FINANCIAL_METRICS}
+                company["score"] = _number(scores.get("score"))
+                fresh._sectors[row["id"]] = sector
+                fresh._values[row["id"]] = company
+                if sector:
+                    for metric, value in company.items():
+                        if value is not None:
+                            columns.setdefault((sector, metric), []).append(value)
+        fresh._sorted = {key: np.sort(np.array(column, dtype=float)) for key, column in columns.items()}
+        logging.info(f"Peer distributions built for {len(fresh._sectors)} companies in {len({s for s, _ in columns})} sectors")
+        return fresh
+
+
+_peers = PeerDistributions()
+
+
+def get_peers():
+    return _peers
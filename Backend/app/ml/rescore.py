@@ -0,0 +1,170 @@
+"""
+Incremental rescoring. Each run pages through companies, fingerprints their
+scoring inputs (latest financials row id/date, ids and sentiments of the latest
+news) and rescores only the companies whose fingerprint differs from the one
+stored with their latest score.
+
+    python -m app.ml.rescore            # one run, then exit (cron-friendly)
+    python -m app.ml.rescore --loop     # run every RESCORE_INTERVAL seconds
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from app.config import RESCORE_INTERVAL, RESCORE_BATCH_SIZE
+from app.utils.db import supabase
+from app.utils.cache import invalidate_ticker
+from app.utils.lease import Lease
+from app.data.repository import load_company_bundles, load_score_snapshots
+from app.ml.leaderboard import get_leaderboard
+from app.ml.peers import get_peers
+from app.ml.scoring import input_fingerprint, publish_score, score_with_explanation, _score_row
+
+
+def changed_tickers(snapshots):
+    """
+    Tickers whose current inputs no longer match the fingerprint of their latest
+    score. Companies without financials cannot be scored and are never changed.
+    """
+    changed = []
+    for snap in snapshots:
+        if not snap["financials"]:
+            continue
+        current = input_fingerprint(snap["financials"], snap["news"])
+        if snap["score"] is None or snap["score"].get("input_fingerprint") != current:
+            changed.append(snap["ticker"])
+    return changed
+
+
+def rescore_tickers(tickers):
+    """Load, score and log a batch of companies with one read and one bulk insert."""
+    # Same rule as the /score endpoint: no financials, no score
+    bundles = [bundle for bundle in load_company_bundles(tickers) if bundle["financials"]]
+    score_rows = []
+    for bundle in bundles:
+        news_items = bundle["news"]
+        result = score_with_explanation(bundle["financials"], news_items)
+        fingerprint = input_fingerprint(bundle["financials"], news_items)
+        score_rows.append(_score_row(bundle["company"]["id"], result["score"], result, fingerprint))
+    if score_rows:
+        supabase.table("scores").insert(score_rows).execute()
+    leaderboard = get_leaderboard()
+    peers = get_peers()
+    for bundle, row in zip(bundles, score_rows):
+        company = bundle["company"]
+        leaderboard.record(company["id"], row["score"], row["date"], company["ticker"], company.get("sector"))
+        peers.record_score(company["id"], row["score"], company.get("sector"))
+        publish_score(row, company["ticker"])
+        invalidate_ticker(company["ticker"], ("score", "history"))
+    return len(score_rows)
+
+
+def rescore_companies(company_ids, batch_size=RESCORE_BATCH_SIZE):
+    """Rescore specific companies by id regardless of fingerprint, e.g. after a sentiment backfill."""
+    company_ids = list(company_ids)
+    rescored = 0
+    for i in range(0, len(company_ids), batch_size):
+        chunk = company_ids[i:i + batch_size]
+        rows = supabase.table("companies").select("ticker").in_("id", chunk).execute().data or []
+        if rows:
+            rescored += rescore_tickers([r["ticker"] for r in rows])
+    return rescored
+
+
+_run_lock = threading.Lock()
+last_run_stats = None
+
+
+def rescore_changed(batch_size=RESCORE_BATCH_SIZE):
+    """
+    One incremental pass over every company. Returns per-run stats:
+    checked, skipped, rescored, failed, batches and duration_ms.
+    """
+    global last_run_stats
+    with _run_lock:
+        started = time.perf_counter()
+        stats = {
+            "started_at": datetime.utcnow().isoformat(),
+            "checked": 0, "skipped": 0, "rescored": 0, "failed": 0, "batches": 0,
+        }
+        after = None
+        while True:
+            rows = load_score_snapshots(after, batch_size)
+            if not rows:
+                break
+            after = rows[-1]["id"]
+            changed = changed_tickers(rows)
+            stats["checked"] += len(rows)
+            stats["skipped"] += len(rows) - len(changed)
+            if changed:
+                stats["batches"] += 1
+                try:
+                    stats["rescored"] += rescore_tickers(changed)
+                except Exception as e:
+                    stats["failed"] += len(changed)
+                    logging.error(f"Rescoring batch of {len(changed)} companies failed: {e}")
+            if len(rows) < batch_size:
+                break
+        stats["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        last_run_stats = stats
+        logging.info(
+            f"Rescore run: {stats['checked']} checked, {stats['skipped']} skipped, "
+            f"{stats['rescored']} rescored, {stats['failed']} failed"
+        )
+        return stats
+
+
+class RescoreScheduler:
+    """
+    Runs rescore_changed every `interval` seconds on a background thread, in
+    whichever process holds the "rescore" lease (one per database).
+    """
+
+    def __init__(self, interval=RESCORE_INTERVAL, batch_size=RESCORE_BATCH_SIZE):
+        self.interval = interval
+        self.batch_size = batch_size
+        # Held across runs and renewed by each; lapses after three missed intervals
+        self.lease = Lease("rescore", 3 * interval)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="rescore-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.lease.acquire():
+                continue
+            try:
+                rescore_changed(self.batch_size)
+            except Exception as e:
+                logging.error(f"Rescore run failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self.lease.release()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=RESCORE_BATCH_SIZE)
+    parser.add_argument("--loop", action="store_true", help=f"keep running every RESCORE_INTERVAL ({RESCORE_INTERVAL:g}s)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    print(json.dumps(rescore_changed(args.batch_size)))
+    while args.loop:
+        time.sleep(max(RESCORE_INTERVAL, 1))
+        print(json.dumps(rescore_changed(args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,112 +1,235 @@
+import hashlib
+import json
+from datetime import datetime
+import numpy as np
+
 from app.utils.db import supabase
+from app.data.repository import get_ticker, load_company_bundle
+from app.ml.data_versions import get_data_versions
+from app.ml.leaderboard import get_leaderboard
+from app.ml.peers import get_peers
+from app.utils.metrics import compute_seconds, timed
+from app.utils.pubsub import score_updates
 
 def score_company(ticker):
-    # Get company id
-    company = supabase.table("companies").select("*").eq("ticker", ticker).execute().data
-    if not company:
+    # Company, latest financials and recent news in one round trip
+    bundle = load_company_bundle(ticker)
+    if not bundle:
         raise ValueError(f"No company found for ticker {ticker}")
-    company_id = company[0]["id"]
-    # Get latest financials
-    financials = supabase.table("financials").select("*").eq("company_id", company_id).order("date", desc=True).limit(1).execute().data
-    financials = financials[0] if financials else {}
-    # Get recent news
-    news_items = supabase.table("news").select("*").eq("company_id", company_id).order("date", desc=True).limit(5).execute().data
     # Compute score
-    return compute_credit_score(financials, news_items)
+    return compute_credit_score(bundle["financials"] or {}, bundle["news"])
+
+def input_fingerprint(financials, news_items):
+    """
+    Stable digest of the rows compute_credit_score reads for one company: the
+    financials row id and date, and the ids and sentiments of the news items.
+    Stored with each score so app.ml.rescore can skip unchanged companies.
+    """
+    financials = financials or {}
+    payload = [
+        financials.get("id"),
+        financials.get("date"),
+        [[n.get("id"), n.get("sentiment")] for n in news_items],
+    ]
+    return hashlib.blake2b(json.dumps(payload, default=str).encode("utf-8"), digest_size=16).hexdigest()
 
-def log_score(company_id, score, explanation):
-    from datetime import datetime
-    supabase.table("scores").insert({
+
+def _score_row(company_id, score, explanation, fingerprint=None):
+    row = {
         "company_id": company_id,
         "date": datetime.utcnow().isoformat(),
         "score": score,
         "explanation": explanation["plain_summary"],
-    }).execute()
+        "feature_contributions": explanation.get("feature_contributions"),
+    }
+    if fingerprint is not None:
+        row["input_fingerprint"] = fingerprint
+    return row
+
+
+def log_score(company_id, score, explanation, fingerprint=None):
+    """Persist a score with its summary and structured feature_contributions."""
+    row = _score_row(company_id, score, explanation, fingerprint)
+    supabase.table("scores").insert(row).execute()
+    get_leaderboard().record(company_id, score, row["date"])
+    get_peers().record_score(company_id, score)
+    # Score history changed: moves its ETag
+    get_data_versions().record("scores", [row])
+    publish_score(row)
+
+
+def publish_score(row, ticker=None):
+    """Push a logged score row to GET /stream/scores subscribers of its ticker."""
+    if not score_updates.subscriber_count():
+        return
+    company_id = row["company_id"]
+    ticker = ticker or get_ticker(company_id) or get_leaderboard().ticker(company_id)
+    if ticker is None:
+        return
+    score_updates.publish(ticker, {
+        "ticker": ticker,
+        "score": row["score"],
+        "date": row["date"],
+        "explanation": row["explanation"],
+        "feature_contributions": row.get("feature_contributions"),
+    })
+
+
+BASE_SCORE = 50
+
+
+def _positive_news(financials, news_items):
+    return sum(1 for n in news_items if n.get("sentiment") == "positive")
+
+
+def _negative_news(financials, news_items):
+    return sum(1 for n in news_items if n.get("sentiment") == "negative")
+
+
+# The scoring rules: feature -> (input, ordered tiers). Each tier is
+# (test, points, message); the first tier whose test passes (None always does)
+# sets the contribution. Points may be a function of the input value; messages
+# are formatted with {value} and {points}. compute_credit_scores_batch
+# vectorizes the same thresholds.
+SCORE_RULES = {
+    "net_income": (lambda f, n: f.get("net_income", 0) or 0, (
+        (lambda v: v > 0, lambda v: min(20, (v / 1_000_000_000) * 10), "✅ Positive net income → +{points:.1f}"),
+        (None, -15, "❌ Negative net income → -15"),
+    )),
+    "revenue": (lambda f, n: f.get("revenue", 0) or 0, (
+        (lambda v: v > 10_000_000_000, 15, "✅ Very high revenue (>10B) → +15"),
+        (lambda v: v > 1_000_000_000, 10, "✅ Strong revenue (>1B) → +10"),
+        (lambda v: v > 100_000_000, 5, "✅ Moderate revenue (>100M) → +5"),
+        (None, 0, "ℹ️ Low revenue (<100M) → +0"),
+    )),
+    "debt_ratio": (lambda f, n: f.get("debt_ratio", None), (
+        (lambda v: v is None, 0, "ℹ️ No debt ratio data → +0"),
+        (lambda v: v < 0.3, 15, "✅ Low debt ratio (<0.3) → +15"),
+        (lambda v: v < 0.5, 10, "✅ Moderate debt ratio (<0.5) → +10"),
+        (lambda v: v < 0.7, -5, "⚠️ High debt ratio (<0.7) → -5"),
+        (None, -20, "❌ Very high debt ratio (≥0.7) → -20"),
+    )),
+    "positive_news": (_positive_news, (
+        (lambda v: v > 0, lambda v: min(20, v * 5), "✅ {value} positive news → +{points}"),
+        (None, 0, "ℹ️ No positive news → +0"),
+    )),
+    "negative_news": (_negative_news, (
+        (lambda v: v > 0, lambda v: -min(25, v * 8), "⚠️ {value} negative news → {points}"),
+        (None, 0, "✅ No negative news → +0"),
+    )),
+}
+
+
+def apply_score_rules(financials, news_items):
+    """Run SCORE_RULES once; returns (unclamped score, feature_contributions, explanation lines)."""
+    financials = financials or {}
+    news_items = news_items or []
+    score = BASE_SCORE
+    contributions = {}
+    lines = []
+    for feature, (extract, tiers) in SCORE_RULES.items():
+        value = extract(financials, news_items)
+        for test, points, message in tiers:
+            if test is None or test(value):
+                points = points(value) if callable(points) else points
+                break
+        score += points
+        contributions[feature] = points
+        lines.append(message.format(value=value, points=points))
+    return score, contributions, lines
+
+
+def summarize_score(score, contributions, lines):
+    """
+    The explanation dict for a final score: contributions plus an
+    'other_adjustments' term when rounding/clamping (or a caller-supplied
+    score) means they would not sum to `score - BASE_SCORE`.
+    """
+    contributions = dict(contributions)
+    lines = list(lines)
+    residual = float(score) - (BASE_SCORE + float(sum(contributions.values())))
+    if abs(residual) >= 0.01:
+        residual = round(residual, 2)
+        contributions["other_adjustments"] = residual
+        lines.append(f"🔧 Rounding and 0-100 bounds → {residual:+}")
+    summary = "\n".join(lines)
+    return {
+        "feature_contributions": contributions,
+        "plain_summary": f"📊 Final Score: {score}\n\nBreakdown:\n{summary}",
+    }
+
+
+def score_with_explanation(financials, news_items):
+    """
+    Single-pass scoring: {"score", "feature_contributions", "plain_summary"}
+    from one evaluation of SCORE_RULES.
+    """
+    with timed(compute_seconds, "score", timing="score"):
+        raw, contributions, lines = apply_score_rules(financials, news_items)
+        score = min(100, max(0, round(raw)))
+        return {"score": score, **summarize_score(score, contributions, lines)}
 
 
 def compute_credit_score(financials, news_items):
-    score = 50  # Neutral baseline
-    explanation = []
-    feature_contributions = {}
-
-    # --- Financial Factors (70% weight) ---
-    net_income = financials.get("net_income", 0) or 0
-    revenue = financials.get("revenue", 0) or 0
-    debt_ratio = financials.get("debt_ratio", None)
-
-    # Net income (profitability) - up to +20 / -15
-    if net_income > 0:
-        bonus = min(20, (net_income / 1_000_000_000) * 10)
-        score += bonus
-        feature_contributions["net_income"] = bonus
-        explanation.append(f"✅ Positive net income → +{bonus:.1f}")
-    else:
-        score -= 15
-        feature_contributions["net_income"] = -15
-        explanation.append("❌ Negative net income → -15")
-
-    # Revenue scale - up to +15
-    if revenue > 10_000_000_000:
-        score += 15
-        feature_contributions["revenue"] = 15
-        explanation.append("✅ Very high revenue (>10B) → +15")
-    elif revenue > 1_000_000_000:
-        score += 10
-        feature_contributions["revenue"] = 10
-        explanation.append("✅ Strong revenue (>1B) → +10")
-    elif revenue > 100_000_000:
-        score += 5
-        feature_contributions["revenue"] = 5
-        explanation.append("✅ Moderate revenue (>100M) → +5")
-    else:
-        feature_contributions["revenue"] = 0
-        explanation.append("ℹ️ Low revenue (<100M) → +0")
-
-    # Debt ratio - up to +15 or -20
-    if debt_ratio is not None:
-        if debt_ratio < 0.3:
-            score += 15
-            feature_contributions["debt_ratio"] = 15
-            explanation.append("✅ Low debt ratio (<0.3) → +15")
-        elif debt_ratio < 0.5:
-            score += 10
-            feature_contributions["debt_ratio"] = 10
-            explanation.append("✅ Moderate debt ratio (<0.5) → +10")
-        elif debt_ratio < 0.7:
-            score -= 5
-            feature_contributions["debt_ratio"] = -5
-            explanation.append("⚠️ High debt ratio (<0.7) → -5")
-        else:
-            score -= 20
-            feature_contributions["debt_ratio"] = -20
-            explanation.append("❌ Very high debt ratio (≥0.7) → -20")
-    else:
-        feature_contributions["debt_ratio"] = 0
-        explanation.append("ℹ️ No debt ratio data → +0")
-
-    # --- News Sentiment (30% weight) ---
-    pos_count = sum(1 for n in news_items if n.get("sentiment") == "positive")
-    neg_count = sum(1 for n in news_items if n.get("sentiment") == "negative")
-
-    if pos_count:
-        bonus = min(20, pos_count * 5)
-        score += bonus
-        feature_contributions["positive_news"] = bonus
-        explanation.append(f"✅ {pos_count} positive news → +{bonus}")
-    else:
-        feature_contributions["positive_news"] = 0
-        explanation.append("ℹ️ No positive news → +0")
-
-    if neg_count:
-        penalty = min(25, neg_count * 8)
-        score -= penalty
-        feature_contributions["negative_news"] = -penalty
-        explanation.append(f"⚠️ {neg_count} negative news → -{penalty}")
-    else:
-        feature_contributions["negative_news"] = 0
-        explanation.append("✅ No negative news → +0")
-
-    # --- Clamp score ---
-    score = min(100, max(0, round(score)))
-
-    return score
+    raw, _, _ = apply_score_rules(financials, news_items)
+    return min(100, max(0, round(raw)))
+
+
+def compute_credit_scores_batch(net_income, revenue, debt_ratio, pos_count, neg_count):
+    """
+    Vectorized compute_credit_score over N companies.
+    Takes columnar arrays; missing net_income/revenue/debt_ratio are NaN.
+    Returns an int array of clamped scores, row-for-row equal to compute_credit_score.
+    """
+    net_income = np.nan_to_num(np.asarray(net_income, dtype=float), nan=0.0)
+    revenue = np.nan_to_num(np.asarray(revenue, dtype=float), nan=0.0)
+    debt_ratio = np.asarray(debt_ratio, dtype=float)
+    pos_count = np.asarray(pos_count, dtype=float)
+    neg_count = np.asarray(neg_count, dtype=float)
+
+    net_income_part = np.where(
+        net_income > 0,
+        np.minimum(20, (net_income / 1_000_000_000) * 10),
+        -15,
+    )
+    revenue_part = np.select(
+        [revenue > 10_000_000_000, revenue > 1_000_000_000, revenue > 100_000_000],
+        [15, 10, 5],
+        default=0,
+    )
+    with np.errstate(invalid="ignore"):
+        debt_part = np.select(
+            [np.isnan(debt_ratio), debt_ratio < 0.3, debt_ratio < 0.5, debt_ratio < 0.7],
+            [0, 15, 10, -5],
+            default=-20,
+        )
+    pos_part = np.minimum(20, pos_count * 5)
+    neg_part = np.minimum(25, neg_count * 8)
+
+    # Same accumulation order as compute_credit_score so float rounding matches
+    score = 50 + net_income_part
+    score = score + revenue_part
+    score = score + debt_part
+    score = score + pos_part
+    score = score - neg_part
+    return np.clip(np.round(score), 0, 100).astype(int)
+
+
+def scoring_columns(financials_list, news_lists):
+    """Build the columnar inputs of compute_credit_scores_batch from row dicts."""
+    def _col(key):
+        values = []
+        for f in financials_list:
+            v = (f or {}).get(key)
+            values.append(np.nan if v is None else float(v))
+        return np.array(values, dtype=float)
+
+    pos_count = np.array([sum(1 for n in news if n.get("sentiment") == "positive") for news in news_lists])
+    neg_count = np.array([sum(1 for n in news if n.get("sentiment") == "negative") for news in news_lists])
+    return {
+        "net_income": _col("net_income"),
+        "revenue": _col("revenue"),
+        "debt_ratio": _col("debt_ratio"),
+        "pos_count": pos_count,
+        "neg_count": neg_count,
+    }
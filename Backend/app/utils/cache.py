@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from app.config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry TTL. Thread-safe.
+    ttl=None keeps entries until they are evicted by size or explicitly.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        # Bumped by invalidation so a load that started before a write does not
+        # put its pre-write result back: per key, and for invalidate_where/clear
+        self._generations = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # dropped to stay under maxsize
+        self.expirations = 0
+        self.invalidations = 0  # dropped by a write path
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self, key):
+        """Token for set(..., generation=) that goes stale when `key` is invalidated."""
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def set(self, key, value, generation=None):
+        """Store `value`; with `generation`, only if `key` was not invalidated since it was taken."""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(key, 0)):
+                return
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key, loader):
+        """Return the cached value, or call `loader()` and cache its result. Exceptions are not cached."""
+        value = self.get(key)
+        if value is MISSING:
+            generation = self.generation(key)
+            value = loader()
+            self.set(key, value, generation)
+        return value
+
+    async def aget_or_set(self, key, loader):
+        """get_or_set for an async `loader` coroutine function."""
+        value = self.get(key)
+        if value is MISSING:
+            generation = self.generation(key)
+            value = await loader()
+            self.set(key, value, generation)
+        return value
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._generations[key] = self._generations.get(key, 0) + 1
+                if self._data.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def invalidate_where(self, predicate):
+        with self._lock:
+            self._epoch += 1
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class DiskTTLCache:
+    """
+    JSON values in one file per key under `directory`, each stored with its
+    write time (JSON, not pickle, so a file dropped in the directory is data,
+    never code). Survives restarts and is shared by every process on the host.
+    get() can return expired entries on request (allow_stale) so callers can
+    fall back to them when the source is unavailable.
+    """
+
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def get(self, key, default=MISSING, allow_stale=False):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+            stored_at, value = entry["stored_at"], entry["value"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return default
+        if not allow_stale and self.ttl is not None and time.time() - stored_at > self.ttl:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"stored_at": time.time(), "value": value}, f, default=str)
+        os.replace(tmp, path)  # readers never see a partial file
+
+
+# Read-endpoint responses, keyed per ticker: ("company"|"news"|"score", ticker) and ("companies",).
+response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+TICKER_NAMESPACES = ("company", "news", "score")
+
+
+def invalidate_ticker(ticker, namespaces=TICKER_NAMESPACES):
+    """Evict the cached responses a write for `ticker` affects."""
+    keys = [(ns, ticker) for ns in namespaces]
+    if "company" in namespaces:
+        # The company list embeds every profile
+        keys.append(("companies",))
+    response_cache.invalidate(*keys)
+
+
+def invalidate_namespaces(namespaces):
+    """Fallback when the ticker of a write is unknown: drop a whole namespace."""
+    response_cache.invalidate_where(lambda key: key[0] in namespaces)
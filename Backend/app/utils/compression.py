@@ -0,0 +1,123 @@
+"""
+Response compression negotiated from Accept-Encoding: brotli when the
+optional `brotli` package is installed and the client accepts it, otherwise
+gzip. Bodies under COMPRESS_MIN_BYTES are sent as-is. Streamed responses
+(NDJSON) are compressed chunk by chunk with a flush after each one;
+Server-Sent Events are never compressed, so events are not held back.
+"""
+import zlib
+from app.config import COMPRESS_MIN_BYTES
+
+SKIP_CONTENT_TYPES = (b"text/event-stream",)
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _accepted(header):
+    """Codings the client accepts (q > 0), lowercased."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def negotiate(accept_encoding):
+    accepted = _accepted(accept_encoding or "")
+    if "br" in accepted and _brotli() is not None:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _Encoder:
+    def __init__(self, encoding):
+        if encoding == "br":
+            self._c = _brotli().Compressor(quality=4)
+            self._chunk, self._flush, self._finish = self._c.process, self._c.flush, self._c.finish
+        else:
+            self._c = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._chunk, self._finish = self._c.compress, self._c.flush
+            self._flush = lambda: self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def chunk(self, data):
+        return self._chunk(data) + self._flush()
+
+    def finish(self, data=b""):
+        return self._chunk(data) + self._finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size=COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        encoding = negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None     # response start, held until the first body chunk decides
+        encoder = None   # set once compressing; False once passing through
+
+        async def send_compressed(message):
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if start is not None:
+                response_headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"]
+                names = {k.lower(): v for k, v in response_headers}
+                if (
+                    b"content-encoding" in names
+                    or names.get(b"content-type", b"").startswith(SKIP_CONTENT_TYPES)
+                    or (not more and len(body) < self.minimum_size)
+                ):
+                    encoder = False
+                    await send(start)
+                else:
+                    encoder = _Encoder(encoding)
+                    body = encoder.chunk(body) if more else encoder.finish(body)
+                    response_headers.append((b"content-encoding", encoding.encode("latin-1")))
+                    vary = names.get(b"vary", b"")
+                    if b"accept-encoding" not in vary.lower():
+                        response_headers = [(k, v) for k, v in response_headers if k.lower() != b"vary"]
+                        response_headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+                    if not more:
+                        response_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+                    await send({**start, "headers": response_headers})
+                    await send({**message, "body": body})
+                    start = None
+                    return
+                start = None
+            if encoder:
+                body = encoder.chunk(body) if more else encoder.finish(body)
+                message = {**message, "body": body}
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
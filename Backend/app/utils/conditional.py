@@ -0,0 +1,108 @@
+"""
+Conditional GETs for read endpoints. ETags are derived from the data a
+response is built from, never from per-process state, so every API process
+gives the same data the same tag:
+- per-ticker data (news, score history) is versioned by the ticker's latest
+  score, headline and financials timestamps (app.ml.data_versions), checked
+  before any query or serialization;
+- a company profile carries no timestamp, so profiles and the company list are
+  versioned by a digest of the cached body (body_version).
+ConditionalGetMiddleware adds the ETag to the full response.
+"""
+import hashlib
+import json
+from fastapi import HTTPException
+from starlette.responses import Response
+from app.ml.data_versions import get_data_versions
+from app.utils.cache import response_cache
+
+NOT_MODIFIED_HEADERS = {"Cache-Control": "no-cache", "Vary": "Accept, Accept-Encoding"}
+
+
+class NotModified(Exception):
+    def __init__(self, etag):
+        self.etag = etag
+
+
+def _digest(value):
+    return hashlib.blake2b(json.dumps(value, default=str, sort_keys=True).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def body_version(body):
+    """Version of a response body with no timestamp to go by; computed once, when the body is cached."""
+    return _digest(body)
+
+
+def etag_for(request, namespace, version):
+    """Weak ETag for this request's representation of `namespace` (compression does not change it)."""
+    query = request.scope.get("query_string", b"").decode("latin-1")
+    return f'W/"{_digest([namespace, version, query, request.headers.get("accept", "")])}"'
+
+
+def _matches(request, etag):
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag.removeprefix("W/") for t in tags)
+
+
+def check_etag(request, namespace, version):
+    """Raise NotModified when the client already has `version`; otherwise tag the response."""
+    etag = etag_for(request, namespace, version)
+    if _matches(request, etag):
+        raise NotModified(etag)
+    request.state.etag = etag
+
+
+async def acheck_ticker_etag(request, namespace, ticker):
+    """
+    check_etag() for a ticker's data, versioned by its data timestamps. An
+    unknown ticker is a 404 whatever the preconditions. A match against this
+    process's timestamps is confirmed with the database before the 304, since
+    another process may have written since.
+    """
+    versions = get_data_versions().ensure_built()
+    version = versions.version(ticker)
+    confirmed = version is None
+    if confirmed:
+        version = await versions.arefresh(ticker)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Company not found")
+    if not confirmed and _matches(request, etag_for(request, namespace, version)):
+        fresh = await versions.arefresh(ticker)
+        if fresh is None:
+            raise HTTPException(status_code=404, detail="Company not found")
+        if fresh != version:
+            # Written by another process: this process's cached body is stale too
+            response_cache.invalidate((namespace, ticker))
+            version = fresh
+    check_etag(request, namespace, version)
+
+
+async def not_modified_handler(request, exc):
+    return Response(status_code=304, headers={"ETag": exc.etag, **NOT_MODIFIED_HEADERS})
+
+
+class ConditionalGetMiddleware:
+    """ASGI middleware adding the ETag chosen by check_etag() to successful responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = scope.setdefault("state", {})
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200 and state.get("etag"):
+                headers = list(message.get("headers", []))
+                headers.append((b"etag", state["etag"].encode("latin-1")))
+                for name, value in NOT_MODIFIED_HEADERS.items():
+                    headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
@@ -1,5 +1,150 @@
-from supabase import create_client, Client
-from app.config import SUPABASE_URL, SUPABASE_KEY
+import asyncio
+import inspect
+import threading
+import time
+from app.config import SUPABASE_URL, SUPABASE_KEY, STORAGE_BACKEND
+from app.utils.metrics import db_query_seconds, db_query_errors, record_timing
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# One sync client per process, shared by every module and created on first use
+# so importing the app does not pay for the supabase/httpx imports up front.
+_supabase = None
+_supabase_lock = threading.Lock()
 
+# Async client for the request path; created in the app lifespan (or on first use)
+# on top of the shared keep-alive pool from app.utils.http.
+_async_supabase = None
+_async_lock = asyncio.Lock()
+
+# Set when STORAGE_BACKEND=memory or a test installs one via use_memory_backend()
+_memory_db = None
+
+
+def get_supabase():
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                if STORAGE_BACKEND == "memory":
+                    use_memory_backend()
+                else:
+                    from supabase import create_client
+                    _supabase = InstrumentedClient(create_client(SUPABASE_URL, SUPABASE_KEY))
+    return _supabase
+
+
+def use_memory_backend(db=None):
+    """
+    Point the sync and async clients at an in-memory database (a fresh one
+    unless `db` is given) and return it. Used by tests and benchmarks.
+    """
+    global _supabase, _async_supabase, _memory_db
+    from app.utils.memory_db import MemoryDatabase
+    _memory_db = db if db is not None else MemoryDatabase()
+    _supabase = InstrumentedClient(_memory_db)
+    _async_supabase = InstrumentedClient(_memory_db.async_client())
+    return _memory_db
+
+
+_QUERY_OPS = frozenset(("select", "insert", "upsert", "update", "delete"))
+
+
+class InstrumentedClient:
+    """
+    Wraps a sync or async Supabase client (or the memory stand-in) so every
+    query's execute() is observed in db_query_duration_seconds by table and
+    operation. Everything else is passed through to the wrapped client.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name):
+        return _TimedQuery(self._client.table(name), name, "select")
+
+    def from_(self, name):
+        return self.table(name)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class _TimedQuery:
+    __slots__ = ("_query", "_table", "_op")
+
+    def __init__(self, query, table, op):
+        self._query = query
+        self._table = table
+        self._op = op
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if name == "execute":
+            return self._execute
+        if not callable(attr):
+            return attr
+
+        def builder(*args, **kwargs):
+            return _TimedQuery(attr(*args, **kwargs), self._table, name if name in _QUERY_OPS else self._op)
+        return builder
+
+    def _execute(self):
+        start = time.perf_counter()
+        try:
+            result = self._query.execute()
+        except Exception:
+            self._observe(start, failed=True)
+            raise
+        if inspect.isawaitable(result):
+            return self._await(result, start)
+        self._observe(start)
+        return result
+
+    async def _await(self, awaitable, start):
+        try:
+            result = await awaitable
+        except Exception:
+            self._observe(start, failed=True)
+            raise
+        self._observe(start)
+        return result
+
+    def _observe(self, start, failed=False):
+        elapsed = time.perf_counter() - start
+        db_query_seconds.observe(elapsed, self._table, self._op)
+        if failed:
+            db_query_errors.inc(self._table, self._op)
+        record_timing(f"db.{self._table}", elapsed)
+
+
+class _LazyClient:
+    """Stands in for the shared client; the real one is created on first attribute access."""
+
+    def __getattr__(self, name):
+        return getattr(get_supabase(), name)
+
+
+supabase = _LazyClient()
+
+
+async def get_async_supabase():
+    global _async_supabase
+    if _async_supabase is None:
+        async with _async_lock:
+            if _async_supabase is None and STORAGE_BACKEND == "memory":
+                get_supabase()
+            if _async_supabase is None:
+                from supabase import acreate_client, AsyncClientOptions
+                from app.utils.http import get_http_client
+                _async_supabase = InstrumentedClient(await acreate_client(
+                    SUPABASE_URL,
+                    SUPABASE_KEY,
+                    options=AsyncClientOptions(httpx_client=get_http_client()),
+                ))
+    return _async_supabase
+
+
+def reset_async_supabase():
+    """Drop the async client; the shared pool it uses is closed by app.utils.http."""
+    global _async_supabase
+    if _memory_db is None:
+        _async_supabase = None
@@ -0,0 +1,27 @@
+from app.config import HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_TIMEOUT
+
+# One keep-alive connection pool per process, shared by everything async
+# (the async Supabase client's PostgREST calls).
+_client = None
+
+
+def get_http_client():
+    global _client
+    if _client is None or _client.is_closed:
+        import httpx
+        _client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            ),
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
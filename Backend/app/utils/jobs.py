@@ -0,0 +1,149 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from app.config import INGEST_WORKERS, INGEST_MAX_PENDING
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    """A unit of background work with status, per-stage timings and a result."""
+
+    def __init__(self, kind, key=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.status = "queued"
+        self.stage_name = None
+        self.stages = []
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage of the job: `with job.stage("fetch"): ...`."""
+        with self._lock:
+            self.stage_name = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages.append({"name": name, "seconds": round(time.perf_counter() - start, 4)})
+                self.stage_name = None
+
+    @property
+    def done(self):
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "key": self.key,
+                "status": self.status,
+                "stage": self.stage_name,
+                "stages": list(self.stages),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class JobQueue:
+    """
+    Bounded in-process worker pool. Jobs wait in a local queue (no external
+    broker) and run on `workers` daemon threads. Finished jobs are kept for
+    polling until `history` newer jobs push them out.
+    """
+
+    def __init__(self, workers=4, max_pending=100, history=1000):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._jobs = OrderedDict()
+        self._active = {}  # key -> job, so the same work is not enqueued twice
+        self._lock = threading.Lock()
+        self._history = history
+        self._threads = [
+            threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, kind, fn, *args, key=None):
+        """
+        Enqueue `fn(job, *args)`; its return value becomes the job result.
+        If a job with the same `key` is still queued or running, that job is returned instead.
+        """
+        with self._lock:
+            if key is not None and key in self._active:
+                return self._active[key]
+            job = Job(kind, key)
+            try:
+                self._queue.put_nowait((job, fn, args))
+            except queue.Full:
+                raise QueueFull(f"{self._queue.maxsize} jobs already pending")
+            self._jobs[job.id] = job
+            if key is not None:
+                self._active[key] = job
+            while len(self._jobs) > self._history:
+                oldest_id = next(iter(self._jobs))
+                if not self._jobs[oldest_id].done:
+                    break
+                del self._jobs[oldest_id]
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait_idle(self):
+        """Block until every submitted job has finished."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            job, fn, args = self._queue.get()
+            job.status = "running"
+            job.started_at = datetime.now(timezone.utc).isoformat()
+            try:
+                job.result = fn(job, *args)
+                job.status = "succeeded"
+            except Exception as e:
+                logging.exception(f"Job {job.id} ({job.kind}) failed")
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.finished_at = datetime.now(timezone.utc).isoformat()
+                with self._lock:
+                    if job.key is not None and self._active.get(job.key) is job:
+                        del self._active[job.key]
+                self._queue.task_done()
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """The process-wide ingestion queue; worker threads start on first use."""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue(workers=INGEST_WORKERS, max_pending=INGEST_MAX_PENDING)
+    return _job_queue
@@ -0,0 +1,42 @@
+"""
+Named leases in the `leases` table (migrations/007) so one process of many
+runs a periodic job: every uvicorn worker starts a RescoreScheduler, and only
+the lease holder rescores. A holder renews its lease each run; if it dies, the
+lease expires and another process takes over.
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta
+from app.utils.db import supabase
+
+
+class Lease:
+    def __init__(self, name, seconds):
+        self.name = name
+        self.seconds = seconds
+        self.holder = uuid.uuid4().hex
+
+    def acquire(self):
+        """Take or renew the lease; False while another holder's lease is unexpired."""
+        now = datetime.utcnow()
+        row = {"name": self.name, "holder": self.holder, "expires_at": (now + timedelta(seconds=self.seconds)).isoformat()}
+        try:
+            # Renew our own lease or take over an expired one...
+            taken = (
+                supabase.table("leases").update(row).eq("name", self.name)
+                .or_(f"holder.eq.{self.holder},expires_at.lt.{now.isoformat()}")
+                .execute().data
+            )
+            if not taken:
+                # ...or create it; a concurrent creator wins the primary key
+                taken = supabase.table("leases").upsert(row, on_conflict="name", ignore_duplicates=True).execute().data
+        except Exception as e:
+            logging.error(f"Could not acquire lease {self.name}: {e}")
+            return False
+        return bool(taken) and taken[0]["holder"] == self.holder
+
+    def release(self):
+        try:
+            supabase.table("leases").delete().eq("name", self.name).eq("holder", self.holder).execute()
+        except Exception as e:
+            logging.error(f"Could not release lease {self.name}: {e}")
@@ -0,0 +1,349 @@
+"""
+In-memory stand-in for the Supabase client, covering the PostgREST surface the
+app uses: table().select()/insert()/upsert()/update()/delete() with eq, neq,
+gt, gte, lt, lte, in_, or_, order, limit and range, including embedded selects
+such as "*, financials(*), news(*)". Selected with STORAGE_BACKEND=memory.
+"""
+import copy
+import threading
+from collections import defaultdict
+
+# Child table -> foreign key column referencing the parent's "id"
+DEFAULT_RELATIONS = {
+    "financials": "company_id",
+    "news": "company_id",
+    "scores": "company_id",
+}
+
+
+class MemoryResult:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _split_columns(columns):
+    """Split a select string on top-level commas: "*, news(id,title)" -> ["*", "news(id,title)"]."""
+    parts, depth, current = [], 0, ""
+    for ch in columns:
+        if ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def _parse_select(columns):
+    """Return (plain column names or ["*"], {embedded table: nested select string})."""
+    plain, embedded = [], {}
+    for part in _split_columns(columns or "*"):
+        if "(" in part:
+            name, nested = part.split("(", 1)
+            embedded[name.strip()] = nested.rsplit(")", 1)[0]
+        else:
+            plain.append(part)
+    return plain or ["*"], embedded
+
+
+def _project(row, plain):
+    if "*" in plain:
+        return dict(row)
+    return {c: row.get(c) for c in plain}
+
+
+def _sort(rows, orders):
+    # Apply the least significant key first; sorts are stable. PostgREST puts
+    # NULLs last ascending and first descending unless told otherwise.
+    for column, desc, nullsfirst in reversed(orders):
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: r[column], reverse=desc)
+        nulls_first = desc if nullsfirst is None else nullsfirst
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+
+_OPS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+    "lt": lambda a, b: a is not None and a < b,
+    "lte": lambda a, b: a is not None and a <= b,
+    "in": lambda a, b: a in b,
+    "is": lambda a, b: a is b,
+}
+
+
+def _split_terms(text):
+    """Split a PostgREST logic filter body on top-level commas."""
+    terms, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(text):
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and ch == "," and depth == 0:
+            terms.append(text[start:i])
+            start = i + 1
+    terms.append(text[start:])
+    return [t.strip() for t in terms if t.strip()]
+
+
+def _parse_logic(text):
+    """'a.gt.1,and(b.eq."x",c.lt.2)' -> nested (kind, terms) / (op, column, value) tuples."""
+    terms = []
+    for term in _split_terms(text):
+        for kind in ("and", "or"):
+            if term.startswith(f"{kind}(") and term.endswith(")"):
+                terms.append((kind, _parse_logic(term[len(kind) + 1:-1])))
+                break
+        else:
+            column, op, value = term.split(".", 2)
+            if value.startswith('"') and value.endswith('"'):
+                value = value[1:-1]
+            terms.append((op, column, value))
+    return terms
+
+
+def _coerce(value, like):
+    # Filter values arrive as text; compare them as the row's type
+    if isinstance(like, bool) or value is None:
+        return value
+    if isinstance(like, int):
+        return int(value)
+    if isinstance(like, float):
+        return float(value)
+    return value
+
+
+def _logic_matches(row, kind, terms):
+    results = (
+        _logic_matches(row, *term) if term[0] in ("and", "or")
+        else _OPS[term[0]](row.get(term[1]), _coerce(term[2], row.get(term[1])))
+        for term in terms
+    )
+    return all(results) if kind == "and" else any(results)
+
+
+class MemoryQuery:
+    def __init__(self, db, table):
+        self._db = db
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._payload = None
+        self._on_conflict = ""
+        self._ignore_duplicates = False
+        self._filters = []
+        self._orders = defaultdict(list)  # foreign_table (None = top level) -> [(column, desc, nullsfirst)]
+        self._limits = {}  # foreign_table -> limit
+        self._offset = 0
+        self._count = None
+
+    # --- operations ---
+    def select(self, *columns, count=None, head=None):
+        self._columns = ",".join(columns) if columns else "*"
+        self._count = count
+        return self
+
+    def insert(self, json, **kwargs):
+        self._op, self._payload = "insert", json
+        return self
+
+    def upsert(self, json, on_conflict="", ignore_duplicates=False, **kwargs):
+        self._op, self._payload = "upsert", json
+        self._on_conflict = on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json, **kwargs):
+        self._op, self._payload = "update", json
+        return self
+
+    def delete(self, **kwargs):
+        self._op = "delete"
+        return self
+
+    # --- filters and modifiers ---
+    def _filter(self, op, column, value):
+        self._filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, value)
+
+    def gte(self, column, value):
+        return self._filter("gte", column, value)
+
+    def lt(self, column, value):
+        return self._filter("lt", column, value)
+
+    def lte(self, column, value):
+        return self._filter("lte", column, value)
+
+    def in_(self, column, values):
+        return self._filter("in", column, list(values))
+
+    def or_(self, filters, reference_table=None):
+        self._filters.append(("or", None, _parse_logic(filters)))
+        return self
+
+    def is_(self, column, value):
+        return self._filter("is", column, None if value in (None, "null") else value)
+
+    def order(self, column, *, desc=False, nullsfirst=None, foreign_table=None):
+        self._orders[foreign_table].append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size, *, foreign_table=None):
+        self._limits[foreign_table] = size
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        if foreign_table is None:
+            self._offset = start
+        self._limits[foreign_table] = end - start + 1
+        return self
+
+    # --- execution ---
+    def _matches(self, row):
+        return all(
+            _logic_matches(row, op, value) if op == "or" else _OPS[op](row.get(column), value)
+            for op, column, value in self._filters
+        )
+
+    def execute(self):
+        with self._db.lock:
+            return getattr(self, f"_execute_{self._op}")()
+
+    def _execute_select(self):
+        rows = _sort([r for r in self._db.tables[self._table] if self._matches(r)], self._orders[None])
+        total = len(rows)
+        if self._offset:
+            rows = rows[self._offset:]
+        if None in self._limits:
+            rows = rows[:self._limits[None]]
+        plain, embedded = _parse_select(self._columns)
+        # Group each embedded table by foreign key once, not once per parent row
+        children = {child: self._group_children(child, rows) for child in embedded}
+        out = []
+        for row in rows:
+            item = _project(row, plain)
+            for child, nested in embedded.items():
+                item[child] = self._embedded_rows(child, nested, children[child].get(row.get("id"), []))
+            out.append(copy.deepcopy(item))
+        return MemoryResult(out, total if self._count else None)
+
+    def _group_children(self, child, parents):
+        fk = self._db.relations[child]
+        parent_ids = {p.get("id") for p in parents}
+        grouped = defaultdict(list)
+        for r in self._db.tables[child]:
+            if r.get(fk) in parent_ids:
+                grouped[r[fk]].append(r)
+        return grouped
+
+    def _embedded_rows(self, child, nested, rows):
+        rows = _sort(rows, self._orders[child])
+        if child in self._limits:
+            rows = rows[:self._limits[child]]
+        plain, _ = _parse_select(nested)
+        return [_project(r, plain) for r in rows]
+
+    def _payload_rows(self):
+        return [self._payload] if isinstance(self._payload, dict) else list(self._payload)
+
+    def _execute_insert(self):
+        return MemoryResult([copy.deepcopy(self._db.insert_row(self._table, r)) for r in self._payload_rows()])
+
+    def _execute_upsert(self):
+        keys = [k.strip() for k in (self._on_conflict or "id").split(",")]
+        table = self._db.tables[self._table]
+        out = []
+        for new in self._payload_rows():
+            existing = None
+            if all(new.get(k) is not None for k in keys):
+                existing = next((r for r in table if all(r.get(k) == new[k] for k in keys)), None)
+            if existing is None:
+                out.append(self._db.insert_row(self._table, new))
+            elif not self._ignore_duplicates:
+                existing.update(copy.deepcopy(new))
+                out.append(existing)
+        return MemoryResult(copy.deepcopy(out))
+
+    def _execute_update(self):
+        out = []
+        for row in self._db.tables[self._table]:
+            if self._matches(row):
+                row.update(copy.deepcopy(self._payload))
+                out.append(row)
+        return MemoryResult(copy.deepcopy(out))
+
+    def _execute_delete(self):
+        table = self._db.tables[self._table]
+        removed = [r for r in table if self._matches(r)]
+        table[:] = [r for r in table if not self._matches(r)]
+        return MemoryResult(removed)
+
+
+class AsyncMemoryQuery(MemoryQuery):
+    async def execute(self):
+        return MemoryQuery.execute(self)
+
+
+class MemoryDatabase:
+    """Tables are lists of dicts; ids auto-increment per table like a serial primary key."""
+
+    def __init__(self, relations=None):
+        self.tables = defaultdict(list)
+        self.relations = dict(DEFAULT_RELATIONS if relations is None else relations)
+        self.lock = threading.RLock()
+        self._next_id = defaultdict(int)
+        self.query_count = 0
+
+    def insert_row(self, table, row):
+        row = copy.deepcopy(row)
+        if row.get("id") is None:
+            self._next_id[table] += 1
+            row["id"] = self._next_id[table]
+        else:
+            self._next_id[table] = max(self._next_id[table], row["id"])
+        self.tables[table].append(row)
+        return row
+
+    def table(self, name):
+        self.query_count += 1
+        return MemoryQuery(self, name)
+
+    def from_(self, name):
+        return self.table(name)
+
+    def async_client(self):
+        """A view of the same tables whose execute() is awaitable, standing in for AsyncClient."""
+        return _AsyncMemoryClient(self)
+
+
+class _AsyncMemoryClient:
+    def __init__(self, db):
+        self._db = db
+
+    def table(self, name):
+        self._db.query_count += 1
+        return AsyncMemoryQuery(self._db, name)
+
+    def from_(self, name):
+        return self.table(name)
@@ -0,0 +1,227 @@
+"""
+In-process metrics: labelled counters and latency histograms, rendered in the
+Prometheus text exposition format by GET /metrics. Observations are a lock and
+a couple of additions, cheap enough to leave on in production.
+
+Timings recorded while a request is being handled are also collected for that
+request, so the app can return them as a Server-Timing header.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; spans sub-millisecond cache hits up to slow upstream fetches
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (name, seconds) pairs for the request being handled; None outside a request
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labels, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *labels):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += seconds
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in snapshot:
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += n
+                label_text = _label_text(self.labels + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{label_text} {cumulative}")
+            label_text = _label_text(self.labels, labels)
+            lines.append(f"{self.name}_sum{label_text} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _register(cls, name, help, labels, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, help, labels, **kwargs)
+        return metric
+
+
+def counter(name, help, labels=()):
+    return _register(Counter, name, help, labels)
+
+
+def histogram(name, help, labels=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram, name, help, labels, buckets=buckets)
+
+
+def render(extra_lines=()):
+    """All registered metrics in Prometheus text format."""
+    lines = []
+    with _registry_lock:
+        metrics = list(_registry.values())
+    for metric in metrics:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
+
+
+# --- Metrics shared across modules ---
+http_request_seconds = histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route", "status"))
+db_query_seconds = histogram(
+    "db_query_duration_seconds", "Supabase query latency by table and operation.", ("table", "op"))
+db_query_errors = counter(
+    "db_query_errors_total", "Supabase queries that raised.", ("table", "op"))
+provider_call_seconds = histogram(
+    "provider_call_duration_seconds", "yfinance / NewsAPI call latency.", ("provider", "call"))
+provider_call_errors = counter(
+    "provider_call_errors_total", "yfinance / NewsAPI calls that failed.", ("provider", "call"))
+compute_seconds = histogram(
+    "compute_duration_seconds", "Sentiment inference and scoring time.", ("task",))
+
+
+# --- Timing helpers ---
+def record_timing(name, seconds):
+    """Add a span to the current request's Server-Timing, if there is one."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+def start_request_timings():
+    """Begin collecting Server-Timing spans for the current request; returns the list and a reset token."""
+    timings = []
+    return timings, _request_timings.set(timings)
+
+
+def end_request_timings(token):
+    _request_timings.reset(token)
+
+
+@contextmanager
+def timed(metric, *labels, timing=None, errors=None):
+    """
+    Observe the block's duration in `metric` with `labels`. `timing` also names
+    a Server-Timing span; `errors` is a Counter incremented with the same labels
+    when the block raises.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        if errors is not None:
+            errors.inc(*labels)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        metric.observe(elapsed, *labels)
+        if timing is not None:
+            record_timing(timing, elapsed)
+
+
+def server_timing_header(timings):
+    """Server-Timing value; repeated span names are summed into one entry with a count."""
+    totals = {}
+    for name, seconds in timings:
+        total, n = totals.get(name, (0.0, 0))
+        totals[name] = (total + seconds, n + 1)
+    parts = []
+    for name, (total, n) in totals.items():
+        desc = f';desc="{n} calls"' if n > 1 else ""
+        parts.append(f"{name};dur={total * 1000:.2f}{desc}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware observing every request in http_request_duration_seconds,
+    labelled by route template rather than raw path. With server_timing=True
+    the spans recorded while handling the request are returned in a
+    Server-Timing header, plus an "app" span for the whole handler.
+    """
+
+    def __init__(self, app, server_timing=False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        timings, token = start_request_timings()
+        status = [500]
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if self.server_timing:
+                    spans = timings + [("app", time.perf_counter() - start)]
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing_header(spans).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request_timings(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_request_seconds.observe(time.perf_counter() - start, scope["method"], route, str(status[0]))
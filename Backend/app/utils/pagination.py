@@ -0,0 +1,145 @@
+import base64
+import json
+import re
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.config import DB_MAX_ROWS
+
+NDJSON = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = min(1000, DB_MAX_ROWS)
+STREAM_PAGE_SIZE = min(500, DB_MAX_ROWS)
+
+_COLUMN = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def _keys(key):
+    return (key,) if isinstance(key, str) else tuple(key)
+
+
+def encode_cursor(value):
+    """Opaque keyset cursor for the last row's sort-key value (a list for composite keys)."""
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor, key="id"):
+    if cursor is None:
+        return None
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    keys = _keys(key)
+    values = value if len(keys) > 1 and isinstance(value, list) else [value]
+    if len(values) != len(keys) or not all(_is_scalar(v) for v in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value
+
+
+def _is_scalar(value):
+    # Key columns are ids, tickers and timestamps: ints and strings only
+    return isinstance(value, (int, str)) and not isinstance(value, bool)
+
+
+def _cursor_value(row, key):
+    keys = _keys(key)
+    return row[keys[0]] if len(keys) == 1 else [row[k] for k in keys]
+
+
+def _literal(value):
+    # Quoted so timestamps' ':' and '.' are not read as PostgREST syntax
+    return str(value) if isinstance(value, (int, float)) else '"' + str(value).replace('"', '\\"') + '"'
+
+
+def _after_filter(keys, after):
+    """(k1, k2) > (v1, v2) as a PostgREST or-filter: k1 > v1, or k1 = v1 and k2 > v2."""
+    terms = []
+    for i, key in enumerate(keys):
+        equal = [f"{k}.eq.{_literal(v)}" for k, v in zip(keys[:i], after[:i])]
+        greater = f"{key}.gt.{_literal(after[i])}"
+        terms.append(f"and({','.join(equal + [greater])})" if equal else greater)
+    return ",".join(terms)
+
+
+def parse_fields(fields, default, allowed=None):
+    """
+    Turn `fields=a,b` into a column list for select(). Without `allowed` any
+    plain column name is accepted; names are validated so they cannot smuggle
+    PostgREST syntax into the select string.
+    """
+    if not fields:
+        return list(default)
+    columns = [f.strip() for f in fields.split(",") if f.strip()]
+    for column in columns:
+        if not _COLUMN.match(column) or (allowed is not None and column not in allowed):
+            raise HTTPException(status_code=400, detail=f"Unknown field: {column}")
+    return list(dict.fromkeys(columns))
+
+
+def wants_ndjson(request, format):
+    return format == "ndjson" or NDJSON in request.headers.get("accept", "")
+
+
+async def keyset_page(client, table, columns, key, after, limit, eq=None, filters=()):
+    """
+    One page ordered by `key` ascending, starting after the cursor value
+    `after`. `key` may be a tuple of columns (the last one unique, e.g.
+    ("date", "id")) so rows sharing a value are not skipped at a page
+    boundary. `filters` are extra (op, column, value) conditions such as
+    ("gte", "date", "2024-01-01").
+    """
+    keys = _keys(key)
+    select = list(columns) if "*" in columns else list(columns) + [k for k in keys if k not in columns]
+    query = client.table(table).select(",".join(select))
+    for column, value in (eq or {}).items():
+        query = query.eq(column, value)
+    for op, column, value in filters:
+        query = getattr(query, op)(column, value)
+    if after is not None:
+        query = query.gt(keys[0], after) if len(keys) == 1 else query.or_(_after_filter(keys, after))
+    for k in keys:
+        query = query.order(k)
+    return (await query.limit(limit).execute()).data or []
+
+
+async def keyset_pages(client, table, columns, key, after=None, eq=None, filters=(), page_size=STREAM_PAGE_SIZE):
+    """Every non-empty page after `after`, one query each."""
+    while True:
+        page = await keyset_page(client, table, columns, key, after, page_size, eq, filters)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        after = _cursor_value(page[-1], key)
+
+
+def _strip(row, columns):
+    # Drop the sort key when it was only selected to build the cursor
+    if "*" in columns:
+        return row
+    return {c: row.get(c) for c in columns}
+
+
+async def paginated_response(client, table, columns, key, cursor, limit, eq=None, filters=()):
+    """A single keyset page as a JSON list, with the next cursor in a response header."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = await keyset_page(client, table, columns, key, decode_cursor(cursor, key), limit, eq, filters)
+    headers = {}
+    if len(rows) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(_cursor_value(rows[-1], key))
+    return JSONResponse([_strip(r, columns) for r in rows], headers=headers)
+
+
+def ndjson_response(client, table, columns, key, cursor=None, eq=None, page_size=STREAM_PAGE_SIZE, filters=()):
+    """
+    Stream every row as newline-delimited JSON, paging through the table with
+    the keyset so only one page is held in memory at a time.
+    """
+    start = decode_cursor(cursor, key)  # a bad cursor is a 400, not a broken stream
+
+    async def rows():
+        async for page in keyset_pages(client, table, columns, key, start, eq, filters, page_size):
+            for row in page:
+                yield json.dumps(_strip(row, columns), default=str) + "\n"
+
+    return StreamingResponse(rows(), media_type=NDJSON)
@@ -0,0 +1,82 @@
+"""
+In-process publish/subscribe for live updates (GET /stream/scores).
+
+publish() may be called from any thread (ingestion and rescoring run on worker
+threads); each subscriber owns a bounded asyncio.Queue on its event loop. A
+subscriber that falls behind loses its oldest queued events rather than
+slowing publishers or other subscribers. Subscribers only see events
+published in their own process.
+"""
+import asyncio
+import threading
+from app.config import STREAM_QUEUE_SIZE
+
+
+class Subscription:
+    def __init__(self, broker, topics, maxsize, loop):
+        self._broker = broker
+        self.topics = frozenset(topics) if topics else None  # None = every topic
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.loop = loop
+        self.dropped = 0
+
+    def _offer(self, event):
+        # Runs on the subscriber's loop. Backpressure: drop the oldest event.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        """Next event, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Broker:
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, topics=None, maxsize=None):
+        """Subscribe on the running event loop to `topics` (None for all)."""
+        sub = Subscription(self, topics, maxsize or self.queue_size, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, topic, event):
+        """Fan `event` out to every subscriber of `topic`. Never blocks."""
+        with self._lock:
+            targets = [s for s in self._subscribers if s.topics is None or topic in s.topics]
+            self.published += 1
+        for sub in targets:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, event)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                self.unsubscribe(sub)
+
+
+# Score updates, topic = ticker
+score_updates = Broker(queue_size=STREAM_QUEUE_SIZE)
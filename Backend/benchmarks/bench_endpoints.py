@@ -0,0 +1,285 @@
+"""
+Endpoint benchmark on the in-memory storage backend and fake data providers.
+
+Seeds a universe of companies, then drives every route in app.main and
+app.api.* in-process at a fixed concurrency and reports p50/p95/p99 latency
+and throughput per route. The run fails when a route regresses past the
+stored baseline. The baseline records a calibration time (a fixed CPU-bound
+workload) so it can be compared across machines: its numbers are scaled by
+how much slower or faster this machine runs the same workload. Routes with
+fewer than --min-samples requests (the write routes) are reported, not gated.
+
+    python -m benchmarks.bench_endpoints                     # compare with baseline
+    python -m benchmarks.bench_endpoints --update-baseline   # record a new baseline
+    python -m benchmarks.bench_endpoints --no-cache          # measure uncached reads
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("DATA_PROVIDER", "fake")
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+CALIBRATION_KEY = "_calibration"
+
+
+def calibrate(rounds=7):
+    """Best-of-`rounds` milliseconds for a fixed serialize/sort workload, a proxy for this machine's speed."""
+    rows = [{"id": i, "ticker": f"T{i:04d}", "score": (i * 7919) % 1000 / 10, "sector": f"S{i % 11}"} for i in range(2000)]
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(5):
+            decoded = json.loads(json.dumps(rows))
+            sorted(decoded, key=lambda r: (r["sector"], r["score"]))
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(latencies, wall):
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "rps": round(len(values) / wall, 1) if wall > 0 else 0.0,
+    }
+
+
+async def drive(client, make_request, total, concurrency):
+    """Issue `total` requests with `concurrency` in flight; return (latencies, wall seconds)."""
+    latencies = []
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            method, url, body, expected, *headers = make_request(i)
+            start = time.perf_counter()
+            resp = await client.request(method, url, json=body, headers=headers[0] if headers else None)
+            latencies.append(time.perf_counter() - start)
+            if resp.status_code not in expected:
+                raise RuntimeError(f"{method} {url} -> {resp.status_code}: {resp.text[:200]}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+async def first_event(app, ticker, timeout=5.0):
+    """
+    One SSE request to /stream/scores through the ASGI app: connect, publish a
+    score for `ticker` once the stream is open, and return the seconds until
+    its event frame arrived; disconnecting afterwards is not counted. httpx's
+    ASGI transport buffers whole responses, so the app is called directly.
+    """
+    from app.utils.pubsub import score_updates
+
+    received, done = asyncio.Event(), asyncio.Event()
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "root_path": "",
+        "path": "/stream/scores", "raw_path": b"/stream/scores", "query_string": f"tickers={ticker}".encode(),
+        "headers": [(b"host", b"bench"), (b"accept", b"text/event-stream")],
+        "server": ("bench", 80), "client": ("127.0.0.1", 0),
+    }
+
+    async def receive():
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        body = message.get("body", b"")
+        if body.startswith(b"retry:"):
+            # Subscribed: the stream is open
+            score_updates.publish(ticker, {"ticker": ticker, "score": 50.0})
+        elif body.startswith(b"event: score"):
+            received.set()
+
+    start = time.perf_counter()
+    task = asyncio.create_task(app(scope, receive, send))
+    try:
+        await asyncio.wait_for(received.wait(), timeout)
+        return time.perf_counter() - start
+    finally:
+        done.set()
+        await task
+
+
+async def drive_stream(app, total, concurrency):
+    """Like drive(), for SSE connect-to-first-event latency on distinct tickers."""
+    latencies = []
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            latencies.append(await first_event(app, f"SSE{i:05d}"))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+def seed(universe):
+    from app.data.bulk_onboard import onboard_tickers
+    from app.ml.scoring import log_score, score_with_explanation
+    from app.data.repository import load_company_bundle
+
+    tickers = [f"T{i:04d}" for i in range(universe)]
+    report = onboard_tickers(tickers, concurrency=16)
+    if report["failed"]:
+        raise RuntimeError(f"seeding failed for {report['failed']} tickers")
+    # A few historical scores per company for /score_history
+    for t in tickers:
+        bundle = load_company_bundle(t)
+        for _ in range(3):
+            result = score_with_explanation(bundle["financials"], bundle["news"])
+            log_score(bundle["company"]["id"], result["score"], result)
+    return tickers
+
+
+def routes(tickers):
+    """Route name -> request factory returning (method, url, json body, accepted status codes[, headers])."""
+    from app.data.fake_providers import SECTORS
+    n = len(tickers)
+    ok = (200,)
+    return {
+        "GET /companies": lambda i: ("GET", "/companies", None, ok),
+        "GET /company/{ticker}": lambda i: ("GET", f"/company/{tickers[i % n]}", None, ok),
+        "GET /company/{ticker} 304": None,  # revalidation with a current ETag, filled in by run()
+        "GET /news/{ticker}": lambda i: ("GET", f"/news/{tickers[i % n]}", None, ok),
+        "GET /score/{ticker}": lambda i: ("GET", f"/score/{tickers[i % n]}", None, ok),
+        "GET /score_history/{ticker}": lambda i: ("GET", f"/score_history/{tickers[i % n]}", None, ok),
+        "GET /score_history/{ticker} 304": None,
+        "GET /score_history/{ticker}?bucket": lambda i: ("GET", f"/score_history/{tickers[i % n]}?bucket=week", None, ok),
+        "GET /score_history?tickers": lambda i: ("GET", f"/score_history?tickers={','.join(tickers[(i * 10) % n:][:10])}&bucket=month", None, ok),
+        "GET /scores/top": lambda i: ("GET", "/scores/top?limit=50", None, ok),
+        "GET /scores/bottom": lambda i: ("GET", f"/scores/bottom?limit=10&sector={SECTORS[i % len(SECTORS)]}", None, ok),
+        "GET /scores/sectors": lambda i: ("GET", "/scores/sectors", None, ok),
+        "GET /rescore/stats": lambda i: ("GET", "/rescore/stats", None, ok),
+        "GET /stream/scores": None,  # SSE connect to first event, driven by drive_stream()
+        "POST /scores/batch": lambda i: ("POST", "/scores/batch", tickers[(i * 50) % n:][:50], ok),
+        "GET /cache/stats": lambda i: ("GET", "/cache/stats", None, ok),
+        "GET /metrics": lambda i: ("GET", "/metrics", None, ok),
+        "POST /company": lambda i: ("POST", "/company", {"ticker": tickers[i % n], "name": f"{tickers[i % n]} Corp"}, ok),
+        "POST /add_company/{ticker}": lambda i: ("POST", f"/add_company/NEW{i:05d}", None, (202,)),
+        "POST /companies/bulk": lambda i: ("POST", "/companies/bulk", [f"BULK{i:04d}{j}" for j in range(5)], (202,)),
+        "GET /jobs/{id}": None,  # filled in once a job exists
+    }
+
+
+async def run(args):
+    from httpx import AsyncClient, ASGITransport
+    from app.main import app
+    from app.utils.cache import response_cache
+    from app.utils.jobs import get_job_queue
+
+    if args.no_cache:
+        response_cache.maxsize = 0
+    tickers = seed(args.universe)
+
+    results = {}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        table = routes(tickers)
+        job = (await client.post("/add_company/JOBPROBE")).json()
+        table["GET /jobs/{id}"] = lambda i: ("GET", f"/jobs/{job['job_id']}", None, (200,))
+        for name, make_request in table.items():
+            if args.only and args.only not in name:
+                continue
+            if name.endswith(" 304"):
+                # Collect current ETags just before driving, so writes made earlier
+                # in the run do not turn these into 200s
+                path = name.split()[1].removesuffix("/{ticker}")
+                etags = [(await client.get(f"{path}/{t}")).headers["etag"] for t in tickers]
+                make_request = lambda i, path=path, etags=etags: (
+                    "GET", f"{path}/{tickers[i % len(tickers)]}", None, (304,),
+                    {"If-None-Match": etags[i % len(tickers)]},
+                )
+            # Writes run fewer times; enqueue routes must stay under INGEST_MAX_PENDING
+            total = args.requests if name.startswith("GET") else args.concurrency * 2
+            if name == "GET /stream/scores":
+                latencies, wall = await drive_stream(app, total, args.concurrency)
+            else:
+                latencies, wall = await drive(client, make_request, total, args.concurrency)
+            results[name] = summarize(latencies, wall)
+            # Let queued ingestion jobs finish so they do not skew the next route
+            await asyncio.to_thread(get_job_queue().wait_idle)
+    return results
+
+
+def compare(results, baseline, tolerance, calibration_ms=None, min_samples=0):
+    """
+    Routes whose p95 or throughput moved past `tolerance` relative to the
+    baseline, after scaling the baseline by this run's calibration time.
+    Routes measured with fewer than `min_samples` requests are skipped.
+    """
+    base_calibration = baseline.get(CALIBRATION_KEY, {}).get("ms")
+    scale = calibration_ms / base_calibration if calibration_ms and base_calibration else 1.0
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base or name == CALIBRATION_KEY or current["requests"] < min_samples:
+            continue
+        p95 = round(base["p95_ms"] * scale, 3)
+        rps = round(base["rps"] / scale, 1)
+        # Small absolute floor so sub-millisecond noise does not fail the run
+        if current["p95_ms"] > p95 * (1 + tolerance) + 0.5:
+            regressions.append(f"{name}: p95 {p95}ms -> {current['p95_ms']}ms")
+        if current["rps"] < rps / (1 + tolerance):
+            regressions.append(f"{name}: throughput {rps} -> {current['rps']} req/s")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--universe", type=int, default=200, help="companies to seed")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per read route")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative regression")
+    parser.add_argument("--min-samples", type=int, default=500, help="routes with fewer requests are not gated")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument("--only", help="run routes whose name contains this text")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    calibration_ms = calibrate()
+    results = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'route':32} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+        for name, r in results.items():
+            print(f"{name:32} {r['requests']:>6} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} {r['rps']:>9}")
+        print(f"calibration {calibration_ms}ms")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({CALIBRATION_KEY: {"ms": calibration_ms}, **results}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline recorded; run with --update-baseline")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.tolerance, calibration_ms, args.min_samples)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
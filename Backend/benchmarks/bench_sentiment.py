@@ -0,0 +1,53 @@
+"""
+Micro-benchmark: per-title predict_sentiment vs predict_sentiment_batch.
+
+    python -m benchmarks.bench_sentiment [n_titles] [unique_ratio]
+"""
+import random
+import sys
+import time
+
+from app.data import fetch_news
+from app.data.fetch_news import predict_sentiment, predict_sentiment_batch
+
+
+def make_titles(n, unique_ratio, seed=0):
+    rng = random.Random(seed)
+    import joblib
+    vocab = list(joblib.load(fetch_news.VECTORIZER_PATH).vocabulary_)
+    unique = [
+        " ".join(rng.choice(vocab) for _ in range(rng.randint(6, 14))).capitalize()
+        for _ in range(max(1, int(n * unique_ratio)))
+    ]
+    # Syndicated headlines: the same titles recur across companies
+    return [rng.choice(unique) for _ in range(n)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    unique_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    titles = make_titles(n, unique_ratio)
+
+    single, t_single = timed(lambda: [predict_sentiment(t) for t in titles])
+    fetch_news._sentiment_cache.clear()
+    cold, t_cold = timed(lambda: predict_sentiment_batch(titles))
+    warm, t_warm = timed(lambda: predict_sentiment_batch(titles))
+
+    mismatches = sum(a != b for a, b in zip(single, cold))
+    print(f"titles={n} unique={len(set(titles))}")
+    print(f"per-title      {t_single:8.3f}s  {n / t_single:12,.0f} titles/s")
+    print(f"batch (cold)   {t_cold:8.3f}s  {n / t_cold:12,.0f} titles/s  x{t_single / t_cold:.1f}")
+    print(f"batch (warm)   {t_warm:8.3f}s  {n / t_warm:12,.0f} titles/s  x{t_single / t_warm:.1f}")
+    print(f"mismatches vs predict_sentiment: {mismatches}")
+    if cold != warm:
+        raise SystemExit("memoized results differ from cold batch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Resident memory of one worker after loading the sentiment model and
+classifying a headline: the joblib pickles vs the memory-mapped array export.
+
+Each format is measured in a fresh interpreter. RssAnon is private to the
+worker; RssFile is file-backed and shared between workers that map the same
+files, so RssAnon is what each extra uvicorn worker costs.
+
+    python -m benchmarks.bench_sentiment_memory
+"""
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys
+def status():
+    with open("/proc/self/status") as f:
+        fields = dict(line.split(":", 1) for line in f)
+    return {k: int(fields[k].split()[0]) / 1024 for k in ("VmRSS", "RssAnon", "RssFile")}
+import app.data.fetch_news as fetch_news
+before = status()
+if %(fmt)r == "joblib":
+    import joblib
+    model = fetch_news.SentimentModel(joblib.load(fetch_news.VECTORIZER_PATH), joblib.load(fetch_news.MODEL_PATH))
+else:
+    from app.data.sentiment_arrays import ArraySentimentModel
+    model, _ = ArraySentimentModel.load()
+model.predict_labels(["Apple posts record quarterly profit"])
+after = status()
+print(json.dumps({
+    "before": before,
+    "after": after,
+    "sklearn_imported": "sklearn" in sys.modules,
+}))
+"""
+
+
+def probe(fmt):
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", PROBE % {"fmt": fmt}],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    if not os.path.exists("/proc/self/status"):
+        raise SystemExit("needs /proc (Linux)")
+    print(f"{'format':8} {'VmRSS MB':>9} {'+model':>8} {'RssAnon':>8} {'+model':>8} {'RssFile':>8}  sklearn")
+    for fmt in ("joblib", "arrays"):
+        r = probe(fmt)
+        before, after = r["before"], r["after"]
+        print(
+            f"{fmt:8} {after['VmRSS']:9.1f} {after['VmRSS'] - before['VmRSS']:+8.1f} "
+            f"{after['RssAnon']:8.1f} {after['RssAnon'] - before['RssAnon']:+8.1f} {after['RssFile']:8.1f}  "
+            f"{'yes' if r['sklearn_imported'] else 'no'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+-- One row per article per company, so news can be bulk-upserted on (company_id, url).
+
+-- Drop duplicates left by earlier re-ingestions, keeping the newest row
+delete from news a
+using news b
+where a.company_id = b.company_id
+  and a.url = b.url
+  and a.id < b.id;
+
+create unique index if not exists news_company_id_url_key on news (company_id, url);
+
+-- Serves the `order("date").limit(5)` lookups per company
+create index if not exists news_company_id_date_idx on news (company_id, date desc);
@@ -0,0 +1,2 @@
+-- Lets company writes upsert on ticker (add_company, bulk onboarding).
+create unique index if not exists companies_ticker_key on companies (ticker);
@@ -0,0 +1,2 @@
+-- Digest of the scoring inputs each score was computed from (app.ml.rescore).
+alter table scores add column if not exists input_fingerprint text;
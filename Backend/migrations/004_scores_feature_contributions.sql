@@ -0,0 +1,3 @@
+-- Structured per-feature contributions logged with each score, so /score can
+-- serve the latest score without recomputing it.
+alter table scores add column if not exists feature_contributions jsonb;
@@ -0,0 +1,10 @@
+-- Financials are upserted per (company_id, date): one row per company and
+-- fiscal period. Drop the duplicates earlier ingestion appended, keeping the
+-- most recent insert of each period.
+delete from financials f
+using financials newer
+where f.company_id = newer.company_id
+  and f.date = newer.date
+  and f.id < newer.id;
+
+create unique index if not exists financials_company_date_key on financials (company_id, date);
@@ -0,0 +1,3 @@
+-- Sentiment model (digest of the model files) that classified each headline;
+-- lets app.data.sentiment_backfill skip rows the current model already labelled.
+alter table news add column if not exists model_version text;
@@ -0,0 +1,7 @@
+-- Named leases (app.utils.lease): lets one of several API processes run the
+-- in-process rescoring scheduler.
+create table if not exists leases (
+    name text primary key,
+    holder text not null,
+    expires_at timestamp not null
+);
@@ -0,0 +1,531 @@
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.data import providers, repository
+from app.main import app
+from app.utils import db
+from app.utils.cache import response_cache
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """The app on a fresh in-memory database with fake yfinance/NewsAPI providers."""
+    monkeypatch.setattr(providers, "DATA_PROVIDER", "fake")
+    db.use_memory_backend()
+    repository._company_ids.clear()
+    repository._company_tickers.clear()
+    response_cache.clear()
+    with TestClient(app) as c:
+        yield c
+    monkeypatch.setattr(db, "_memory_db", None)
+    monkeypatch.setattr(db, "_supabase", None)
+    monkeypatch.setattr(db, "_async_supabase", None)
+
+
+def _wait_for_job(client, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+
+def test_app_starts_when_the_index_builds_fail(monkeypatch):
+    from app.data.bulk_onboard import onboard_tickers
+    from app.ml import company_index
+    from app.ml.leaderboard import get_leaderboard
+    from app.ml.peers import get_peers
+    from app.ml.rescore import rescore_changed
+
+    monkeypatch.setattr(providers, "DATA_PROVIDER", "fake")
+    db.use_memory_backend()
+    working = db._supabase
+    onboard_tickers(["UP1", "UP2"], concurrency=2)
+    rescore_changed()
+
+    class FailingClient:
+        def table(self, name):
+            raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(db, "_supabase", FailingClient())
+    try:
+        with TestClient(app) as c:
+            assert not get_leaderboard().ready and not get_peers().ready
+            # Once the database is back, the next read rebuilds in the background
+            monkeypatch.setattr(db, "_supabase", working)
+            monkeypatch.setattr(company_index, "REBUILD_RETRY_SECONDS", 0)
+            deadline = time.monotonic() + 5
+            while not get_leaderboard().ready and time.monotonic() < deadline:
+                c.get("/scores/top")
+                time.sleep(0.02)
+            assert [e["ticker"] for e in c.get("/scores/top").json()] != []
+            while not get_peers().ready and time.monotonic() < deadline:
+                c.get("/score/UP1")
+                time.sleep(0.02)
+            assert c.get("/score/UP1").json()["peers"]["peers"] >= 1
+    finally:
+        monkeypatch.setattr(db, "_memory_db", None)
+        monkeypatch.setattr(db, "_supabase", None)
+        monkeypatch.setattr(db, "_async_supabase", None)
+
+
+def test_add_company_then_read_endpoints(client):
+    resp = client.post("/add_company/aapl")
+    assert resp.status_code == 202
+    job = _wait_for_job(client, resp.json()["job_id"])
+    assert job["status"] == "succeeded"
+    assert [s["name"] for s in job["stages"]] == ["save_company_and_financials", "load", "score", "log_score"]
+
+    assert client.post("/add_company/AAPL").json()["message"] == "Company already exists"
+    assert client.get("/company/AAPL").json()["ticker"] == "AAPL"
+    assert len(client.get("/news/AAPL").json()) == 5
+    score = client.get("/score/AAPL").json()
+    assert score["score"] == job["result"]["score"]
+    assert len(client.get("/score_history/AAPL").json()) == 1
+    assert client.get("/score/NOPE").status_code == 404
+
+
+def test_bulk_onboarding_and_batch_scores(client):
+    resp = client.post("/companies/bulk", json=["AAA", "BBB", "FAILCO"])
+    job = _wait_for_job(client, resp.json()["job_id"])
+    report = job["result"]
+    assert (report["succeeded"], report["failed"]) == (2, 1)
+    assert report["results"]["FAILCO"]["stage"] == "fetch"
+
+    batch = client.post("/scores/batch", json=["AAA", "BBB", "ZZZ"]).json()
+    assert [s["ticker"] for s in batch["scores"]] == ["AAA", "BBB"]
+    assert batch["not_found"] == ["ZZZ"]
+    for entry in batch["scores"]:
+        assert entry["score"] == client.get(f"/score/{entry['ticker']}").json()["score"]
+
+
+def test_bulk_onboarding_reports_failed_news_flushes(client, monkeypatch):
+    from app.data import bulk_onboard, news_writer
+
+    def upsert_news(rows):
+        raise RuntimeError("news upsert failed")
+
+    monkeypatch.setattr(news_writer, "upsert_news", upsert_news)
+    report = bulk_onboard.onboard_tickers(["AAA", "BBB"])
+    assert (report["succeeded"], report["failed"], report["news_failed"]) == (2, 0, 2)
+    assert report["results"]["AAA"]["news_error"] == "news upsert failed"
+    assert bulk_onboard.main(["CCC"]) == 1
+
+
+def test_writes_invalidate_cached_reads(client):
+    client.post("/company", json={"ticker": "XYZ", "name": "Old"})
+    assert client.get("/company/XYZ").json()["name"] == "Old"
+    client.post("/company", json={"ticker": "XYZ", "name": "New"})
+    assert client.get("/company/XYZ").json()["name"] == "New"
+    assert client.get("/cache/stats").json()["invalidations"] >= 1
+
+
+def test_companies_keyset_pagination_projection_and_ndjson(client):
+    for i in range(7):
+        client.post("/company", json={"ticker": f"C{i}", "name": f"Company {i}", "sector": "Tech"})
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, "fields": "ticker"}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/companies", params=params)
+        assert all(set(row) == {"ticker"} for row in resp.json())
+        seen.extend(row["ticker"] for row in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [f"C{i}" for i in range(7)]
+
+    resp = client.get("/companies", params={"fields": "ticker,name"}, headers={"Accept": "application/x-ndjson"})
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [row["ticker"] for row in lines] == seen
+
+    assert client.get("/companies", params={"fields": "ticker,(select)"}).status_code == 400
+    assert client.get("/companies", params={"cursor": "not-a-cursor", "limit": 2}).status_code == 400
+    # Well-formed JSON that is not a single key value: {} and [1, 2]
+    for cursor in ("e30=", "WzEsIDJd"):
+        assert client.get("/companies", params={"cursor": cursor, "limit": 2}).status_code == 400
+
+
+def test_bucketed_score_history(client):
+    from app.data.repository import get_company_id
+
+    for ticker in ("AAA", "BBB"):
+        client.post("/company", json={"ticker": ticker})
+    rows = [
+        ("AAA", "2024-01-01T09:00:00", 50), ("AAA", "2024-01-01T17:00:00", 60),
+        ("AAA", "2024-01-10T09:00:00", 40), ("BBB", "2024-01-02T09:00:00", 70),
+    ]
+    for ticker, date, score in rows:
+        db._supabase.table("scores").insert(
+            {"company_id": get_company_id(ticker), "date": date, "score": score, "explanation": f"e{score}"}
+        ).execute()
+
+    week = client.get("/score_history/AAA", params={"bucket": "week"}).json()
+    assert week == [
+        {"bucket": "2024-01-01", "min": 50, "max": 60, "mean": 55.0, "last": 60, "count": 2},
+        {"bucket": "2024-01-08", "min": 40, "max": 40, "mean": 40.0, "last": 40, "count": 1},
+    ]
+    month = client.get("/score_history/AAA", params={"bucket": "month", "include_explanation": True, "from": "2024-01-01T12:00:00"}).json()
+    assert month == [{"bucket": "2024-01-01", "min": 40, "max": 60, "mean": 50.0, "last": 40, "count": 2, "explanation": "e40"}]
+
+    multi = client.get("/score_history", params={"tickers": "AAA,BBB", "bucket": "month"}).json()
+    assert multi["BBB"][0]["last"] == 70 and multi["AAA"][0]["count"] == 3
+    assert client.get("/score_history/AAA", params={"bucket": "year"}).status_code == 422
+
+
+def test_incremental_rescore_only_touches_changed_companies(client):
+    from app.data.bulk_onboard import onboard_tickers
+    from app.data.repository import get_company_id
+    from app.ml.rescore import rescore_changed
+
+    onboard_tickers(["AAA", "BBB", "CCC"], concurrency=2)
+    first = rescore_changed(batch_size=2)
+    assert (first["checked"], first["rescored"], first["skipped"]) == (3, 3, 0)
+    assert rescore_changed(batch_size=2)["rescored"] == 0
+
+    # New news for one company changes only its fingerprint
+    db._supabase.table("news").insert(
+        {"company_id": get_company_id("BBB"), "title": "x", "url": "u", "date": "2999-01-01T00:00:00", "sentiment": "negative"}
+    ).execute()
+    stats = rescore_changed(batch_size=2)
+    assert (stats["checked"], stats["skipped"], stats["rescored"]) == (3, 2, 1)
+    assert client.get("/rescore/stats").json()["rescored"] == 1
+    assert len(client.get("/score_history/BBB").json()) == 2
+
+
+def test_rescore_skips_companies_without_financials(client):
+    from app.ml.rescore import rescore_changed, rescore_tickers
+
+    db._supabase.table("companies").insert({"ticker": "NOF", "name": "No Financials", "sector": "Tech"}).execute()
+    assert rescore_tickers(["NOF"]) == 0
+    stats = rescore_changed()
+    assert (stats["checked"], stats["skipped"], stats["rescored"]) == (1, 1, 0)
+    assert client.get("/score_history/NOF").json() == []
+
+
+def test_rescore_lease_lets_one_process_run_the_scheduler(client):
+    from app.utils.lease import Lease
+
+    first, second = Lease("rescore", 60), Lease("rescore", 60)
+    assert first.acquire() and not second.acquire()
+    assert first.acquire()  # renewal
+    # The holder stops renewing: once the lease lapses another process takes over
+    db._supabase.table("leases").update({"expires_at": "2000-01-01T00:00:00"}).eq("name", "rescore").execute()
+    assert second.acquire() and not first.acquire()
+    second.release()
+    assert first.acquire()
+
+
+def test_score_served_from_logged_row_until_inputs_change(client):
+    from app.data.repository import get_company_id
+
+    job = _wait_for_job(client, client.post("/add_company/ZZZ").json()["job_id"])
+    logged = db._supabase.tables["scores"][-1]
+    assert logged["feature_contributions"] == job["result"]["feature_contributions"]
+
+    # A marker in the stored row proves the read did not recompute
+    logged["explanation"] = "from scores"
+    response_cache.clear()
+    assert client.get("/score/ZZZ").json()["explanation"] == "from scores"
+
+    db._supabase.table("news").insert(
+        {"company_id": get_company_id("ZZZ"), "title": "x", "url": "u", "date": "2999-01-01T00:00:00", "sentiment": "negative"}
+    ).execute()
+    response_cache.clear()
+    fresh = client.get("/score/ZZZ").json()
+    assert fresh["explanation"].startswith("📊 Final Score:")
+    assert fresh["feature_contributions"]["negative_news"] < 0
+
+
+def test_metrics_endpoint_reports_routes_queries_and_compute(client):
+    job = _wait_for_job(client, client.post("/add_company/MET").json()["job_id"])
+    assert job["status"] == "succeeded"
+    client.get("/score/MET")
+    text = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/score/{ticker}",status="200"}' in text
+    assert 'db_query_duration_seconds_count{table="companies",op="upsert"}' in text
+    assert 'provider_call_duration_seconds_count{provider="newsapi",call="everything"}' in text
+    assert 'compute_duration_seconds_count{task="score"}' in text
+    assert "response_cache_hits_total" in text
+
+
+def test_leaderboard_endpoints_follow_logged_scores(client):
+    from app.data.bulk_onboard import onboard_tickers
+    from app.ml.leaderboard import get_leaderboard
+    from app.ml.rescore import rescore_changed
+
+    onboard_tickers([f"L{i}" for i in range(6)], concurrency=2)
+    rescore_changed()
+    top = client.get("/scores/top", params={"limit": 3}).json()
+    bottom = client.get("/scores/bottom", params={"limit": 6}).json()
+    assert len(top) == 3 and len(bottom) == 6
+    assert [e["score"] for e in bottom] == sorted(e["score"] for e in bottom)
+    assert top[0]["score"] == bottom[-1]["score"]
+
+    sector = top[0]["sector"]
+    in_sector = client.get("/scores/top", params={"sector": sector, "limit": 50}).json()
+    assert in_sector and all(e["sector"] == sector for e in in_sector)
+
+    # A fresh build from the database gives the same ranking
+    assert get_leaderboard().build().bottom(6) == bottom
+    assert client.get("/scores/top", params={"limit": 0}).status_code == 422
+
+
+def test_reingestion_upserts_every_financial_period(client):
+    from app.data.fetch_financials import save_company_and_financials
+
+    company_id = save_company_and_financials("FIN")
+    save_company_and_financials("FIN")
+    rows = [r for r in db._supabase.tables["financials"] if r["company_id"] == company_id]
+    assert sorted(r["date"] for r in rows) == ["2021-01-01", "2022-01-01", "2023-01-01", "2024-01-01"]
+    assert all(r["debt_ratio"] is not None for r in rows)
+    assert client.get("/score/FIN").json()["feature_contributions"]["debt_ratio"] != 0
+
+
+def test_sentiment_backfill_updates_changed_rows_and_resumes(client, tmp_path):
+    from app.data import sentiment_backfill
+    from app.data.bulk_onboard import onboard_tickers
+    from app.ml.rescore import rescore_changed
+
+    onboard_tickers(["BF1", "BF2", "BF3"], concurrency=2)
+    rescore_changed()
+    news = db._supabase.tables["news"]
+    # Rows from an older model: one label flipped, all with a stale version
+    for row in news:
+        row["model_version"] = "old"
+    flipped = news[0]
+    flipped["sentiment"] = "negative" if flipped["sentiment"] == "positive" else "positive"
+    scores_before = len(db._supabase.tables["scores"])
+
+    checkpoint = str(tmp_path / "checkpoint.json")
+    stats = sentiment_backfill.backfill(workers=1, chunk_size=4, checkpoint=checkpoint)
+    assert stats["rows"] == len(news) and stats["changed"] == 1 and stats["companies_rescored"] == 1
+    assert {r["model_version"] for r in news} == {sentiment_backfill.model_version()}
+    assert len(db._supabase.tables["scores"]) == scores_before + 1
+
+    # Resuming a finished run reads nothing new
+    again = sentiment_backfill.backfill(workers=1, chunk_size=4, checkpoint=checkpoint)
+    assert (again["classified"], again["changed"], again["companies_rescored"]) == (0, 0, 0)
+    # Every row is tagged with the model version, so even a full rescan classifies nothing
+    rescan = sentiment_backfill.backfill(workers=1, chunk_size=4, checkpoint=checkpoint, reset=True)
+    assert (rescan["rows"], rescan["classified"], rescan["changed"]) == (len(news), 0, 0)
+
+
+def test_sentiment_backfill_chunks_fit_under_the_row_cap(client, tmp_path, monkeypatch):
+    from app.data import sentiment_backfill
+    from app.data.bulk_onboard import onboard_tickers
+
+    onboard_tickers(["BF1", "BF2"], concurrency=2)
+    # The server would cap a larger read at DB_MAX_ROWS rows and end the run early
+    monkeypatch.setattr(sentiment_backfill, "DB_MAX_ROWS", 3)
+    limits = []
+    read_chunk = sentiment_backfill._read_chunk
+    monkeypatch.setattr(sentiment_backfill, "_read_chunk", lambda after, limit: limits.append(limit) or read_chunk(after, limit))
+
+    stats = sentiment_backfill.backfill(workers=1, chunk_size=100, checkpoint=str(tmp_path / "c.json"), rescore=False)
+    assert set(limits) == {3}
+    assert stats["rows"] == len(db._supabase.tables["news"])
+
+
+def test_score_stream_pushes_logged_scores(client):
+    import asyncio
+    from app.api.stream import sse_events
+    from app.ml.scoring import log_score, score_with_explanation
+    from app.utils.pubsub import score_updates
+
+    _wait_for_job(client, client.post("/add_company/AAPL").json()["job_id"])
+    company_id = repository.get_company_id("AAPL")
+    bundle = repository.load_company_bundle("AAPL")
+    result = score_with_explanation(bundle["financials"], bundle["news"])
+
+    async def not_disconnected():
+        return False
+
+    async def run():
+        # The TestClient buffers whole responses, so drive the SSE generator directly
+        # A response that is never started never subscribes
+        await sse_events(score_updates, ["AAPL"], "score", not_disconnected).aclose()
+        assert score_updates.subscriber_count() == 0
+
+        events = sse_events(score_updates, ["AAPL"], "score", not_disconnected, heartbeat=0.05)
+        frames = [await anext(events)]
+        log_score(company_id, result["score"], result)
+        frames.append(await anext(events))
+        frames.append(await anext(events))
+        await events.aclose()
+        return frames
+
+    retry, frame, heartbeat = asyncio.run(run())
+    assert retry == "retry: 50\n\n"
+    name, data = frame.strip().split("\n")
+    assert name == "event: score"
+    data = json.loads(data.removeprefix("data: "))
+    assert (data["ticker"], data["score"]) == ("AAPL", result["score"])
+    assert data["feature_contributions"] == result["feature_contributions"]
+    assert heartbeat == ": heartbeat\n\n"
+    assert score_updates.subscriber_count() == 0
+
+
+def test_score_includes_sector_percentiles(client):
+    from app.data.bulk_onboard import onboard_tickers
+    from app.ml.peers import get_peers
+    from app.ml.rescore import rescore_changed
+
+    onboard_tickers([f"P{i}" for i in range(12)], concurrency=2)
+    rescore_changed()
+    peers = get_peers()
+    score = client.get("/score/P0").json()
+    ranks = score["peers"]
+    assert ranks["peers"] == len(peers.distribution(ranks["sector"], "score")) >= 1
+    assert 0 < ranks["percentiles"]["score"] <= 100
+    assert set(ranks["percentiles"]) == {"score", "net_income", "revenue", "debt_ratio"}
+
+    # A rebuild from the database gives the same distributions as the incremental updates
+    before = {k: list(v) for k, v in peers._sorted.items()}
+    peers.build()
+    assert {k: list(v) for k, v in peers._sorted.items()} == before
+
+
+def test_sector_change_moves_leaderboard_and_peer_entries(client):
+    from app.data.bulk_onboard import onboard_tickers
+    from app.ml.rescore import rescore_changed
+
+    onboard_tickers(["SC1", "SC2"], concurrency=2)
+    rescore_changed()
+    assert client.post("/company", json={"ticker": "SC1", "sector": "Moved"}).status_code == 200
+    moved = client.get("/scores/top", params={"sector": "Moved"}).json()
+    assert [e["ticker"] for e in moved] == ["SC1"]
+    assert client.get("/score/SC1").json()["peers"] == {
+        "sector": "Moved", "peers": 1,
+        "percentiles": {"score": 50.0, "net_income": 50.0, "revenue": 50.0, "debt_ratio": 50.0},
+    }
+
+
+def test_conditional_get_answers_304_until_the_ticker_changes(client):
+    from app.ml.scoring import log_score, score_with_explanation
+
+    _wait_for_job(client, client.post("/add_company/AAPL").json()["job_id"])
+    for path in ("/company/AAPL", "/news/AAPL", "/score_history/AAPL", "/companies", "/companies?limit=1"):
+        first = client.get(path)
+        etag = first.headers["etag"]
+        again = client.get(path, headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.content == b"" and again.headers["etag"] == etag
+    # Another query is another representation
+    assert client.get("/companies?limit=2", headers={"If-None-Match": etag}).status_code == 200
+
+    history_etag = client.get("/score_history/AAPL").headers["etag"]
+    company_etag = client.get("/company/AAPL").headers["etag"]
+    bundle = repository.load_company_bundle("AAPL")
+    result = score_with_explanation(bundle["financials"], bundle["news"])
+    log_score(repository.get_company_id("AAPL"), result["score"], result)
+    changed = client.get("/score_history/AAPL", headers={"If-None-Match": history_etag})
+    assert changed.status_code == 200 and len(changed.json()) == 2
+    assert client.get("/company/AAPL", headers={"If-None-Match": company_etag}).status_code == 304
+
+    client.post("/company", json={"ticker": "AAPL", "name": "Apple Inc."})
+    assert client.get("/company/AAPL", headers={"If-None-Match": company_etag}).json()["name"] == "Apple Inc."
+
+
+def test_etags_follow_the_data_not_the_process(client):
+    from app.ml.data_versions import get_data_versions
+
+    _wait_for_job(client, client.post("/add_company/AAPL").json()["job_id"])
+    paths = ("/company/AAPL", "/news/AAPL", "/score_history/AAPL", "/companies")
+    etags = {path: client.get(path).headers["etag"] for path in paths}
+    # Another process, built from the same data, gives it the same tags
+    get_data_versions().build()
+    response_cache.clear()
+    assert {path: client.get(path).headers["etag"] for path in paths} == etags
+
+    # A score logged by another process: this one's timestamps are behind, but there is no stale 304
+    db._supabase.table("scores").insert(
+        {"company_id": repository.get_company_id("AAPL"), "date": "2100-01-01T00:00:00", "score": 1, "explanation": "x"}
+    ).execute()
+    changed = client.get("/score_history/AAPL", headers={"If-None-Match": etags["/score_history/AAPL"]})
+    assert changed.status_code == 200 and changed.headers["etag"] != etags["/score_history/AAPL"]
+    assert client.get("/score_history/AAPL", headers={"If-None-Match": changed.headers["etag"]}).status_code == 304
+
+    for path in ("/company/NOPE", "/news/NOPE", "/score_history/NOPE"):
+        assert client.get(path, headers={"If-None-Match": "*"}).status_code == 404
+
+
+def test_large_responses_are_gzipped(client):
+    import gzip
+    from app.data.bulk_onboard import onboard_tickers
+
+    onboard_tickers([f"G{i}" for i in range(40)], concurrency=4)
+    resp = client.get("/companies", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["vary"]
+    assert int(resp.headers["content-length"]) < len(json.dumps(resp.json()))
+
+    with client.stream("GET", "/companies?format=ndjson", headers={"Accept-Encoding": "gzip"}) as stream:
+        assert stream.headers["content-encoding"] == "gzip"
+        raw = b"".join(stream.iter_raw())
+    assert len(gzip.decompress(raw).splitlines()) == 40
+
+    small = client.get("/company/G0", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in client.get("/companies", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_score_history_pages_do_not_skip_rows_sharing_a_timestamp(client):
+    from app.utils.db import supabase
+
+    _wait_for_job(client, client.post("/add_company/AAPL").json()["job_id"])
+    company_id = repository.get_company_id("AAPL")
+    supabase.table("scores").delete().eq("company_id", company_id).execute()
+    dates = ["2024-01-01T00:00:00", "2024-01-02T00:00:00", "2024-01-02T00:00:00", "2024-01-03T00:00:00"]
+    supabase.table("scores").insert([
+        {"company_id": company_id, "date": d, "score": i, "explanation": ""} for i, d in enumerate(dates)
+    ]).execute()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "fields": "score"}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/score_history/AAPL", params=params)
+        seen += [r["score"] for r in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [0, 1, 2, 3]
+    # A composite cursor must hold one scalar per key column
+    for cursor in ("e30=", "W3t9LCAxXQ==", "WzFd"):
+        assert client.get("/score_history/AAPL", params={"limit": 2, "cursor": cursor}).status_code == 400
+    streamed = client.get("/score_history/AAPL", params={"format": "ndjson", "fields": "score"}).text.splitlines()
+    assert [json.loads(line)["score"] for line in streamed] == [0, 1, 2, 3]
+
+    # from/to apply to paged and streamed reads as they do to the plain list
+    params = {"from": "2024-01-02", "fields": "score"}
+    assert [r["score"] for r in client.get("/score_history/AAPL", params={"from": "2024-01-02"}).json()] == [1, 2, 3]
+    assert [r["score"] for r in client.get("/score_history/AAPL", params={**params, "limit": 10}).json()] == [1, 2, 3]
+    streamed = client.get("/score_history/AAPL", params={**params, "to": "2024-01-02T23:59:59", "format": "ndjson"})
+    assert [json.loads(line)["score"] for line in streamed.text.splitlines()] == [1, 2]
+    # Unparseable bounds are rejected instead of reaching the database
+    assert client.get("/score_history/AAPL", params={"from": "garbage"}).status_code == 422
+    assert client.get("/score_history", params={"tickers": "AAPL", "to": "garbage"}).status_code == 422
+
+
+def test_bucketed_history_reads_past_one_page(client, monkeypatch):
+    from app.api import scores
+    from app.utils.db import supabase
+
+    _wait_for_job(client, client.post("/add_company/AAPL").json()["job_id"])
+    company_id = repository.get_company_id("AAPL")
+    supabase.table("scores").insert([
+        {"company_id": company_id, "date": f"2024-{m:02d}-{d:02d}T00:00:00", "score": m, "explanation": ""}
+        for m in range(1, 13) for d in range(1, 4)
+    ]).execute()
+    # A page size far below the row count stands in for PostgREST's max-rows cap
+    monkeypatch.setattr(scores, "MAX_PAGE_SIZE", 5)
+    history = client.get("/score_history/AAPL", params={"bucket": "month", "to": "2024-12-31"}).json()
+    assert history[-1]["bucket"][:7] == "2024-12"
+    assert len(history) == 12
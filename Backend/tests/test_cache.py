@@ -0,0 +1,90 @@
+import time
+from app.utils.cache import TTLCache, MISSING
+
+
+def test_lru_eviction_and_counters():
+    cache = TTLCache(maxsize=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+
+
+def test_ttl_expiry_and_invalidation():
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.set(("score", "AAPL"), 70)
+    cache.set(("news", "AAPL"), [])
+    cache.invalidate(("news", "AAPL"))
+    assert cache.get(("news", "AAPL")) is MISSING
+    time.sleep(0.02)
+    assert cache.get(("score", "AAPL")) is MISSING
+    assert cache.stats()["expirations"] == 1
+
+
+def test_get_or_set_does_not_cache_errors():
+    cache = TTLCache()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise ValueError("boom")
+
+    for _ in range(2):
+        try:
+            cache.get_or_set("k", failing)
+        except ValueError:
+            pass
+    assert len(calls) == 2
+    assert cache.get_or_set("k", lambda: 5) == 5
+    assert cache.get_or_set("k", lambda: 6) == 5
+
+
+def test_disk_cache_expiry_and_stale_reads(tmp_path):
+    from app.utils.cache import DiskTTLCache
+
+    disk = DiskTTLCache(str(tmp_path), ttl=0.05)
+    assert disk.get("k") is MISSING
+    disk.set("k", {"rows": [1, 2]})
+    assert DiskTTLCache(str(tmp_path), ttl=10).get("k") == {"rows": [1, 2]}  # another instance / process
+
+    time.sleep(0.1)
+    assert disk.get("k") is MISSING
+    assert disk.get("k", allow_stale=True) == {"rows": [1, 2]}
+
+
+def test_invalidation_during_load_keeps_the_stale_result_out():
+    cache = TTLCache()
+
+    def load_then_write():
+        # A write lands while the read is still loading
+        cache.invalidate("k")
+        return "pre-write"
+
+    assert cache.get_or_set("k", load_then_write) == "pre-write"
+    assert cache.get("k") is MISSING
+    assert cache.get_or_set("k", lambda: "post-write") == "post-write"
+    assert cache.get("k") == "post-write"
+
+    def load_then_namespace_write():
+        cache.invalidate_where(lambda key: True)
+        return "pre-write"
+
+    cache.invalidate("j")
+    cache.get_or_set("j", load_then_namespace_write)
+    assert cache.get("j") is MISSING
+
+
+def test_async_invalidation_during_load_keeps_the_stale_result_out():
+    import asyncio
+    cache = TTLCache()
+
+    async def load():
+        cache.invalidate("k")
+        return "pre-write"
+
+    assert asyncio.run(cache.aget_or_set("k", load)) == "pre-write"
+    assert cache.get("k") is MISSING
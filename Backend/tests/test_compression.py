@@ -0,0 +1,12 @@
+from app.utils import compression
+from app.utils.compression import negotiate
+
+
+def test_negotiate_encoding():
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0, deflate") is None
+    assert negotiate("*") == "gzip"
+    assert negotiate("") is None
+    assert negotiate("br;q=0, gzip") == "gzip"
+    # brotli is an optional dependency; gzip is used without it
+    assert negotiate("br, gzip") == ("br" if compression._brotli() is not None else "gzip")
@@ -0,0 +1,27 @@
+import pandas as pd
+from app.data.fetch_financials import _financials_rows
+
+
+def _statement(items):
+    columns = pd.to_datetime(["2024-12-31", "2023-12-31", "2022-12-31"])
+    return pd.DataFrame(items, index=columns).T
+
+
+def test_rows_for_every_period_with_debt_ratio():
+    financials = _statement({"Total Revenue": [300.0, 200.0, 100.0], "Net Income": [30.0, None, 10.0]})
+    balance_sheet = _statement({"Total Assets": [1000.0, 0.0, 500.0], "Total Debt": [250.0, 10.0, 400.0]})
+    rows = _financials_rows("T", 1, financials, balance_sheet)
+    assert rows == [
+        {"company_id": 1, "date": "2022-01-01", "net_income": 10.0, "revenue": 100.0, "debt_ratio": 0.8},
+        # Missing net income stays None; zero assets give no ratio rather than inf
+        {"company_id": 1, "date": "2023-01-01", "net_income": None, "revenue": 200.0, "debt_ratio": None},
+        {"company_id": 1, "date": "2024-01-01", "net_income": 30.0, "revenue": 300.0, "debt_ratio": 0.25},
+    ]
+
+
+def test_missing_balance_sheet_and_line_items():
+    financials = _statement({"Net Income": [1.0, 2.0, 3.0]})
+    rows = _financials_rows("T", 1, financials, None)
+    assert [r["revenue"] for r in rows] == [None, None, None]
+    assert [r["debt_ratio"] for r in rows] == [None, None, None]
+    assert _financials_rows("T", 1, pd.DataFrame(), pd.DataFrame()) == []
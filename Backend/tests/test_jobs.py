@@ -0,0 +1,49 @@
+import threading
+import time
+from app.utils.jobs import JobQueue, QueueFull
+
+
+def _wait(job, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not job.done and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_job_records_stages_and_result():
+    jobs = JobQueue(workers=1, max_pending=4)
+
+    def work(job, x):
+        with job.stage("double"):
+            y = x * 2
+        with job.stage("inc"):
+            return y + 1
+
+    job = jobs.submit("calc", work, 20)
+    _wait(job)
+    data = jobs.get(job.id).to_dict()
+    assert data["status"] == "succeeded" and data["result"] == 41
+    assert [s["name"] for s in data["stages"]] == ["double", "inc"]
+
+
+def test_failures_dedup_and_backpressure():
+    jobs = JobQueue(workers=1, max_pending=1)
+    release = threading.Event()
+
+    def blocker(job):
+        release.wait(2)
+
+    running = jobs.submit("block", blocker, key="a")
+    deadline = time.monotonic() + 1
+    while running.status != "running" and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert jobs.submit("block", blocker, key="a") is running
+
+    queued = jobs.submit("fail", lambda job: 1 / 0)
+    try:
+        jobs.submit("extra", blocker)
+        assert False, "queue should be full"
+    except QueueFull:
+        pass
+    release.set()
+    _wait(queued)
+    assert queued.status == "failed" and "division" in queued.error
@@ -0,0 +1,52 @@
+from app.ml.leaderboard import Leaderboard
+
+
+def _tickers(entries):
+    return [e["ticker"] for e in entries]
+
+
+def test_top_and_bottom_by_sector():
+    board = Leaderboard()
+    for cid, (ticker, sector, score) in enumerate(
+        [("A", "Tech", 80), ("B", "Tech", 40), ("C", "Energy", 60), ("D", "Energy", 20), ("E", "", 90)], start=1
+    ):
+        board.record(cid, score, "2024-01-01T00:00:00", ticker, sector)
+    assert _tickers(board.top(3)) == ["E", "A", "C"]
+    assert _tickers(board.bottom(2)) == ["D", "B"]
+    assert _tickers(board.top(5, "Energy")) == ["C", "D"]
+    assert board.top(5, "Unknown") == []
+    assert board.sectors() == {"Tech": 2, "Energy": 2}
+
+
+def test_latest_score_replaces_older_and_moves_sector():
+    board = Leaderboard()
+    board.record(1, 50, "2024-01-02T00:00:00", "A", "Tech")
+    board.record(1, 10, "2024-01-01T00:00:00", "A", "Tech")  # older, ignored
+    assert board.top(1)[0]["score"] == 50
+    board.record(1, 70, "2024-01-03T00:00:00", "A", "Energy")
+    assert len(board) == 1
+    assert board.top(5, "Tech") == [] and board.top(5, "Energy")[0]["score"] == 70
+    assert "Tech" not in board.sectors()
+
+
+def test_record_company_moves_sector_without_changing_score():
+    board = Leaderboard()
+    board.record(1, 50, "2024-01-02T00:00:00", "A", "Tech")
+    board.record_company(1, sector="Energy")
+    board.record_company(2, "B", "Energy")  # not scored yet: nothing to file
+    assert board.top(5, "Energy") == [{"ticker": "A", "sector": "Energy", "score": 50, "date": "2024-01-02T00:00:00"}]
+    assert "Tech" not in board.sectors() and len(board) == 1
+
+
+def test_failed_build_leaves_the_index_unbuilt_and_writable(monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise ConnectionError("database unavailable")
+        yield
+
+    monkeypatch.setattr("app.ml.leaderboard.company_pages", unavailable)
+    board = Leaderboard()
+    board.record(1, 50, "2024-01-01T00:00:00", "A", "Tech")
+    assert board.try_build() is board and not board.ready
+    # Writes after the failed build apply directly instead of queueing for a replay
+    board.record(2, 70, "2024-01-01T00:00:00", "B", "Tech")
+    assert not board._pending and _tickers(board.top(5)) == ["B", "A"]
@@ -0,0 +1,60 @@
+import asyncio
+from app.utils.memory_db import MemoryDatabase
+
+
+def _seed():
+    db = MemoryDatabase()
+    apple = db.table("companies").insert({"ticker": "AAPL", "sector": "Technology"}).execute().data[0]
+    msft = db.table("companies").insert({"ticker": "MSFT", "sector": "Technology"}).execute().data[0]
+    db.table("financials").insert([
+        {"company_id": apple["id"], "date": "2023-01-01", "revenue": 1.0},
+        {"company_id": apple["id"], "date": "2024-01-01", "revenue": 2.0},
+        {"company_id": msft["id"], "date": None, "revenue": 3.0},
+    ]).execute()
+    db.table("news").insert([
+        {"company_id": apple["id"], "url": f"u{i}", "date": f"2024-01-0{i}", "sentiment": "positive"}
+        for i in range(1, 8)
+    ]).execute()
+    return db, apple, msft
+
+
+def test_filters_order_limit_and_projection():
+    db, apple, _ = _seed()
+    rows = (
+        db.table("news").select("url,date").eq("company_id", apple["id"])
+        .order("date", desc=True).limit(2).execute().data
+    )
+    assert rows == [{"url": "u7", "date": "2024-01-07"}, {"url": "u6", "date": "2024-01-06"}]
+    assert len(db.table("news").select("*").gt("date", "2024-01-05").execute().data) == 2
+    assert [c["ticker"] for c in db.table("companies").select("ticker").in_("ticker", ["MSFT"]).execute().data] == ["MSFT"]
+
+
+def test_embedded_select_orders_and_limits_per_parent():
+    db, _, _ = _seed()
+    data = (
+        db.table("companies").select("*, financials(*), news(*)")
+        .order("date", desc=True, foreign_table="financials").limit(1, foreign_table="financials")
+        .order("date", desc=True, foreign_table="news").limit(5, foreign_table="news")
+        .execute().data
+    )
+    by_ticker = {c["ticker"]: c for c in data}
+    assert by_ticker["AAPL"]["financials"][0]["date"] == "2024-01-01"
+    assert [n["url"] for n in by_ticker["AAPL"]["news"]] == ["u7", "u6", "u5", "u4", "u3"]
+    assert by_ticker["MSFT"]["news"] == []
+
+
+def test_upsert_update_and_async_view():
+    db, apple, _ = _seed()
+    db.table("news").upsert(
+        [{"company_id": apple["id"], "url": "u1", "sentiment": "negative"},
+         {"company_id": apple["id"], "url": "new", "sentiment": "positive"}],
+        on_conflict="company_id,url",
+    ).execute()
+    news = db.table("news").select("*").eq("company_id", apple["id"]).execute().data
+    assert len(news) == 8
+    assert next(n for n in news if n["url"] == "u1")["sentiment"] == "negative"
+
+    db.table("companies").update({"sector": "Tech"}).eq("ticker", "AAPL").execute()
+    client = db.async_client()
+    data = asyncio.run(client.table("companies").select("sector").eq("ticker", "AAPL").execute()).data
+    assert data == [{"sector": "Tech"}]
@@ -0,0 +1,42 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.utils import metrics
+from app.utils.db import InstrumentedClient
+from app.utils.memory_db import MemoryDatabase
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = metrics.Histogram("test_seconds", "Test.", ("route",), buckets=(0.01, 0.1))
+    for seconds in (0.005, 0.05, 0.05, 3.0):
+        h.observe(seconds, "/x")
+    lines = h.render()
+    assert 'test_seconds_bucket{route="/x",le="0.01"} 1' in lines
+    assert 'test_seconds_bucket{route="/x",le="0.1"} 3' in lines
+    assert 'test_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{route="/x"} 4' in lines
+    assert h.count("/x") == 4
+
+
+def test_instrumented_client_times_queries_by_table_and_op():
+    client = InstrumentedClient(MemoryDatabase())
+    before = metrics.db_query_seconds.count("widgets", "insert")
+    client.table("widgets").insert({"name": "a"}).execute()
+    assert client.table("widgets").select("*").eq("name", "a").execute().data[0]["name"] == "a"
+    assert metrics.db_query_seconds.count("widgets", "insert") == before + 1
+    assert metrics.db_query_seconds.count("widgets", "select") >= 1
+
+
+def test_middleware_labels_by_route_and_adds_server_timing():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        metrics.record_timing("db.items", 0.002)
+        metrics.record_timing("db.items", 0.001)
+        return {"id": item_id}
+
+    app.add_middleware(metrics.MetricsMiddleware, server_timing=True)
+    resp = TestClient(app).get("/items/42")
+    assert resp.headers["server-timing"].startswith('db.items;dur=3.00;desc="2 calls", app;dur=')
+    assert metrics.http_request_seconds.count("GET", "/items/{item_id}", "200") == 1
+    assert "http_request_duration_seconds_bucket{" in metrics.render()
@@ -0,0 +1,47 @@
+import time
+from app.data import news_writer
+from app.data.news_writer import NewsBatchWriter, dedupe_news_rows
+
+
+def _row(company_id, url, title="t"):
+    return {"company_id": company_id, "url": url, "title": title}
+
+
+def test_dedupe_keeps_last_row_per_company_and_url():
+    rows = [_row(1, "a", "old"), _row(1, "a", "new"), _row(2, "a"), _row(1, None), _row(1, None)]
+    deduped = dedupe_news_rows(rows)
+    assert len(deduped) == 4
+    assert _row(1, "a", "new") in deduped
+
+
+def test_batch_writer_flushes_by_size_and_time(monkeypatch):
+    batches = []
+    monkeypatch.setattr(news_writer, "upsert_news", lambda rows: batches.append(list(rows)))
+
+    with NewsBatchWriter(flush_rows=3, flush_ms=50) as writer:
+        writer.add([_row(1, "a"), _row(1, "b"), _row(2, "a")])
+        deadline = time.monotonic() + 1
+        while not batches and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert len(batches) == 1 and len(batches[0]) == 3
+
+        writer.add([_row(3, "a")])
+        time.sleep(0.2)
+        assert len(batches) == 2
+
+        writer.add([_row(4, "a")])
+    # close() flushes the remainder
+    assert [len(b) for b in batches] == [3, 1, 1]
+    assert writer.rows_written == 5
+
+
+def test_batch_writer_records_companies_of_failed_flushes(monkeypatch):
+    def upsert(rows):
+        if any(r["company_id"] == 2 for r in rows):
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(news_writer, "upsert_news", upsert)
+    with NewsBatchWriter(flush_rows=2, flush_ms=1000) as writer:
+        writer.add([_row(1, "a"), _row(1, "b"), _row(2, "a"), _row(3, "a")])
+    assert writer.failed == {2: "boom", 3: "boom"}
+    assert (writer.rows_written, writer.rows_failed) == (2, 2)
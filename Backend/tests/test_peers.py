@@ -0,0 +1,58 @@
+import numpy as np
+from app.ml.peers import PeerDistributions, percentile_rank
+
+
+def _reference(values, value):
+    values = np.asarray(values, dtype=float)
+    return round(100.0 * ((values < value).sum() + 0.5 * (values == value).sum()) / len(values), 1)
+
+
+def test_percentile_rank_counts_ties_as_half():
+    values = np.sort(np.array([10, 20, 20, 30, 40], dtype=float))
+    for value in (5, 10, 20, 25, 40, 50):
+        assert percentile_rank(values, value) == _reference(values, value)
+    assert percentile_rank(np.empty(0), 10) is None
+    assert percentile_rank(values, None) is None
+
+
+def test_incremental_updates_keep_sector_arrays_sorted():
+    peers = PeerDistributions()
+    rng = np.random.default_rng(0)
+    latest = {}
+    for _ in range(300):
+        cid = int(rng.integers(1, 40))
+        sector = "Tech" if cid % 2 else "Energy"
+        score = float(rng.integers(0, 101))
+        peers.record_score(cid, score, sector)
+        latest[cid] = (sector, score)
+    for sector in ("Tech", "Energy"):
+        expected = sorted(s for sec, s in latest.values() if sec == sector)
+        assert list(peers.distribution(sector, "score")) == expected
+    cid, (sector, score) = next(iter(latest.items()))
+    ranks = peers.peer_ranks(cid)
+    assert ranks["sector"] == sector
+    assert ranks["percentiles"]["score"] == _reference(peers.distribution(sector, "score"), score)
+
+
+def test_financials_use_latest_period_and_sector_moves():
+    peers = PeerDistributions()
+    peers.record_score(1, 70, "Tech")
+    peers.record_score(2, 30, "Tech")
+    peers.record_financials([
+        {"company_id": 1, "date": "2023-01-01", "net_income": 1.0, "revenue": 5.0, "debt_ratio": 0.9},
+        {"company_id": 1, "date": "2024-01-01", "net_income": 2.0, "revenue": 9.0, "debt_ratio": 0.2},
+        {"company_id": 2, "date": "2024-01-01", "net_income": -1.0, "revenue": 1.0, "debt_ratio": None},
+    ])
+    assert list(peers.distribution("Tech", "revenue")) == [1.0, 9.0]
+    assert list(peers.distribution("Tech", "debt_ratio")) == [0.2]
+    ranks = peers.peer_ranks(1)
+    assert ranks["peers"] == 2
+    assert ranks["percentiles"] == {"score": 75.0, "net_income": 75.0, "revenue": 75.0, "debt_ratio": 50.0}
+    assert peers.peer_ranks(2)["percentiles"]["debt_ratio"] is None
+    # A score computed for the request is ranked instead of the stored one
+    assert peers.peer_ranks(2, score=100)["percentiles"]["score"] == 100.0
+
+    peers.record_score(2, 30, "Energy")
+    assert list(peers.distribution("Tech", "score")) == [70.0]
+    assert list(peers.distribution("Energy", "revenue")) == [1.0]
+    assert peers.peer_ranks(3) is None
@@ -0,0 +1,117 @@
+import threading
+import time
+import pytest
+from app.data import providers
+from app.utils.cache import DiskTTLCache
+from app.utils.resilience import CircuitBreaker, CircuitOpen, SingleFlight, TokenBucket
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "data"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("AAPL", fetch))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while flight.coalesced < 4:
+        time.sleep(0.005)
+    release.set()
+    for t in threads:
+        t.join()
+    assert calls == [1] and results == ["data"] * 5
+    assert flight.do("AAPL", lambda: "again") == "again"  # nothing cached once the call finished
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=2)
+    start = time.monotonic()
+    for _ in range(7):
+        assert bucket.acquire()
+    assert time.monotonic() - start >= 0.09  # 5 calls beyond the burst at 50/s
+    empty = TokenBucket(rate=0.1, capacity=1)
+    empty.acquire()
+    assert empty.acquire(timeout=0.01) is False
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    breaker.before_call()  # the one trial call
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.fixture
+def live_news(tmp_path, monkeypatch):
+    """fetch_news_articles in live mode with a fake NewsAPI transport and a temp disk cache."""
+    monkeypatch.setattr(providers, "DATA_PROVIDER", "live")
+    monkeypatch.setattr(providers, "news_cache", DiskTTLCache(str(tmp_path), ttl=60))
+    monkeypatch.setattr(providers, "newsapi_breaker", CircuitBreaker(failure_threshold=3, reset_timeout=60))
+    responses = []
+    calls = []
+
+    def request(query, page_size):
+        calls.append(query)
+        return responses.pop(0)
+
+    monkeypatch.setattr(providers, "_request_news", request)
+    return responses, calls
+
+
+def test_news_quota_exhaustion_opens_breaker_and_serves_stale(live_news, monkeypatch):
+    responses, calls = live_news
+    responses.append(([{"title": "a"}], 200))
+    assert providers.fetch_news_articles("Acme") == [{"title": "a"}]
+    assert providers.fetch_news_articles("Acme") == [{"title": "a"}]  # disk cache
+    assert calls == ["Acme"]
+
+    # Expire the cached entry, then run out of quota
+    monkeypatch.setattr(providers.news_cache, "ttl", 1e-9)
+    responses.append((None, 429))
+    assert providers.fetch_news_articles("Acme") == [{"title": "a"}]
+    assert providers.newsapi_breaker.state == "open"
+
+    # Open breaker: no further calls, stale data or None
+    assert providers.fetch_news_articles("Acme") == [{"title": "a"}]
+    assert providers.fetch_news_articles("Other") is None
+    assert calls == ["Acme", "Acme"]
+
+
+def test_statements_charge_each_call_and_round_trip_the_json_cache(tmp_path, monkeypatch):
+    from app.data.fake_providers import FakeTicker
+    from app.data.fetch_financials import _financials_rows
+
+    class CountingBucket:
+        calls = 0
+
+        def acquire(self, timeout=None):
+            self.calls += 1
+            return True
+
+    bucket = CountingBucket()
+    monkeypatch.setattr(providers, "DATA_PROVIDER", "live")
+    monkeypatch.setattr(providers, "_yfinance_bucket", bucket)
+    monkeypatch.setattr(providers, "statements_cache", DiskTTLCache(str(tmp_path), ttl=60))
+
+    fetched = providers.fetch_statements("ACME", FakeTicker("ACME"))
+    assert bucket.calls == 3  # info, financials, balance_sheet
+    cached = providers.fetch_statements("ACME", FakeTicker("ACME"))
+    assert bucket.calls == 3
+    assert cached[0] == fetched[0]
+    assert _financials_rows("ACME", 1, *cached[1:]) == _financials_rows("ACME", 1, *fetched[1:])
+    assert not list(tmp_path.rglob("*.tmp")) and all(p.suffix == ".json" for p in tmp_path.rglob("*.*"))
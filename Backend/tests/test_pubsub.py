@@ -0,0 +1,43 @@
+import asyncio
+import threading
+from app.utils.pubsub import Broker
+
+
+def test_publish_fans_out_by_topic():
+    async def run():
+        broker = Broker()
+        aapl = broker.subscribe(["AAPL"])
+        everything = broker.subscribe()
+        broker.publish("AAPL", {"n": 1})
+        broker.publish("MSFT", {"n": 2})
+        assert await aapl.get(timeout=1) == {"n": 1}
+        assert await aapl.get(timeout=0.05) is None
+        assert [await everything.get(timeout=1) for _ in range(2)] == [{"n": 1}, {"n": 2}]
+        aapl.close()
+        everything.close()
+        assert broker.subscriber_count() == 0
+
+    asyncio.run(run())
+
+
+def test_publish_from_another_thread():
+    async def run():
+        broker = Broker()
+        with broker.subscribe(["AAPL"]) as sub:
+            threading.Thread(target=broker.publish, args=("AAPL", {"n": 1})).start()
+            assert await sub.get(timeout=1) == {"n": 1}
+
+    asyncio.run(run())
+
+
+def test_slow_subscriber_drops_oldest_events():
+    async def run():
+        broker = Broker(queue_size=3)
+        with broker.subscribe() as sub:
+            for n in range(5):
+                broker.publish("AAPL", n)
+            await asyncio.sleep(0)
+            assert sub.dropped == 2
+            assert [await sub.get(timeout=1) for _ in range(3)] == [2, 3, 4]
+
+    asyncio.run(run())
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from app.ml.scoring import compute_credit_score, compute_credit_scores_batch, scoring_columns
+
+
+def _random_inputs(rng, n):
+    financials_list, news_lists = [], []
+    for _ in range(n):
+        financials = {
+            "net_income": rng.choice([None, 0.0, float(rng.normal(0, 3e9))]),
+            "revenue": rng.choice([None, 5e7, 1e8, 1e9, 1e10, float(rng.uniform(0, 5e10))]),
+            "debt_ratio": rng.choice([None, 0.3, 0.5, 0.7, float(rng.uniform(0, 1.2))]),
+        }
+        news = [
+            {"sentiment": rng.choice(["positive", "negative", "neutral"])}
+            for _ in range(rng.integers(0, 6))
+        ]
+        financials_list.append(financials)
+        news_lists.append(news)
+    return financials_list, news_lists
+
+
+def test_batch_matches_scalar_scoring():
+    rng = np.random.default_rng(42)
+    financials_list, news_lists = _random_inputs(rng, 2000)
+    batch = compute_credit_scores_batch(**scoring_columns(financials_list, news_lists))
+    expected = [compute_credit_score(f, n) for f, n in zip(financials_list, news_lists)]
+    assert batch.tolist() == expected
+
+
+def test_batch_handles_empty_input():
+    assert compute_credit_scores_batch([], [], [], [], []).tolist() == []
+
+
+def test_input_fingerprint_tracks_scoring_inputs():
+    from app.ml.scoring import input_fingerprint
+
+    financials = {"id": 1, "date": "2024-12-31", "net_income": 5}
+    news = [{"id": 3, "sentiment": "positive", "title": "a"}, {"id": 2, "sentiment": "neutral"}]
+    base = input_fingerprint(financials, news)
+    # Columns the score does not depend on through the fingerprint are ignored
+    assert input_fingerprint({"id": 1, "date": "2024-12-31"}, [{"id": 3, "sentiment": "positive"}, {"id": 2, "sentiment": "neutral"}]) == base
+    assert input_fingerprint({"id": 4, "date": "2024-12-31"}, news) != base
+    assert input_fingerprint(financials, [{"id": 3, "sentiment": "negative"}, news[1]]) != base
+    assert input_fingerprint(financials, news[:1]) != base
+    assert input_fingerprint(None, []) == input_fingerprint({}, [])
+
+
+def test_single_pass_explanation_matches_score():
+    from app.ml.scoring import score_with_explanation, BASE_SCORE
+
+    rng = np.random.default_rng(7)
+    for financials, news in zip(*_random_inputs(rng, 500)):
+        result = score_with_explanation(financials, news)
+        assert result["score"] == compute_credit_score(financials, news)
+        contributions = result["feature_contributions"]
+        assert BASE_SCORE + sum(contributions.values()) == pytest.approx(result["score"], abs=0.01)
+        assert result["plain_summary"].startswith(f"📊 Final Score: {result['score']}\n")
@@ -0,0 +1,89 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import joblib
+import numpy as np
+import pytest
+from app.data import fetch_news
+from app.data.fetch_news import predict_sentiment, predict_sentiment_batch
+from app.data.sentiment_arrays import ArraySentimentModel, export_arrays, load_array_model
+
+TITLES = [
+    "Apple posts record quarterly profit as iPhone sales surge",
+    "Microsoft shares fall after lawsuit over cloud licensing",
+    "Tesla CEO resigns amid fraud investigation",
+    "  Apple posts record quarterly   profit as iPhone sales surge ",
+    "Bank raises dividend on strong growth",
+    "",
+]
+
+
+def test_batch_matches_per_title_predictions():
+    fetch_news._sentiment_cache.clear()
+    assert predict_sentiment_batch(TITLES) == [predict_sentiment(t) for t in TITLES]
+
+
+def test_batch_memoizes_normalized_titles():
+    fetch_news._sentiment_cache.clear()
+    predict_sentiment_batch(TITLES)
+    # Titles 0 and 3 normalize to the same key
+    assert fetch_news._sentiment_cache.stats()["size"] == len(TITLES) - 1
+    hits_before = fetch_news._sentiment_cache.hits
+    predict_sentiment_batch(TITLES[:2])
+    assert fetch_news._sentiment_cache.hits == hits_before + 2
+
+
+def _joblib_model():
+    return fetch_news.SentimentModel(joblib.load(fetch_news.VECTORIZER_PATH), joblib.load(fetch_news.MODEL_PATH))
+
+
+def test_array_export_matches_joblib_predictions(tmp_path):
+    reference = _joblib_model()
+    export_arrays(reference.cv, reference.classifier, "v1", str(tmp_path))
+    model = load_array_model("v1", str(tmp_path))
+    assert isinstance(model.inv_var, np.memmap)
+
+    rng = random.Random(0)
+    words = list(reference.cv.vocabulary_) + ["unseenword", "APPLE", "x"]
+    titles = TITLES + [" ".join(rng.choice(words) for _ in range(rng.randint(0, 15))) for _ in range(2000)]
+    expected = [reference.predict_one(t) for t in titles]
+    assert list(model.predict_labels(titles)) == expected
+    assert [model.predict_one(t) for t in TITLES] == expected[:len(TITLES)]
+
+
+def test_export_rejects_vectorizer_settings_it_cannot_reproduce(tmp_path):
+    import copy
+    reference = _joblib_model()
+    for setting in ({"binary": True}, {"dtype": np.float32}, {"ngram_range": (1, 2)}):
+        cv = copy.copy(reference.cv)
+        cv.set_params(**setting)
+        with pytest.raises(ValueError):
+            export_arrays(cv, reference.classifier, "v1", str(tmp_path))
+    assert load_array_model("v1", str(tmp_path)) is None
+
+
+def test_stale_or_missing_array_export_is_ignored(tmp_path):
+    assert load_array_model("v1", str(tmp_path)) is None
+    reference = _joblib_model()
+    export_arrays(reference.cv, reference.classifier, "v1", str(tmp_path))
+    assert load_array_model("v2", str(tmp_path)) is None
+
+
+def test_shipped_array_export_is_current_and_avoids_sklearn():
+    # Re-run `python -m app.data.sentiment_arrays` after replacing the .joblib files
+    assert ArraySentimentModel.load()[1] == fetch_news.model_version()
+    probe = (
+        "import json, sys\n"
+        "from app.data.fetch_news import predict_sentiment_batch\n"
+        "labels = predict_sentiment_batch(%r)\n"
+        "print(json.dumps([labels, 'sklearn' in sys.modules]))" % (TITLES,)
+    )
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", probe], cwd=backend_dir, capture_output=True, text=True, check=True,
+    )
+    labels, sklearn_loaded = json.loads(out.stdout.strip().splitlines()[-1])
+    assert not sklearn_loaded
+    assert labels == ["positive" if _joblib_model().predict_one(t) == 1 else "negative" for t in TITLES]
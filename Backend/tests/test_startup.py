@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+
+# Cold-import budget for `import app.main` in a fresh interpreter. Measured at
+# ~0.5s / ~55MB locally (previously ~2.4s / ~205MB with eager model loading).
+IMPORT_TIME_BUDGET_S = 1.5
+RSS_BUDGET_MB = 120
+# Only loaded on first use: ingestion, sentiment inference, DB access
+DEFERRED_MODULES = ("sklearn", "joblib", "yfinance", "pandas", "supabase", "requests")
+
+# ru_maxrss survives exec on Linux, so a child spawned by a big pytest process
+# would report the parent's peak; read the current VmRSS instead where available.
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+try:
+    with open("/proc/self/status") as f:
+        rss_mb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) / 1024
+except OSError:
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_mb": rss_mb,
+    "modules": sorted(m for m in sys.modules if m.split(".")[0] in %r),
+}))
+""" % (DEFERRED_MODULES,)
+
+
+def _probe():
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", PROBE],
+        cwd=backend_dir, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_does_not_load_deferred_modules():
+    assert _probe()["modules"] == []
+
+
+def test_import_time_and_rss_budget():
+    # Best of three to keep the check stable on a busy machine
+    runs = [_probe() for _ in range(3)]
+    assert min(r["seconds"] for r in runs) < IMPORT_TIME_BUDGET_S
+    assert min(r["rss_mb"] for r in runs) < RSS_BUDGET_MB
@@ -13,6 +13,14 @@ export interface CreditScore {
   explanation: string;
   feature_contributions: Record<string, number>;
   html_summary?: string;
+  peers?: PeerRanks | null;
+}
+
+// Percentile (0-100) of the company's latest values among its sector peers
+export interface PeerRanks {
+  sector: string;
+  peers: number;
+  percentiles: Record<'score' | 'net_income' | 'revenue' | 'debt_ratio', number | null>;
 }
 
 export interface ScoreHistory {
@@ -21,6 +29,11 @@ export interface ScoreHistory {
   explanation: string;
 }
 
+export interface ScoreUpdate extends CreditScore {
+  ticker: string;
+  date: string;
+}
+
 export interface NewsItem {
   date: string;
   title: string;
@@ -75,6 +88,14 @@ export const useCreditScore = (ticker: string | null) => {
       }
     };
     fetchData();
+    return apiService.subscribeScores([ticker], (update) => {
+      setScore((prev) => ({
+        ...prev,
+        score: update.score,
+        explanation: update.explanation,
+        feature_contributions: update.feature_contributions,
+      }));
+    });
   }, [ticker]);
 
   return { score, loading, error };
@@ -100,6 +121,10 @@ export const useScoreHistory = (ticker: string | null) => {
       }
     };
     fetchData();
+    return apiService.subscribeScores([ticker], (update) => {
+      const entry = { date: update.date, score: update.score, explanation: update.explanation };
+      setHistory((prev) => [...prev.filter((h) => h.date !== update.date), entry]);
+    });
   }, [ticker]);
 
   return { history, loading, error };
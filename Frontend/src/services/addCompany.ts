@@ -1,10 +1,37 @@
 import { Company } from '@/hooks/api';
 const BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+const POLL_INTERVAL_MS = 1000;
+const POLL_TIMEOUT_MS = 120000;
+
+interface Job {
+  id: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  result: Company | null;
+  error: string | null;
+}
+
+async function waitForJob(jobId: string): Promise<Job> {
+  const deadline = Date.now() + POLL_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    const response = await fetch(`${BASE_URL}/jobs/${jobId}`);
+    if (!response.ok) throw new Error('Failed to fetch job status');
+    const job: Job = await response.json();
+    if (job.status === 'succeeded' || job.status === 'failed') return job;
+    await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
+  }
+  throw new Error('Timed out waiting for company to be added');
+}
+
 export async function addCompany(ticker: string): Promise<Company> {
   const response = await fetch(`${BASE_URL}/add_company/${ticker}`, {
     method: 'POST',
   });
   if (!response.ok) throw new Error('Failed to add company');
-  return response.json();
+  const data = await response.json();
+  // 202: ingestion runs in the background, poll the job until it finishes
+  if (response.status !== 202) return data;
+  const job = await waitForJob(data.job_id);
+  if (job.status === 'failed') throw new Error(job.error || 'Failed to add company');
+  return job.result as Company;
 }
@@ -1,4 +1,4 @@
-import { Company, CreditScore, ScoreHistory, NewsItem } from '@/hooks/api';
+import { Company, CreditScore, ScoreHistory, NewsItem, ScoreUpdate } from '@/hooks/api';
 
 const BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
@@ -31,3 +31,33 @@ export async function fetchNews(ticker: string): Promise<NewsItem[]> {
   if (!response.ok) throw new Error('Failed to fetch news');
   return response.json();
 }
+
+// Live score updates over Server-Sent Events; returns a function that closes the stream.
+// EventSource reconnects on its own, so no polling is needed while it is open.
+// Callers asking for the same tickers share one EventSource, closed with its last listener.
+const scoreStreams = new Map<string, { source: EventSource; listeners: Set<(update: ScoreUpdate) => void> }>();
+
+export function subscribeScores(tickers: string[], onUpdate: (update: ScoreUpdate) => void): () => void {
+  const key = [...new Set(tickers.map((t) => t.toUpperCase()))].sort().join(',');
+  let stream = scoreStreams.get(key);
+  if (!stream) {
+    const params = new URLSearchParams({ tickers: key });
+    const source = new EventSource(`${BASE_URL}/stream/scores?${params}`);
+    const listeners = new Set<(update: ScoreUpdate) => void>();
+    source.addEventListener('score', (event) => {
+      const update: ScoreUpdate = JSON.parse((event as MessageEvent).data);
+      listeners.forEach((listener) => listener(update));
+    });
+    stream = { source, listeners };
+    scoreStreams.set(key, stream);
+  }
+  const { source, listeners } = stream;
+  listeners.add(onUpdate);
+  return () => {
+    listeners.delete(onUpdate);
+    if (listeners.size === 0) {
+      source.close();
+      scoreStreams.delete(key);
+    }
+  };
+}